@@ -2,32 +2,27 @@
 API dependencies for authentication and database access.
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.security import redeem_stream_ticket, verify_token
 from app.models.user import User
 from typing import Optional
 import httpx
+from app.core.http_client import outbound_client
 from app.core.config import settings
+from app.core.logging_config import bind_user
+from app.core.read_replica import replica_router
 
 # Security scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """
-    Get current authenticated user from JWT token.
-    This function integrates with Supabase Auth.
-    """
-    token = credentials.credentials
-    
-    # Verify token with Supabase
+async def authenticate_token(token: str, db: Session) -> User:
+    """Verify a Supabase access token and return the matching user (created on first login)."""
     try:
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             response = await client.get(
                 f"{settings.SUPABASE_URL}/auth/v1/user",
                 headers={
@@ -62,6 +57,7 @@ async def get_current_user(
                 db.commit()
                 db.refresh(user)
             
+            bind_user(user.id)
             return user
             
     except httpx.RequestError:
@@ -71,7 +67,62 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get current authenticated user from JWT token.
+    This function integrates with Supabase Auth.
+    """
+    return await authenticate_token(credentials.credentials, db)
+
+async def get_stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    ticket: Optional[str] = Query(None, description="Stream ticket from POST /events/ticket, for EventSource clients that cannot set headers"),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Authenticate a streaming request by Bearer header or single-use `ticket`.
+
+    Access tokens are never accepted in the query string, where they would
+    end up in access logs and error reports.
+    """
+    if credentials:
+        return await authenticate_token(credentials.credentials, db)
+    user_id = redeem_stream_ticket(ticket) if ticket else None
+    user = db.query(User).filter(User.id == user_id).first() if user_id else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    bind_user(user.id)
+    return user
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user."""
     return current_user
 
+def get_read_db(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Session for read-only handlers: the read replica when one is configured,
+    healthy, has replayed the user's current data version and the user has
+    not written recently, otherwise the primary session of the request.
+    Never write through it.
+    """
+    read_db = replica_router.session_for(current_user)
+    if read_db is None:
+        yield db
+        return
+    # Authentication is done: give the primary connection back while the
+    # replica serves the request (the loaded user stays usable)
+    db.close()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
@@ -2,11 +2,11 @@
 Assets API endpoints for asset management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form  # type: ignore
+from fastapi import APIRouter, Depends, HTTPException, Request, status, File, UploadFile, Form  # type: ignore
 from sqlalchemy.orm import Session  # type: ignore
 from sqlalchemy import and_, or_, func  # type: ignore
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_read_db
 from app.models.user import User
 from app.models.asset import Asset
 from app.schemas.asset import Asset as AssetSchema, AssetCreate, AssetUpdate, AssetSummary
@@ -15,18 +15,28 @@ from uuid import UUID
 from datetime import datetime
 import os
 import secrets
-import httpx
+from app.core.http_client import outbound_client
 from app.core.config import settings
+from app.core.serialization import ResponseSerializer, JSONBytesResponse
+from app.core.single_flight import single_flight
+from app.core.events import emit_event, asset_delta
+from app.core.etag import user_data_etag, etag_matches, not_modified, with_etag
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Precompiled serializer for the (potentially large) asset list
+assets_serializer = ResponseSerializer(List[AssetSchema])
+
 async def ensure_storage_bucket_exists(bucket_name: str = "asset-documents") -> bool:
     """
     Ensure the Supabase storage bucket exists, create it if it doesn't.
     """
     try:
-        print(f"🔍 Checking if storage bucket '{bucket_name}' exists...")
-        async with httpx.AsyncClient() as client:
+        logger.debug("Checking if storage bucket '%s' exists...", bucket_name)
+        async with outbound_client() as client:
             response = await client.get(
                 f"{settings.SUPABASE_URL}/storage/v1/bucket/{bucket_name}",
                 headers={
@@ -36,11 +46,11 @@ async def ensure_storage_bucket_exists(bucket_name: str = "asset-documents") ->
             )
             
             if response.status_code == 200:
-                print(f"✅ Storage bucket '{bucket_name}' already exists")
+                logger.debug("Storage bucket '%s' already exists", bucket_name)
                 return True
             elif response.status_code == 404:
                 # Bucket doesn't exist, create it
-                print(f"📁 Creating storage bucket '{bucket_name}'...")
+                logger.debug("Creating storage bucket '%s'...", bucket_name)
                 create_response = await client.post(
                     f"{settings.SUPABASE_URL}/storage/v1/bucket",
                     headers={
@@ -62,17 +72,17 @@ async def ensure_storage_bucket_exists(bucket_name: str = "asset-documents") ->
                 )
                 
                 if create_response.status_code in [200, 201]:
-                    print(f"✅ Storage bucket '{bucket_name}' created successfully")
+                    logger.debug("Storage bucket '%s' created successfully", bucket_name)
                     return True
                 else:
-                    print(f"❌ Failed to create storage bucket: {create_response.status_code} - {create_response.text}")
+                    logger.warning(f"Failed to create storage bucket: {create_response.status_code} - {create_response.text}")
                     return False
             else:
-                print(f"❌ Unexpected response checking bucket: {response.status_code} - {response.text}")
+                logger.warning(f"Unexpected response checking bucket: {response.status_code} - {response.text}")
                 return False
                 
     except Exception as e:
-        print(f"❌ Error ensuring storage bucket exists: {str(e)}")
+        logger.error(f"Error ensuring storage bucket exists: {e}", exc_info=True)
         return False
 
 
@@ -83,13 +93,13 @@ async def ensure_user_folder_exists(user_id: UUID, bucket_name: str = "asset-doc
     """
     try:
         user_id_str = str(user_id)
-        print(f"🔍 Checking if user folder '{user_id_str}/' exists in bucket '{bucket_name}'...")
+        logger.debug("Checking if user folder '%s/' exists in bucket '%s'...", user_id_str, bucket_name)
         
         # Create a placeholder file to ensure the folder exists
         placeholder_filename = f"{user_id_str}/.folder_placeholder"
         placeholder_content = f"User folder created for {user_id_str}"
         
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             # Check if folder already has files (indicating it exists)
             list_response = await client.post(
                 f"{settings.SUPABASE_URL}/storage/v1/object/list/{bucket_name}",
@@ -106,11 +116,11 @@ async def ensure_user_folder_exists(user_id: UUID, bucket_name: str = "asset-doc
             if list_response.status_code == 200:
                 files = list_response.json()
                 if files and len(files) > 0:
-                    print(f"✅ User folder '{user_id_str}/' already exists with {len(files)} files")
+                    logger.debug("User folder '%s/' already exists with %s files", user_id_str, len(files))
                     return True
             
             # Folder doesn't exist or is empty, create placeholder
-            print(f"📁 Creating user folder '{user_id_str}/' with placeholder...")
+            logger.debug("Creating user folder '%s/' with placeholder...", user_id_str)
             upload_response = await client.post(
                 f"{settings.SUPABASE_URL}/storage/v1/object/{bucket_name}/{placeholder_filename}",
                 headers={
@@ -121,22 +131,18 @@ async def ensure_user_folder_exists(user_id: UUID, bucket_name: str = "asset-doc
             )
             
             if upload_response.status_code in [200, 201]:
-                print(f"✅ User folder '{user_id_str}/' created successfully")
+                logger.debug("User folder '%s/' created successfully", user_id_str)
                 return True
             else:
-                print(f"❌ Failed to create user folder: {upload_response.status_code} - {upload_response.text}")
+                logger.warning(f"Failed to create user folder: {upload_response.status_code} - {upload_response.text}")
                 return False
                 
     except Exception as e:
-        print(f"❌ Error ensuring user folder exists: {str(e)}")
+        logger.error(f"Error ensuring user folder exists: {e}", exc_info=True)
         return False
 
-@router.get("/", response_model=List[AssetSchema])
-async def get_assets(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get all assets for the current user."""
+def dump_active_assets(db: Session, current_user: User) -> bytes:
+    """Serialized list of the user's active assets."""
     # Filter out sold assets (quantity = 0 or NULL indicates sold/inactive assets)
     # Use explicit NULL handling to ensure proper filtering
     assets = db.query(Asset).filter(
@@ -147,23 +153,38 @@ async def get_assets(
         )
     ).all()
     
-    # Debug logging to track asset filtering
-    all_assets = db.query(Asset).filter(Asset.user_id == current_user.id).all()
-    print(f"🔍 ASSETS_FILTER: Total assets for user: {len(all_assets)}")
-    print(f"🔍 ASSETS_FILTER: Active assets (quantity > 0): {len(assets)}")
-    
-    for asset in all_assets:
-        status = "ACTIVE" if asset.quantity and asset.quantity > 0 else "SOLD/INACTIVE"  # type: ignore
-        print(f"🔍 Asset: {asset.name}, quantity: {asset.quantity}, value: {asset.current_value}, status: {status}")
-    
-    # Debug logging
-    print(f"🔍 Found {len(assets)} active assets for user {current_user.id}")
-    for asset in assets:
-        print(f"🔍 Active Asset: {asset.name}, type: {asset.asset_type}, current_value: {asset.current_value}, initial_value: {asset.initial_value}, quantity: {asset.quantity}")
-        if asset.asset_metadata:  # type: ignore
-            print(f"🔍   Metadata: {asset.asset_metadata}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Found %d active assets", len(assets),
+            extra={"assets": [
+                {
+                    "name": asset.name,
+                    "type": asset.asset_type,
+                    "quantity": asset.quantity,
+                    "current_value": asset.current_value
+                }
+                for asset in assets
+            ]}
+        )
     
-    return assets
+    return assets_serializer.dump(assets)
+
+@router.get("/", response_model=List[AssetSchema])
+async def get_assets(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get all assets for the current user."""
+    etag = user_data_etag(current_user, "assets")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    body = await single_flight.run_sync(
+        "assets", (current_user.id, current_user.data_version),
+        lambda: dump_active_assets(db, current_user)
+    )
+    return with_etag(JSONBytesResponse(body), etag)
 
 @router.post("/", response_model=AssetSchema)
 async def create_asset(
@@ -174,6 +195,7 @@ async def create_asset(
     """Create a new asset."""
     db_asset = Asset(**asset.model_dump(), user_id=current_user.id)
     db.add(db_asset)
+    emit_event(db, current_user.id, "asset.created", lambda: asset_delta(db_asset))
     db.commit()
     db.refresh(db_asset)
     return db_asset
@@ -182,7 +204,7 @@ async def create_asset(
 async def get_asset(
     asset_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific asset by ID."""
     asset = db.query(Asset).filter(
@@ -221,6 +243,7 @@ async def update_asset(
     for field, value in update_data.items():
         setattr(asset, field, value)
     
+    emit_event(db, current_user.id, "asset.updated", lambda: asset_delta(asset))
     db.commit()
     db.refresh(asset)
     return asset
@@ -259,6 +282,7 @@ async def delete_asset(
     
     # Delete the asset
     db.delete(asset)
+    emit_event(db, current_user.id, "asset.deleted", {"id": str(asset_id)})
     db.commit()
     
     return {
@@ -279,12 +303,10 @@ async def upload_asset_document(
 ):
     """Upload a document for an asset."""
     
-    print(f"🔄 Document upload started:")
-    print(f"   Asset ID: {asset_id}")
-    print(f"   User ID: {current_user.id}")
-    print(f"   File: {file.filename}")
-    print(f"   Content Type: {file.content_type}")
-    print(f"   Supabase URL: {settings.SUPABASE_URL}")
+    logger.info(
+        "Document upload started",
+        extra={"asset_id": str(asset_id), "filename": file.filename, "content_type": file.content_type}
+    )
     
     # Validate asset exists and belongs to user
     asset = db.query(Asset).filter(
@@ -293,31 +315,31 @@ async def upload_asset_document(
     ).first()
     
     if not asset:
-        print(f"❌ Asset not found: {asset_id} for user {current_user.id}")
+        logger.warning(f"Asset not found: {asset_id} for user {current_user.id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Asset not found"
         )
     
-    print(f"✅ Asset found: {asset.name} (type: {asset.asset_type})")
+    logger.debug("Asset found: %s (type: %s)", asset.name, asset.asset_type)
     
     # Validate file type
     allowed_types = ["application/pdf", "image/jpeg", "image/jpg", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
     if file.content_type not in allowed_types:
-        print(f"❌ Invalid file type: {file.content_type}")
+        logger.warning(f"Invalid file type: {file.content_type}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type not allowed. Allowed types: PDF, JPEG, DOCX"
         )
     
-    print(f"✅ File type validated: {file.content_type}")
+    logger.debug("File type validated: %s", file.content_type)
     
     # Validate file size (3MB limit)
     content = await file.read()
-    print(f"📄 File size: {len(content)} bytes ({len(content) / (1024*1024):.2f} MB)")
+    logger.debug("File size: %d bytes", len(content))
     
     if len(content) > 3 * 1024 * 1024:  # 3MB
-        print(f"❌ File too large: {len(content)} bytes")
+        logger.warning(f"File too large: {len(content)} bytes")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File size exceeds 3MB limit"
@@ -339,37 +361,35 @@ async def upload_asset_document(
     file_extension = file.filename.split('.')[-1] if file.filename and '.' in file.filename else 'bin'
     unique_filename = f"{current_user.id}/{asset_id}_{secrets.token_hex(8)}.{file_extension}"
     
-    print(f"📁 Generated filename: {unique_filename}")
+    logger.debug("Generated filename: %s", unique_filename)
     
     try:
         # Ensure the storage bucket exists
-        print(f"🪣 Checking/creating storage bucket...")
+        logger.debug("Checking/creating storage bucket...")
         bucket_exists = await ensure_storage_bucket_exists("asset-documents")
         if not bucket_exists:
-            print(f"❌ Failed to create/access storage bucket")
+            logger.warning("Failed to create/access storage bucket")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Storage service configuration error"
             )
-        print(f"✅ Storage bucket ready")
+        logger.debug("Storage bucket ready")
         
         # Ensure the user-specific folder exists
-        print(f"👤 Checking/creating user folder...")
+        logger.debug("Checking/creating user folder...")
         user_folder_exists = await ensure_user_folder_exists(UUID(str(current_user.id)), "asset-documents")
         if not user_folder_exists:
-            print(f"❌ Failed to create/access user folder")
+            logger.warning("Failed to create/access user folder")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="User storage folder configuration error"
             )
-        print(f"✅ User folder ready")
+        logger.debug("User folder ready")
         
         # Upload to Supabase Storage using REST API
-        print(f"🚀 Uploading to Supabase Storage...")
-        async with httpx.AsyncClient() as client:
+        logger.debug("Uploading to Supabase Storage...")
+        async with outbound_client() as client:
             upload_url = f"{settings.SUPABASE_URL}/storage/v1/object/asset-documents/{unique_filename}"
-            print(f"   Upload URL: {upload_url}")
-            
             response = await client.post(
                 upload_url,
                 headers={
@@ -379,20 +399,17 @@ async def upload_asset_document(
                 content=content
             )
             
-            print(f"📡 Upload response: {response.status_code}")
-            print(f"   Response text: {response.text}")
-            
             if response.status_code not in [200, 201]:
-                print(f"❌ Storage upload failed: {response.status_code} - {response.text}")
+                logger.warning(f"Storage upload failed: {response.status_code} - {response.text}")
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to upload file to storage"
                 )
         
-        print(f"✅ File uploaded to storage successfully")
+        logger.debug("File uploaded to storage successfully")
         
         # Update asset with document information
-        print(f"💾 Updating asset with document metadata...")
+        logger.debug("Updating asset with document metadata...")
         update_data = {
             "document_path": unique_filename,
             "document_name": file.filename,
@@ -401,7 +418,7 @@ async def upload_asset_document(
             "document_uploaded_at": datetime.utcnow()
         }
         
-        print(f"   Document data: {update_data}")
+        logger.debug("Document data: %s", update_data)
         
         for field, value in update_data.items():
             setattr(asset, field, value)
@@ -409,10 +426,10 @@ async def upload_asset_document(
         db.commit()
         db.refresh(asset)
         
-        print(f"✅ Document upload completed successfully!")
-        print(f"   Asset ID: {asset.id}")
-        print(f"   Document path: {asset.document_path}")
-        print(f"   Document name: {asset.document_name}")
+        logger.info(
+            "Document upload completed",
+            extra={"asset_id": str(asset.id), "document_path": asset.document_path}
+        )
         
         return {
             "message": "Document uploaded successfully",
@@ -425,11 +442,11 @@ async def upload_asset_document(
         # Re-raise HTTP exceptions (like bucket creation failure)
         raise
     except Exception as e:
-        print(f"🚨 Document upload error: {str(e)}")
-        print(f"   File: {file.filename if file and file.filename else 'unknown'}")
-        print(f"   Content type: {file.content_type if file else 'unknown'}")
-        print(f"   Asset ID: {asset_id}")
-        print(f"   User ID: {current_user.id}")
+        logger.error(
+            f"Document upload error: {e}",
+            extra={"asset_id": str(asset_id), "filename": file.filename if file else None},
+            exc_info=True
+        )
         
         # Check if it's a storage-related error
         if "storage" in str(e).lower() or "supabase" in str(e).lower():
@@ -447,7 +464,7 @@ async def upload_asset_document(
 async def download_asset_document(
     asset_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Download a document for an asset."""
     
@@ -466,7 +483,7 @@ async def download_asset_document(
     
     try:
         # Get download URL from Supabase Storage
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             response = await client.post(
                 f"{settings.SUPABASE_URL}/storage/v1/object/sign/asset-documents/{asset.document_path}",
                 headers={
@@ -494,7 +511,7 @@ async def download_asset_document(
             }
             
     except Exception as e:
-        print(f"Document download error: {str(e)}")
+        logger.error(f"Document download error: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate download URL"
@@ -527,7 +544,7 @@ async def delete_asset_document(
     
     try:
         # Delete from Supabase Storage
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             response = await client.delete(
                 f"{settings.SUPABASE_URL}/storage/v1/object/asset-documents/{document_path}",
                 headers={
@@ -537,7 +554,7 @@ async def delete_asset_document(
             
             # Note: Supabase may return 404 if file doesn't exist, which is acceptable
             if response.status_code not in [200, 204, 404]:
-                print(f"Storage deletion warning: {response.status_code} - {response.text}")
+                logger.warning(f"Storage deletion warning: {response.status_code} - {response.text}")
         
         # Clear document fields from asset
         clear_data = {
@@ -559,7 +576,7 @@ async def delete_asset_document(
         }
         
     except Exception as e:
-        print(f"Document deletion error: {str(e)}")
+        logger.error(f"Document deletion error: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete document"
@@ -4,18 +4,27 @@ Note: Most authentication is handled by Supabase Auth.
 This module provides user profile management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api.deps import get_current_active_user
+from app.core.etag import user_data_etag, etag_matches, not_modified, with_etag
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user)
+):
     """Get current user profile."""
+    etag = user_data_etag(current_user, "me")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    with_etag(response, etag)
     return current_user
 
 @router.put("/me", response_model=UserSchema)
@@ -0,0 +1,151 @@
+"""
+Bootstrap API endpoint: the data the app shell loads after login, in one request.
+
+Replaces separate calls to /auth/me, /user-settings, /dashboard/summary,
+/assets, /insurance, /goals and /profile/options, so authentication and
+session setup happen once. Database sections run concurrently, each in a
+worker thread on its own pooled connection (at most
+BOOTSTRAP_MAX_CONCURRENCY at a time per request). The request's own session
+gives its connection back before the sections start, so a worker's bootstrap
+requests hold at most BOOTSTRAP_MAX_CONCURRENCY times the "bootstrap"
+admission class concurrency connections (2 x 4 = 8 by default, out of a pool
+of 15).
+
+Each section carries the same ETag as its standalone endpoint. Clients send
+the tags they hold in If-None-Match (comma-separated); matching sections are
+answered with status 304 and no data:
+
+    {
+        "sections": {
+            "assets": {"etag": "\"12-...\"", "status": 200, "data": [...]},
+            "goals": {"etag": "\"12-...\"", "status": 304},
+            ...
+        }
+    }
+
+A section that fails is reported with status 500 without failing the others.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import anyio
+import pydantic_core
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.api.deps import get_current_active_user, get_read_db
+from app.core.etag import CACHE_CONTROL, content_etag, etag_matches, user_data_etag
+from app.core.profiling import profiled_in_thread
+from app.core.response_cache import response_cache
+from app.core.serialization import JSONBytesResponse, ResponseSerializer
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+from app.schemas.user_settings import UserSettingsResponse
+from app.api.v1.assets import dump_active_assets
+from app.api.v1.dashboard import build_dashboard_summary
+from app.api.v1.goals import dump_goals
+from app.api.v1.insurance import dump_policies
+from app.api.v1.profile import PROFILE_OPTIONS
+from app.api.v1.user_settings import user_settings_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+me_serializer = ResponseSerializer(UserSchema)
+user_settings_serializer = ResponseSerializer(UserSettingsResponse)
+
+PROFILE_OPTIONS_BODY = pydantic_core.to_json(PROFILE_OPTIONS)
+
+# Section name -> ETag resource of the standalone endpoint (None: not user data)
+SECTIONS: Dict[str, Optional[str]] = {
+    "me": "me",
+    "user_settings": "user-settings",
+    "dashboard_summary": "dashboard-summary",
+    "assets": "assets",
+    "insurance": "insurance",
+    "goals": "goals",
+    "profile_options": None,
+}
+
+
+def section_etag(name: str, user: User) -> str:
+    resource = SECTIONS[name]
+    if resource is None:
+        return content_etag(PROFILE_OPTIONS_BODY)
+    return user_data_etag(user, resource)
+
+
+@router.get("")
+async def get_bootstrap(
+    request: Request,
+    sections: Optional[str] = Query(None, description="Comma-separated section names (default: all)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get all app shell sections for the current user in one response."""
+    names = list(SECTIONS) if sections is None else [name.strip() for name in sections.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sections: {', '.join(unknown)}"
+        )
+
+    bind = db.get_bind()
+    # Authentication is done and every section opens its own session: do not
+    # hold a connection on top of theirs (the loaded user stays usable)
+    db.close()
+    limiter = anyio.CapacityLimiter(settings.BOOTSTRAP_MAX_CONCURRENCY)
+
+    async def in_session(fn: Callable[[Session], bytes]) -> bytes:
+        def run() -> bytes:
+            # Sessions are not thread-safe: every section gets its own
+            with SessionLocal(bind=bind) as session:
+                return fn(session)
+        return await anyio.to_thread.run_sync(profiled_in_thread(run), limiter=limiter)
+
+    async def dashboard_summary() -> bytes:
+        async with limiter:
+            with SessionLocal(bind=bind) as session:
+                return await response_cache.get_or_compute(
+                    current_user, "dashboard_summary", None,
+                    lambda: build_dashboard_summary(session, current_user)
+                )
+
+    async def no_db(body: bytes) -> bytes:
+        return body
+
+    builders: Dict[str, Callable[[], Awaitable[bytes]]] = {
+        "me": lambda: no_db(me_serializer.dump(current_user)),
+        "user_settings": lambda: no_db(user_settings_serializer.dump(user_settings_response(current_user))),
+        "dashboard_summary": dashboard_summary,
+        "assets": lambda: in_session(lambda session: dump_active_assets(session, current_user)),
+        "insurance": lambda: in_session(lambda session: dump_policies(session, current_user)),
+        "goals": lambda: in_session(lambda session: dump_goals(session, current_user)),
+        "profile_options": lambda: no_db(PROFILE_OPTIONS_BODY),
+    }
+
+    async def build(name: str) -> Tuple[str, str, int, Optional[bytes]]:
+        etag = section_etag(name, current_user)
+        if etag_matches(request, etag):
+            return name, etag, 304, None
+        try:
+            return name, etag, 200, await builders[name]()
+        except Exception as e:
+            logger.error(f"Error building bootstrap section {name}: {str(e)}", exc_info=True)
+            return name, etag, 500, None
+
+    results = await asyncio.gather(*(build(name) for name in dict.fromkeys(names)))
+
+    # Section bodies are already JSON; splice them in instead of re-encoding
+    parts = []
+    for name, etag, section_status, body in results:
+        head = pydantic_core.to_json(name) + b':{"etag":' + pydantic_core.to_json(etag) + b',"status":%d' % section_status
+        parts.append(head + (b',"data":' + body if body is not None else b"") + b"}")
+    return JSONBytesResponse(
+        b'{"sections":{' + b",".join(parts) + b"}}",
+        headers={"Cache-Control": CACHE_CONTROL}
+    )
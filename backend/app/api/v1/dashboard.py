@@ -2,11 +2,12 @@
 Dashboard API endpoints for overview data.
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import func, desc
-from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_read_db
+from app.core.etag import user_data_etag, etag_matches, not_modified, with_etag
+from app.core.response_cache import response_cache
 from app.models.user import User
 from app.models.asset import Asset
 from app.models.transaction import Transaction
@@ -16,41 +17,46 @@ from decimal import Decimal
 
 router = APIRouter()
 
-def get_latest_market_value(db: Session, asset: Asset, user_id: int) -> float:
+def get_latest_market_values(db: Session, assets: List[Asset], user_id) -> Dict[Any, float]:
     """
-    Get the latest market value for an asset using the same logic as Assets page.
+    Get the latest market value of every asset using the same logic as Assets page.
     Priority: Latest market value transaction -> Latest current_value transaction -> Asset current_value -> Asset initial_value
+
+    All assets are resolved from a single transactions query (newest first per
+    asset) instead of one query per asset.
     """
-    # Get all transactions for this asset
-    asset_transactions = db.query(Transaction).filter(
-        Transaction.asset_id == asset.id,
-        Transaction.user_id == user_id
-    ).order_by(desc(Transaction.transaction_date)).all()
-    
-    if not asset_transactions:
-        # Fallback to asset's static values
-        return float(asset.current_value or asset.initial_value or 0)
-    
-    # Look for the latest market value update transaction
-    for transaction in asset_transactions:
-        if transaction.transaction_type == 'update_market_value' and transaction.amount is not None:
-            return float(transaction.amount)
-    
-    # If no market value update, look for transactions with current_value
-    for transaction in asset_transactions:
-        if transaction.current_value is not None and transaction.current_value > 0:
-            return float(transaction.current_value)
-    
-    # Final fallback to asset's static values
-    return float(asset.current_value or asset.initial_value or 0)
+    asset_ids = [asset.id for asset in assets]
+    market_values: Dict[Any, float] = {}
+    current_values: Dict[Any, float] = {}
 
-@router.get("/summary")
-async def get_dashboard_summary(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
-    """Get dashboard summary data using Assets page calculation logic."""
-    
+    if asset_ids:
+        rows = db.query(
+            Transaction.asset_id,
+            Transaction.transaction_type,
+            Transaction.amount,
+            Transaction.current_value
+        ).filter(
+            Transaction.asset_id.in_(asset_ids),
+            Transaction.user_id == user_id
+        ).order_by(Transaction.asset_id, desc(Transaction.transaction_date)).all()
+
+        for asset_id, transaction_type, amount, current_value in rows:
+            # Rows are newest first, so the first match per asset wins
+            if asset_id not in market_values and transaction_type == 'update_market_value' and amount is not None:
+                market_values[asset_id] = float(amount)
+            if asset_id not in current_values and current_value is not None and current_value > 0:
+                current_values[asset_id] = float(current_value)
+
+    return {
+        asset.id: market_values.get(
+            asset.id,
+            current_values.get(asset.id, float(asset.current_value or asset.initial_value or 0))
+        )
+        for asset in assets
+    }
+
+def build_dashboard_summary(db: Session, current_user: User) -> Dict[str, Any]:
+    """Dashboard summary data using Assets page calculation logic."""
     # Get all assets for the user
     assets = db.query(Asset).filter(Asset.user_id == current_user.id).all()
     
@@ -58,8 +64,9 @@ async def get_dashboard_summary(
     total_net_worth = 0
     asset_allocation_data = {}
     
+    latest_market_values = get_latest_market_values(db, assets, current_user.id)
     for asset in assets:
-        latest_market_value = get_latest_market_value(db, asset, current_user.id)
+        latest_market_value = latest_market_values[asset.id]
         total_net_worth += latest_market_value
         
         # Group by asset type for allocation chart
@@ -84,7 +91,9 @@ async def get_dashboard_summary(
     ]
     
     # Get recent transactions (last 5)
-    recent_transactions = db.query(Transaction).join(Asset).filter(
+    recent_transactions = db.query(Transaction).join(Asset).options(
+        contains_eager(Transaction.asset)
+    ).filter(
         Transaction.user_id == current_user.id
     ).order_by(Transaction.created_at.desc()).limit(5).all()
     
@@ -108,3 +117,18 @@ async def get_dashboard_summary(
         "user_theme": current_user.theme
     }
 
+@router.get("/summary")
+async def get_dashboard_summary(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+) -> Dict[str, Any]:
+    """Get dashboard summary data (cached per user data version)."""
+    etag = user_data_etag(current_user, "dashboard-summary")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response = await response_cache.response(
+        current_user, "dashboard_summary", None,
+        lambda: build_dashboard_summary(db, current_user)
+    )
+    return with_etag(response, etag)
@@ -0,0 +1,30 @@
+"""
+Debug API endpoints for retrieving request profiles.
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.core.profiling import profile_store, profile_token_valid, folded_stacks
+
+router = APIRouter()
+
+
+def require_profile_token(x_profile: Optional[str] = Header(None)) -> None:
+    """Only callers holding PROFILE_TOKEN may read profiles; everyone else sees 404."""
+    if not profile_token_valid(x_profile):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def get_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded)$", description="'folded' returns flamegraph input")
+):
+    """Get a stored request profile (stack samples and SQL timing)."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse(folded_stacks(profile))
+    return profile
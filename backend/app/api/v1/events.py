@@ -0,0 +1,84 @@
+"""
+Server-Sent Events API endpoint for live portfolio changes.
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db
+from app.api.deps import get_current_user, get_stream_user
+from app.core.events import event_hub
+from app.core.security import StreamTicketsDisabled, create_stream_ticket
+from app.models.user import User
+
+router = APIRouter()
+
+# Reconnection delay suggested to EventSource clients
+RETRY_MS = 3000
+
+
+@router.post("/ticket")
+async def create_ticket(current_user: User = Depends(get_current_user)):
+    """
+    Issue a single-use ticket for opening the event stream.
+
+    EventSource cannot send an Authorization header, so browsers open
+    `/stream?ticket=...` instead. The ticket expires after
+    EVENTS_TICKET_SECONDS and works once: fetch a new one before reconnecting.
+    Answers 503 while SECRET_KEY is unfit to sign tickets.
+    """
+    if not settings.EVENTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event stream is disabled")
+    try:
+        ticket = create_stream_ticket(current_user.id)
+    except StreamTicketsDisabled:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Stream tickets are not configured")
+    return {"ticket": ticket, "expires_in": settings.EVENTS_TICKET_SECONDS}
+
+
+@router.get("/stream")
+async def stream_events(
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[str] = Query(None, description="Last event id seen, for clients reconnecting with a new EventSource"),
+    current_user: User = Depends(get_stream_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream the current user's portfolio changes as Server-Sent Events.
+
+    Events: asset.created/updated/deleted, transaction.created/updated,
+    policy.created/updated/deleted, each with a compact JSON delta, plus
+    `resync` when the client missed events and should reload its data.
+    Browsers authenticate with a ticket from POST /ticket, which works
+    once, so they reconnect with a new ticket and a new EventSource, passing
+    the last event id they saw as `since` (clients that can set headers
+    send Last-Event-ID) to receive the events they missed. Comment lines are
+    sent as heartbeats while idle.
+    """
+    if not settings.EVENTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event stream is disabled")
+
+    user_id = str(current_user.id)
+    # The stream can stay open for hours; give the pooled connection back now
+    db.close()
+
+    async def events():
+        subscription = event_hub.subscribe(user_id, last_event_id or since)
+        try:
+            yield b"retry: %d\n\n" % RETRY_MS
+            async for chunk in subscription.chunks():
+                yield chunk
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache, no-transform",
+            # Disable response buffering in nginx-style proxies
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -2,34 +2,55 @@
 Goals API endpoints for goal management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_read_db
 from app.models.user import User
 from app.models.user_goals import UserGoal
 from app.schemas.goals import GoalCreate, GoalUpdate, GoalResponse
+from app.core.serialization import ResponseSerializer, JSONBytesResponse
+from app.core.etag import user_data_etag, etag_matches, not_modified, with_etag
 from typing import List
 from uuid import UUID
 from datetime import datetime, date
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[GoalResponse])
-async def get_goals(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get all goals for the current user."""
+# Precompiled serializer for the goal list
+goals_serializer = ResponseSerializer(List[GoalResponse])
+
+def dump_goals(db: Session, current_user: User) -> bytes:
+    """Serialized list of the user's goals."""
     goals = db.query(UserGoal).filter(
         UserGoal.user_id == current_user.id
     ).all()
     
-    print(f"🎯 Found {len(goals)} goals for user {current_user.id}")
-    for goal in goals:
-        print(f"🎯 Goal: {goal.title}, type: {goal.goal_type}, target: {goal.target_amount}, completed: {goal.goal_completed}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Found %d goals", len(goals),
+            extra={"goals": [
+                {"title": goal.title, "type": goal.goal_type, "target": goal.target_amount, "completed": goal.goal_completed}
+                for goal in goals
+            ]}
+        )
     
-    return goals
+    return goals_serializer.dump(goals)
+
+@router.get("/", response_model=List[GoalResponse])
+async def get_goals(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get all goals for the current user."""
+    etag = user_data_etag(current_user, "goals")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return with_etag(JSONBytesResponse(dump_goals(db, current_user)), etag)
 
 @router.post("/", response_model=GoalResponse)
 async def create_goal(
@@ -43,7 +64,7 @@ async def create_goal(
     db.commit()
     db.refresh(db_goal)
     
-    print(f"🎯 Created goal: {db_goal.title} (id: {db_goal.id})")
+    logger.debug("Created goal: %s (id: %s)", db_goal.title, db_goal.id)
     
     return db_goal
 
@@ -51,7 +72,7 @@ async def create_goal(
 async def get_goal(
     goal_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific goal by ID."""
     goal = db.query(UserGoal).filter(
@@ -106,7 +127,7 @@ async def update_goal(
     db.commit()
     db.refresh(goal)
     
-    print(f"🎯 Updated goal: {goal.title} (id: {goal.id})")
+    logger.debug("Updated goal: %s (id: %s)", goal.title, goal.id)
     
     return goal
 
@@ -132,6 +153,6 @@ async def delete_goal(
     db.delete(goal)
     db.commit()
     
-    print(f"🎯 Deleted goal: {goal_title} (id: {goal_id})")
+    logger.debug("Deleted goal: %s (id: %s)", goal_title, goal_id)
     
     return {"message": "Goal deleted successfully", "goal_id": str(goal_id)}
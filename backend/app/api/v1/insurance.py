@@ -2,33 +2,53 @@
 Insurance API endpoints for insurance policy management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_read_db
 from app.models.user import User
 from app.models.insurance import InsurancePolicy
 from app.schemas.insurance import InsurancePolicy as InsurancePolicySchema, InsurancePolicyCreate, InsurancePolicyUpdate, InsurancePolicySummary
-from typing import List
+from app.services.insurance_hierarchy_service import InsuranceHierarchyService, DEFAULT_POLICIES_PER_TYPE
+from app.services.insurance_events_service import InsuranceEventsService, EVENT_TYPES
+from typing import List, Optional
 from uuid import UUID
-import httpx
+from app.core.http_client import outbound_client
 from app.core.config import settings
+from app.core.serialization import ResponseSerializer, JSONBytesResponse
+from app.core.etag import user_data_etag, etag_matches, not_modified, with_etag
+from app.core.response_cache import response_cache
+from app.core.events import emit_event, policy_delta
 from datetime import datetime
 import uuid as uuid_lib
 import os
 import secrets
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Precompiled serializer for the policy list
+policies_serializer = ResponseSerializer(List[InsurancePolicySchema])
+
+def dump_policies(db: Session, current_user: User) -> bytes:
+    """Serialized list of the user's insurance policies."""
+    policies = db.query(InsurancePolicy).filter(InsurancePolicy.user_id == current_user.id).all()
+    return policies_serializer.dump(policies)
+
 @router.get("/", response_model=List[InsurancePolicySchema])
 async def get_insurance_policies(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all insurance policies for the current user."""
-    policies = db.query(InsurancePolicy).filter(InsurancePolicy.user_id == current_user.id).all()
-    return policies
+    etag = user_data_etag(current_user, "insurance")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return with_etag(JSONBytesResponse(dump_policies(db, current_user)), etag)
 
 @router.post("/", response_model=InsurancePolicySchema)
 async def create_insurance_policy(
@@ -38,44 +58,44 @@ async def create_insurance_policy(
 ):
     """Create a new insurance policy."""
     try:
-        print(f"🔍 [DEBUG] Raw policy data received: {policy.dict()}")
-        print(f"🔍 [DEBUG] Policy data types: {[(k, type(v)) for k, v in policy.dict().items()]}")
-        print(f"🔍 [DEBUG] CREATE POLICY - Date fields: start_date={policy.start_date}, end_date={policy.end_date}, renewal_date={policy.renewal_date}")
-
         # Convert Pydantic model to dict and handle the metadata field mapping
         policy_data = policy.dict()
-
-        print(f"🔍 [DEBUG] Policy data after dict conversion: {policy_data}")
-        print(f"🔍 [DEBUG] About to create InsurancePolicy with user_id: {current_user.id}")
-        print(f"🔍 [DEBUG] Policy data to DB: start_date={policy_data.get('start_date')}, end_date={policy_data.get('end_date')}, renewal_date={policy_data.get('renewal_date')}")
+        logger.debug("Create policy payload: %s", policy_data)
 
         db_policy = InsurancePolicy(**policy_data, user_id=current_user.id)
-        print(f"🔍 [DEBUG] CREATE POLICY - DB object dates before save: start={db_policy.start_date}, end={db_policy.end_date}, renewal={db_policy.renewal_date}")
         db.add(db_policy)
+        emit_event(db, current_user.id, "policy.created", lambda: policy_delta(db_policy))
         db.commit()
         db.refresh(db_policy)
 
-        print(f"🔍 [DEBUG] CREATE POLICY - After save: start={db_policy.start_date}, end={db_policy.end_date}, renewal={db_policy.renewal_date}")
-        print(f"🔍 [DEBUG] Policy saved successfully with ID: {db_policy.id}")
+        logger.debug(
+            "Created policy %s: start=%s end=%s renewal=%s",
+            db_policy.id, db_policy.start_date, db_policy.end_date, db_policy.renewal_date
+        )
         return db_policy
     except Exception as e:
         db.rollback()
-        print(f"❌ Error creating insurance policy: {e}")
-        print(f"❌ Error type: {type(e)}")
-        print(f"❌ Policy data received: {policy.dict()}")
-        import traceback
-        print(f"❌ Full traceback: {traceback.format_exc()}")
+        logger.error(f"Error creating insurance policy: {e}", exc_info=True)
+        logger.debug("Rejected policy payload: %s", policy.dict())
         raise HTTPException(status_code=422, detail=f"Failed to create policy: {str(e)}")
 
 @router.get("/hierarchy")
 async def get_insurance_hierarchy(
+    policies_per_type: int = Query(DEFAULT_POLICIES_PER_TYPE, ge=0, le=500),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get insurance policies organized hierarchically by type.
     Returns a structure suitable for visualization in a mind map.
     
+    Totals are aggregated in SQL (GROUP BY ROLLUP) and only the top
+    `policies_per_type` policies by coverage are returned for each type.
+    Use /hierarchy/{policy_type}/policies to page through the rest.
+    Policies without a type are grouped with "type": null; page through
+    those with /hierarchy/untyped-policies.
+    The result is cached until the user's data changes.
+    
     Structure:
     {
         "root": {
@@ -90,6 +110,7 @@ async def get_insurance_hierarchy(
                 "total_coverage": float,
                 "total_annual_premium": float,
                 "policy_count": int,
+                "has_more_policies": bool,
                 "policies": [
                     {
                         "id": "uuid",
@@ -105,130 +126,93 @@ async def get_insurance_hierarchy(
     }
     """
     try:
-        # Fetch only active policies for the current user
-        policies = db.query(InsurancePolicy).filter(
-            InsurancePolicy.user_id == current_user.id,
-            InsurancePolicy.status == 'active'
-        ).all()
-        
-        if not policies:
-            return {
-                "root": {
-                    "total_coverage": 0,
-                    "total_annual_premium": 0,
-                    "policy_count": 0
-                },
-                "types": []
-            }
-        
-        # Helper function to annualize premiums
-        def annualize_premium(premium_amount, premium_frequency):
-            if not premium_amount:
-                return 0.0
-            
-            freq_map = {
-                'monthly': 12,
-                'quarterly': 4,
-                'annually': 1,
-                'annual': 1
-            }
-            
-            # Handle None premium_frequency safely
-            freq_lower = premium_frequency.lower() if premium_frequency else 'annually'
-            multiplier = freq_map.get(freq_lower, 1)
-            return float(premium_amount) * multiplier
-        
-        # Type labels mapping
-        type_labels = {
-            'life': 'Life Insurance',
-            'health': 'Health Insurance',
-            'auto': 'Auto Insurance',
-            'home': 'Home Insurance',
-            'loan': 'Loan Insurance',
-            'travel': 'Travel Insurance',
-            'asset': 'Asset Insurance',
-            'factory': 'Factory Insurance',
-            'fire': 'Fire Insurance'
-        }
-        
-        # Group policies by type
-        types_data = {}
-        total_coverage = 0
-        total_annual_premium = 0
-        
-        for policy in policies:
-            policy_type = policy.policy_type or 'other'
-            
-            # Calculate annualized premium for this policy
-            # Ensure we have actual Python values, not SQLAlchemy Column objects
-            # Note: type: ignore comments are for Pylance - at runtime these are Decimal/None, not Column objects
-            premium_amt = float(policy.premium_amount) if policy.premium_amount is not None else 0.0  # type: ignore
-            annual_premium = annualize_premium(premium_amt, policy.premium_frequency)
-            coverage = float(policy.coverage_amount) if policy.coverage_amount is not None else 0.0  # type: ignore
-            
-            # Add to totals
-            total_coverage += coverage
-            total_annual_premium += annual_premium
-            
-            # Initialize type group if not exists
-            if policy_type not in types_data:
-                # Ensure policy_type is a string, not a Column
-                policy_type_str = str(policy_type) if policy_type else 'other'  # type: ignore
-                types_data[policy_type] = {
-                    'type': policy_type_str,
-                    'type_label': type_labels.get(policy_type_str, policy_type_str.capitalize() + ' Insurance'),
-                    'total_coverage': 0.0,
-                    'total_annual_premium': 0.0,
-                    'policy_count': 0,
-                    'policies': []
-                }
-            
-            # Add to type totals
-            types_data[policy_type]['total_coverage'] += coverage
-            types_data[policy_type]['total_annual_premium'] += annual_premium
-            types_data[policy_type]['policy_count'] += 1
-            
-            # Add individual policy data - ensure all values are Python primitives
-            types_data[policy_type]['policies'].append({
-                'id': str(policy.id),
-                'name': str(policy.policy_name) if policy.policy_name else 'Unnamed Policy',  # type: ignore
-                'coverage': coverage,
-                'annual_premium': annual_premium,
-                'provider': str(policy.provider) if policy.provider else 'Unknown Provider',  # type: ignore
-                'status': str(policy.status) if policy.status else 'active',  # type: ignore
-                'policy_number': str(policy.policy_number) if policy.policy_number else None  # type: ignore
-            })
-        
-        # Convert dict to sorted list
-        types_list = sorted(
-            types_data.values(),
-            key=lambda x: x['total_coverage'],
-            reverse=True
+        return await response_cache.response(
+            current_user, "insurance_hierarchy", {"policies_per_type": policies_per_type},
+            lambda: InsuranceHierarchyService.build_hierarchy(db, current_user.id, policies_per_type)
         )
-        
-        return {
-            'root': {
-                'total_coverage': total_coverage,
-                'total_annual_premium': total_annual_premium,
-                'policy_count': len(policies)
-            },
-            'types': types_list
-        }
-        
     except Exception as e:
-        print(f"Error generating insurance hierarchy: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+        logger.error(f"Error generating insurance hierarchy: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate insurance hierarchy: {str(e)}"
+            detail="Failed to generate insurance hierarchy"
         )
 
+def hierarchy_policies_page(
+    db: Session, current_user: User, policy_type: Optional[str], limit: int, offset: int
+) -> dict:
+    """One drill-down page of active policies of `policy_type` (None: without a type)."""
+    policies = InsuranceHierarchyService.get_type_policies(
+        db, current_user.id, policy_type, limit=limit, offset=offset
+    )
+    return {
+        "type": policy_type,
+        "policies": policies,
+        "limit": limit,
+        "offset": offset
+    }
+
+@router.get("/hierarchy/untyped-policies")
+async def get_insurance_hierarchy_untyped_policies(
+    limit: int = Query(DEFAULT_POLICIES_PER_TYPE, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get active policies without a type for on-demand mind map drill-down."""
+    return hierarchy_policies_page(db, current_user, None, limit, offset)
+
+@router.get("/hierarchy/{policy_type}/policies")
+async def get_insurance_hierarchy_policies(
+    policy_type: str,
+    limit: int = Query(DEFAULT_POLICIES_PER_TYPE, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get active policies of one type for on-demand mind map drill-down."""
+    return hierarchy_policies_page(db, current_user, policy_type, limit, offset)
+
+@router.get("/upcoming-events")
+async def get_upcoming_insurance_events(
+    days_ahead: int = Query(30, ge=1, le=366),
+    event_types: Optional[List[str]] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get upcoming renewals, expiries and premium due dates for active policies.
+    Events are sorted by date; use limit/offset to page through them.
+    """
+    if event_types:
+        invalid = [t for t in event_types if t not in EVENT_TYPES]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid event_types: {', '.join(invalid)}. Allowed: {', '.join(EVENT_TYPES)}"
+            )
+    
+    result = InsuranceEventsService.get_upcoming_events(
+        db,
+        current_user.id,
+        days_ahead=days_ahead,
+        event_types=event_types,
+        limit=limit,
+        offset=offset
+    )
+    return {
+        **result,
+        "days_ahead": days_ahead,
+        "limit": limit,
+        "offset": offset
+    }
+
 @router.get("/{policy_id}", response_model=InsurancePolicySchema)
 async def get_insurance_policy(
     policy_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific insurance policy by ID."""
     policy = db.query(InsurancePolicy).filter(
@@ -253,10 +237,6 @@ async def update_insurance_policy(
 ):
     """Update an existing insurance policy."""
     try:
-        print(f"🔍 [DEBUG] UPDATE POLICY - Policy ID: {policy_id}")
-        print(f"🔍 [DEBUG] UPDATE POLICY - Raw update data: {policy_update.dict()}")
-        print(f"🔍 [DEBUG] UPDATE POLICY - Date fields: start_date={policy_update.start_date}, end_date={policy_update.end_date}, renewal_date={policy_update.renewal_date}")
-
         policy = db.query(InsurancePolicy).filter(
             InsurancePolicy.id == policy_id,
             InsurancePolicy.user_id == current_user.id
@@ -268,28 +248,24 @@ async def update_insurance_policy(
                 detail="Insurance policy not found"
             )
 
-        print(f"🔍 [DEBUG] UPDATE POLICY - Found policy: {policy.policy_name}")
-        print(f"🔍 [DEBUG] UPDATE POLICY - Current dates: start={policy.start_date}, end={policy.end_date}, renewal={policy.renewal_date}")
-
         update_data = policy_update.dict(exclude_unset=True)
-        print(f"🔍 [DEBUG] UPDATE POLICY - Update data after exclude_unset: {update_data}")
-        print(f"🔍 [DEBUG] Update data to DB: start_date={update_data.get('start_date')}, end_date={update_data.get('end_date')}, renewal_date={update_data.get('renewal_date')}")
+        logger.debug("Update policy %s with: %s", policy_id, update_data)
 
         for field, value in update_data.items():
-            print(f"🔍 [DEBUG] UPDATE POLICY - Setting {field} = {value} (type: {type(value)})")
             setattr(policy, field, value)
 
+        emit_event(db, current_user.id, "policy.updated", lambda: policy_delta(policy))
         db.commit()
         db.refresh(policy)
 
-        print(f"🔍 [DEBUG] UPDATE POLICY - After update: start={policy.start_date}, end={policy.end_date}, renewal={policy.renewal_date}")
+        logger.debug(
+            "Updated policy %s: start=%s end=%s renewal=%s",
+            policy.id, policy.start_date, policy.end_date, policy.renewal_date
+        )
         return policy
     except Exception as e:
         db.rollback()
-        print(f"❌ UPDATE POLICY ERROR: {e}")
-        print(f"❌ UPDATE POLICY ERROR type: {type(e)}")
-        import traceback
-        print(f"❌ UPDATE POLICY Full traceback: {traceback.format_exc()}")
+        logger.error(f"Error updating insurance policy {policy_id}: {e}", exc_info=True)
         raise HTTPException(status_code=422, detail=f"Failed to update policy: {str(e)}")
 
 @router.delete("/{policy_id}")
@@ -311,6 +287,7 @@ async def delete_insurance_policy(
         )
     
     db.delete(policy)
+    emit_event(db, current_user.id, "policy.deleted", {"id": str(policy_id)})
     db.commit()
     return {"message": "Document deleted successfully"}
 
@@ -322,9 +299,9 @@ async def ensure_storage_bucket_exists(bucket_name: str = "asset-documents") ->
     Uses the same bucket as assets for consistent storage structure.
     """
     try:
-        print(f"🔍 Checking if bucket '{bucket_name}' exists...")
+        logger.debug("Checking if bucket '%s' exists...", bucket_name)
         
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             # First, try to get bucket info
             response = await client.get(
                 f"{settings.SUPABASE_URL}/storage/v1/bucket/{bucket_name}",
@@ -335,11 +312,11 @@ async def ensure_storage_bucket_exists(bucket_name: str = "asset-documents") ->
             )
             
             if response.status_code == 200:
-                print(f"✅ Bucket '{bucket_name}' already exists")
+                logger.debug("Bucket '%s' already exists", bucket_name)
                 return True
             
             # Bucket doesn't exist, create it
-            print(f"📦 Creating bucket '{bucket_name}'...")
+            logger.debug("Creating bucket '%s'...", bucket_name)
             create_response = await client.post(
                 f"{settings.SUPABASE_URL}/storage/v1/bucket",
                 headers={
@@ -356,14 +333,14 @@ async def ensure_storage_bucket_exists(bucket_name: str = "asset-documents") ->
             )
             
             if create_response.status_code in [200, 201]:
-                print(f"✅ Bucket '{bucket_name}' created successfully")
+                logger.debug("Bucket '%s' created successfully", bucket_name)
                 return True
             else:
-                print(f"❌ Failed to create bucket: {create_response.status_code} - {create_response.text}")
+                logger.warning(f"Failed to create bucket: {create_response.status_code} - {create_response.text}")
                 return False
                 
     except Exception as e:
-        print(f"❌ Error ensuring bucket exists: {str(e)}")
+        logger.error(f"Error ensuring bucket exists: {e}", exc_info=True)
         return False
 
 
@@ -374,13 +351,13 @@ async def ensure_user_folder_exists(user_id: UUID, bucket_name: str = "asset-doc
     """
     try:
         user_id_str = str(user_id)
-        print(f"🔍 Checking if user folder '{user_id_str}/' exists in bucket '{bucket_name}'...")
+        logger.debug("Checking if user folder '%s/' exists in bucket '%s'...", user_id_str, bucket_name)
         
         # Create a placeholder file to ensure the folder exists
         placeholder_filename = f"{user_id_str}/.folder_placeholder"
         placeholder_content = f"User folder created for {user_id_str}"
         
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             # Check if folder already has files (indicating it exists)
             list_response = await client.post(
                 f"{settings.SUPABASE_URL}/storage/v1/object/list/{bucket_name}",
@@ -397,11 +374,11 @@ async def ensure_user_folder_exists(user_id: UUID, bucket_name: str = "asset-doc
             if list_response.status_code == 200:
                 files = list_response.json()
                 if files and len(files) > 0:
-                    print(f"✅ User folder '{user_id_str}/' already exists with {len(files)} files")
+                    logger.debug("User folder '%s/' already exists with %s files", user_id_str, len(files))
                     return True
             
             # Folder doesn't exist or is empty, create placeholder
-            print(f"📁 Creating user folder '{user_id_str}/' with placeholder...")
+            logger.debug("Creating user folder '%s/' with placeholder...", user_id_str)
             upload_response = await client.post(
                 f"{settings.SUPABASE_URL}/storage/v1/object/{bucket_name}/{placeholder_filename}",
                 headers={
@@ -412,14 +389,14 @@ async def ensure_user_folder_exists(user_id: UUID, bucket_name: str = "asset-doc
             )
             
             if upload_response.status_code in [200, 201]:
-                print(f"✅ User folder '{user_id_str}/' created successfully")
+                logger.debug("User folder '%s/' created successfully", user_id_str)
                 return True
             else:
-                print(f"❌ Failed to create user folder: {upload_response.status_code} - {upload_response.text}")
+                logger.warning(f"Failed to create user folder: {upload_response.status_code} - {upload_response.text}")
                 return False
                 
     except Exception as e:
-        print(f"❌ Error ensuring user folder exists: {str(e)}")
+        logger.error(f"Error ensuring user folder exists: {e}", exc_info=True)
         return False
 
 
@@ -429,7 +406,7 @@ async def ensure_user_folder_exists(user_id: UUID, bucket_name: str = "asset-doc
 async def get_insurance_documents(
     policy_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get documents for an insurance policy."""
     
@@ -471,12 +448,10 @@ async def upload_insurance_document(
 ):
     """Upload a document for an insurance policy."""
     
-    print(f"🔄 Document upload started:")
-    print(f"   Policy ID: {policy_id}")
-    print(f"   User ID: {current_user.id}")
-    print(f"   File: {file.filename}")
-    print(f"   Content Type: {file.content_type}")
-    print(f"   Supabase URL: {settings.SUPABASE_URL}")
+    logger.info(
+        "Document upload started",
+        extra={"policy_id": str(policy_id), "filename": file.filename, "content_type": file.content_type}
+    )
     
     # Validate policy exists and belongs to user
     policy = db.query(InsurancePolicy).filter(
@@ -485,31 +460,31 @@ async def upload_insurance_document(
     ).first()
     
     if not policy:
-        print(f"❌ Policy not found: {policy_id} for user {current_user.id}")
+        logger.warning(f"Policy not found: {policy_id} for user {current_user.id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Insurance policy not found"
         )
     
-    print(f"✅ Policy found: {policy.policy_name} (type: {policy.policy_type})")
+    logger.debug("Policy found: %s (type: %s)", policy.policy_name, policy.policy_type)
     
     # Validate file type
     allowed_types = ["application/pdf", "image/jpeg", "image/jpg", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
     if file.content_type not in allowed_types:
-        print(f"❌ Invalid file type: {file.content_type}")
+        logger.warning(f"Invalid file type: {file.content_type}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type not allowed. Allowed types: PDF, JPEG, DOCX"
         )
     
-    print(f"✅ File type validated: {file.content_type}")
+    logger.debug("File type validated: %s", file.content_type)
     
     # Validate file size (3MB limit)
     content = await file.read()
-    print(f"📄 File size: {len(content)} bytes ({len(content) / (1024*1024):.2f} MB)")
+    logger.debug("File size: %d bytes", len(content))
     
     if len(content) > 3 * 1024 * 1024:  # 3MB
-        print(f"❌ File too large: {len(content)} bytes")
+        logger.warning(f"File too large: {len(content)} bytes")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File size exceeds 3MB limit"
@@ -531,37 +506,35 @@ async def upload_insurance_document(
     file_extension = file.filename.split('.')[-1] if file.filename and '.' in file.filename else 'bin'
     unique_filename = f"{current_user.id}/{policy_id}_{secrets.token_hex(8)}.{file_extension}"
     
-    print(f"📁 Generated filename: {unique_filename}")
+    logger.debug("Generated filename: %s", unique_filename)
     
     try:
         # Ensure the storage bucket exists
-        print(f"🚃 Checking/creating storage bucket...")
+        logger.debug("Checking/creating storage bucket...")
         bucket_exists = await ensure_storage_bucket_exists("asset-documents")
         if not bucket_exists:
-            print(f"❌ Failed to create/access storage bucket")
+            logger.warning("Failed to create/access storage bucket")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Storage service configuration error"
             )
-        print(f"✅ Storage bucket ready")
+        logger.debug("Storage bucket ready")
         
         # Ensure the user-specific folder exists
-        print(f"👤 Checking/creating user folder...")
+        logger.debug("Checking/creating user folder...")
         user_folder_exists = await ensure_user_folder_exists(UUID(str(current_user.id)), "asset-documents")
         if not user_folder_exists:
-            print(f"❌ Failed to create/access user folder")
+            logger.warning("Failed to create/access user folder")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="User storage folder configuration error"
             )
-        print(f"✅ User folder ready")
+        logger.debug("User folder ready")
         
         # Upload to Supabase Storage using REST API
-        print(f"📤 Uploading to Supabase Storage...")
-        async with httpx.AsyncClient() as client:
+        logger.debug("Uploading to Supabase Storage...")
+        async with outbound_client() as client:
             upload_url = f"{settings.SUPABASE_URL}/storage/v1/object/asset-documents/{unique_filename}"
-            print(f"   Upload URL: {upload_url}")
-            
             response = await client.post(
                 upload_url,
                 headers={
@@ -571,20 +544,17 @@ async def upload_insurance_document(
                 content=content
             )
             
-            print(f"📡 Upload response: {response.status_code}")
-            print(f"   Response text: {response.text}")
-            
             if response.status_code not in [200, 201]:
-                print(f"❌ Storage upload failed: {response.status_code} - {response.text}")
+                logger.warning(f"Storage upload failed: {response.status_code} - {response.text}")
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to upload file to storage"
                 )
         
-        print(f"✅ File uploaded to storage successfully")
+        logger.debug("File uploaded to storage successfully")
         
         # Update policy with document information
-        print(f"💾 Updating policy with document metadata...")
+        logger.debug("Updating policy with document metadata...")
         update_data = {
             "document_path": unique_filename,
             "document_name": file.filename,
@@ -593,7 +563,7 @@ async def upload_insurance_document(
             "document_uploaded_at": datetime.utcnow()
         }
         
-        print(f"   Document data: {update_data}")
+        logger.debug("Document data: %s", update_data)
         
         for field, value in update_data.items():
             setattr(policy, field, value)
@@ -601,10 +571,10 @@ async def upload_insurance_document(
         db.commit()
         db.refresh(policy)
         
-        print(f"✅ Document upload completed successfully!")
-        print(f"   Policy ID: {policy.id}")
-        print(f"   Document path: {policy.document_path}")
-        print(f"   Document name: {policy.document_name}")
+        logger.info(
+            "Document upload completed",
+            extra={"policy_id": str(policy.id), "document_path": policy.document_path}
+        )
         
         return {
             "message": "Document uploaded successfully",
@@ -617,11 +587,11 @@ async def upload_insurance_document(
         # Re-raise HTTP exceptions (like bucket creation failure)
         raise
     except Exception as e:
-        print(f"🚨 Document upload error: {str(e)}")
-        print(f"   File: {file.filename if file and file.filename else 'unknown'}")
-        print(f"   Content type: {file.content_type if file else 'unknown'}")
-        print(f"   Policy ID: {policy_id}")
-        print(f"   User ID: {current_user.id}")
+        logger.error(
+            f"Document upload error: {e}",
+            extra={"policy_id": str(policy_id), "filename": file.filename if file else None},
+            exc_info=True
+        )
         
         # Check if it's a storage-related error
         if "storage" in str(e).lower() or "supabase" in str(e).lower():
@@ -639,7 +609,7 @@ async def upload_insurance_document(
 async def download_insurance_document(
     policy_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Download a document for an insurance policy."""
     
@@ -658,7 +628,7 @@ async def download_insurance_document(
     
     try:
         # Get download URL from Supabase Storage
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             response = await client.post(
                 f"{settings.SUPABASE_URL}/storage/v1/object/sign/asset-documents/{policy.document_path}",
                 headers={
@@ -686,7 +656,7 @@ async def download_insurance_document(
             }
             
     except Exception as e:
-        print(f"Document download error: {str(e)}")
+        logger.error(f"Document download error: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate download URL"
@@ -719,7 +689,7 @@ async def delete_insurance_document(
     
     try:
         # Delete from Supabase Storage
-        async with httpx.AsyncClient() as client:
+        async with outbound_client() as client:
             response = await client.delete(
                 f"{settings.SUPABASE_URL}/storage/v1/object/asset-documents/{document_path}",
                 headers={
@@ -729,7 +699,7 @@ async def delete_insurance_document(
             
             # Note: Supabase may return 404 if file doesn't exist, which is acceptable
             if response.status_code not in [200, 204, 404]:
-                print(f"Storage deletion warning: {response.status_code} - {response.text}")
+                logger.warning(f"Storage deletion warning: {response.status_code} - {response.text}")
         
         # Clear document fields from policy
         clear_data = {
@@ -751,7 +721,7 @@ async def delete_insurance_document(
         }
         
     except Exception as e:
-        print(f"Document deletion error: {str(e)}")
+        logger.error(f"Document deletion error: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete document"
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timedelta
 import uuid
@@ -9,10 +9,13 @@ from app.schemas.payment_schedule import (
     PaymentSchedule, 
     PaymentScheduleCreate, 
     PaymentScheduleUpdate,
-    PaymentProjection
+    PaymentProjection,
+    CashFlowCalendar
 )
 from app.models.payment_schedule import PaymentSchedule as PaymentScheduleModel
 from app.models.user import User
+from app.services.payment_schedule_service import PaymentScheduleService
+from app.services.payment_projection import add_months, next_occurrence_after, occurrence_dates, project_cash_flow
 
 router = APIRouter()
 
@@ -59,6 +62,56 @@ def get_upcoming_payments(
     
     return schedules
 
+@router.get("/upcoming-cash-flow", response_model=CashFlowCalendar)
+def get_upcoming_cash_flow(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    days_ahead: int = Query(30, ge=1, le=3660),
+    granularity: str = Query("month", pattern="^(month|quarter|year)$")
+):
+    """Get every payment due in the next N days across all active schedules, with per-period totals"""
+    return PaymentScheduleService.get_upcoming_cash_flow(
+        db,
+        current_user.id,
+        days_ahead=days_ahead,
+        granularity=granularity
+    )
+
+@router.get("/cash-flow", response_model=CashFlowCalendar)
+def get_cash_flow_calendar(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    months: int = Query(12, ge=1, le=600),
+    granularity: str = Query("month", pattern="^(month|quarter|year)$"),
+    include_payments: bool = False
+):
+    """Project all active schedules into an aggregated cash-flow calendar"""
+    schedules = db.query(PaymentScheduleModel).filter(
+        PaymentScheduleModel.user_id == current_user.id,
+        PaymentScheduleModel.is_active == True,
+        PaymentScheduleModel.next_payment_date.isnot(None)
+    ).all()
+    
+    start_date = date.today()
+    end_date = add_months(start_date, months) - timedelta(days=1)
+    
+    calendar = project_cash_flow(
+        schedules,
+        window_start=start_date,
+        window_end=end_date,
+        granularity=granularity,
+        include_payments=include_payments
+    )
+    
+    return CashFlowCalendar(
+        start_date=start_date,
+        end_date=end_date,
+        granularity=granularity,
+        **calendar
+    )
+
 @router.get("/{schedule_id}", response_model=PaymentSchedule)
 def get_payment_schedule(
     *,
@@ -161,11 +214,15 @@ def record_payment(
     schedule.total_payments_made += 1
     schedule.total_amount_paid += payment_amount
     
-    # Calculate next payment date
-    next_date = calculate_next_payment_date(payment_date, schedule.frequency)
+    # The payment settles the current occurrence; the next one is start_date + n * step
+    next_date = calculate_next_payment_date(
+        schedule.start_date,
+        schedule.frequency,
+        schedule.next_payment_date or payment_date
+    )
     
     # Check if we've reached the end date
-    if schedule.end_date and next_date > schedule.end_date:
+    if next_date is None or (schedule.end_date and next_date > schedule.end_date):
         schedule.is_active = False
         schedule.next_payment_date = None
     else:
@@ -200,22 +257,18 @@ def get_payment_projection(
     if not schedule.next_payment_date:
         return []
     
-    projection = []
-    current_date = schedule.next_payment_date
+    dates = occurrence_dates(
+        schedule.start_date,
+        schedule.frequency,
+        window_start=schedule.next_payment_date,
+        end_date=schedule.end_date,
+        max_periods=periods
+    )
     
-    for i in range(periods):
-        # Check if we've reached the end date
-        if schedule.end_date and current_date > schedule.end_date:
-            break
-        
-        projection.append(PaymentProjection(
-            date=current_date,
-            amount=schedule.amount,
-            period=i + 1
-        ))
-        
-        # Calculate next payment date
-        current_date = calculate_next_payment_date(current_date, schedule.frequency)
+    projection = [
+        PaymentProjection(date=payment_date, amount=schedule.amount, period=i + 1)
+        for i, payment_date in enumerate(dates)
+    ]
     
     return projection
 
@@ -243,26 +296,6 @@ def delete_payment_schedule(
     
     return {"message": "Payment schedule deleted successfully"}
 
-def calculate_next_payment_date(current_date: date, frequency: str) -> date:
-    """Calculate the next payment date based on frequency"""
-    if frequency == "monthly":
-        if current_date.month == 12:
-            return current_date.replace(year=current_date.year + 1, month=1)
-        else:
-            return current_date.replace(month=current_date.month + 1)
-    elif frequency == "quarterly":
-        new_month = current_date.month + 3
-        if new_month > 12:
-            return current_date.replace(year=current_date.year + 1, month=new_month - 12)
-        else:
-            return current_date.replace(month=new_month)
-    elif frequency == "semi-annually":
-        new_month = current_date.month + 6
-        if new_month > 12:
-            return current_date.replace(year=current_date.year + 1, month=new_month - 12)
-        else:
-            return current_date.replace(month=new_month)
-    elif frequency == "annually":
-        return current_date.replace(year=current_date.year + 1)
-    else:
-        return current_date
+def calculate_next_payment_date(start_date: date, frequency: str, paid_date: date) -> Optional[date]:
+    """Calculate the first payment date after paid_date, counted in whole periods from start_date"""
+    return next_occurrence_after(start_date, frequency, paid_date)
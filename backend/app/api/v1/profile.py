@@ -40,50 +40,54 @@ async def get_countries():
     ]
 
 
+# Options for the profile dropdowns (also served by /api/v1/bootstrap)
+PROFILE_OPTIONS = {
+    "marital_status_options": [
+        {"value": "single", "label": "Single"},
+        {"value": "married", "label": "Married"},
+        {"value": "divorced", "label": "Divorced"},
+        {"value": "widowed", "label": "Widowed"},
+        {"value": "separated", "label": "Separated"}
+    ],
+    "gender_options": [
+        {"value": "male", "label": "Male"},
+        {"value": "female", "label": "Female"},
+        {"value": "other", "label": "Other"},
+        {"value": "prefer_not_to_say", "label": "Prefer not to say"}
+    ],
+    "occupation_options": [
+        {"value": "employed", "label": "Employed"},
+        {"value": "self_employed", "label": "Self Employed"},
+        {"value": "unemployed", "label": "Unemployed"},
+        {"value": "retired", "label": "Retired"},
+        {"value": "student", "label": "Student"},
+        {"value": "homemaker", "label": "Homemaker"},
+        {"value": "other", "label": "Other"}
+    ],
+    "risk_appetite_options": [
+        {
+            "value": "Low", 
+            "label": "Low", 
+            "description": "Conservative approach, prioritizing capital preservation over growth"
+        },
+        {
+            "value": "Moderate", 
+            "label": "Moderate", 
+            "description": "Balanced approach between growth potential and risk management"
+        },
+        {
+            "value": "High", 
+            "label": "High", 
+            "description": "Aggressive approach, accepting higher risk for potential greater returns"
+        }
+    ]
+}
+
+
 @router.get("/options")
 async def get_profile_options():
     """Get available options for profile dropdowns."""
-    return {
-        "marital_status_options": [
-            {"value": "single", "label": "Single"},
-            {"value": "married", "label": "Married"},
-            {"value": "divorced", "label": "Divorced"},
-            {"value": "widowed", "label": "Widowed"},
-            {"value": "separated", "label": "Separated"}
-        ],
-        "gender_options": [
-            {"value": "male", "label": "Male"},
-            {"value": "female", "label": "Female"},
-            {"value": "other", "label": "Other"},
-            {"value": "prefer_not_to_say", "label": "Prefer not to say"}
-        ],
-        "occupation_options": [
-            {"value": "employed", "label": "Employed"},
-            {"value": "self_employed", "label": "Self Employed"},
-            {"value": "unemployed", "label": "Unemployed"},
-            {"value": "retired", "label": "Retired"},
-            {"value": "student", "label": "Student"},
-            {"value": "homemaker", "label": "Homemaker"},
-            {"value": "other", "label": "Other"}
-        ],
-        "risk_appetite_options": [
-            {
-                "value": "Low", 
-                "label": "Low", 
-                "description": "Conservative approach, prioritizing capital preservation over growth"
-            },
-            {
-                "value": "Moderate", 
-                "label": "Moderate", 
-                "description": "Balanced approach between growth potential and risk management"
-            },
-            {
-                "value": "High", 
-                "label": "High", 
-                "description": "Aggressive approach, accepting higher risk for potential greater returns"
-            }
-        ]
-    }
+    return PROFILE_OPTIONS
 
 
 @router.get("", response_model=UserProfile)
@@ -8,8 +8,8 @@ from typing import List, Dict, Any, Optional
 from uuid import UUID
 import logging
 
-from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_read_db
+from app.core.response_cache import response_cache
 from app.models.user import User
 from app.models.asset import Asset
 from pydantic import BaseModel, Field
@@ -251,10 +251,58 @@ def build_hierarchy_tree(
     }
 
 
+def compute_asset_hierarchy(db: Session, current_user: User, request: HierarchyRequest) -> HierarchyResponse:
+    """Build the asset hierarchy for the user's active assets."""
+    logger.info(f"Generating asset hierarchy for user {current_user.id}")
+    logger.info(f"Hierarchy order: {request.hierarchy}, Depth: {request.depth}")
+
+    # Fetch all active assets for user
+    assets = db.query(Asset).filter(
+        Asset.user_id == current_user.id,
+        Asset.current_value.isnot(None),
+        Asset.current_value > 0,
+        Asset.quantity.isnot(None),
+        Asset.quantity > 0
+    ).all()
+
+    if not assets:
+        # Return empty hierarchy
+        return HierarchyResponse(
+            total_value=0.0,
+            currency="GBP",
+            nodes=[HierarchyNode(
+                id="root",
+                label="My Assets",
+                value=0.0,
+                percentage=100.0,
+                level=0,
+                category="root",
+                children=[],
+                asset_count=0
+            )],
+            edges=[],
+            asset_count=0
+        )
+
+    # Build hierarchy tree
+    # Get user's currency preference, defaulting to GBP
+    user_currency: str = getattr(current_user, 'currency', None) or "GBP"  # type: ignore
+    hierarchy_data = build_hierarchy_tree(
+        assets=assets,
+        hierarchy_order=request.hierarchy,
+        depth=request.depth,
+        currency=user_currency
+    )
+
+    logger.info(f"Successfully generated hierarchy with {len(hierarchy_data['nodes'])} nodes")
+
+    return HierarchyResponse(**hierarchy_data)
+
+
 @router.post("/asset-hierarchy", response_model=HierarchyResponse)
 async def get_asset_hierarchy(
     request: HierarchyRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -270,53 +318,14 @@ async def get_asset_hierarchy(
         
     Returns:
         Hierarchical tree with nodes and edges for visualization
+        (cached until the user's data changes)
     """
     try:
-        logger.info(f"Generating asset hierarchy for user {current_user.id}")
-        logger.info(f"Hierarchy order: {request.hierarchy}, Depth: {request.depth}")
-        
-        # Fetch all active assets for user
-        assets = db.query(Asset).filter(
-            Asset.user_id == current_user.id,
-            Asset.current_value.isnot(None),
-            Asset.current_value > 0,
-            Asset.quantity.isnot(None),
-            Asset.quantity > 0
-        ).all()
-        
-        if not assets:
-            # Return empty hierarchy
-            return HierarchyResponse(
-                total_value=0.0,
-                currency="GBP",
-                nodes=[HierarchyNode(
-                    id="root",
-                    label="My Assets",
-                    value=0.0,
-                    percentage=100.0,
-                    level=0,
-                    category="root",
-                    children=[],
-                    asset_count=0
-                )],
-                edges=[],
-                asset_count=0
-            )
-        
-        # Build hierarchy tree
-        # Get user's currency preference, defaulting to GBP
-        user_currency: str = getattr(current_user, 'currency', None) or "GBP"  # type: ignore
-        hierarchy_data = build_hierarchy_tree(
-            assets=assets,
-            hierarchy_order=request.hierarchy,
-            depth=request.depth,
-            currency=user_currency
+        return await response_cache.response(
+            current_user, "asset_hierarchy", request.model_dump(),
+            lambda: compute_asset_hierarchy(db, current_user, request)
         )
         
-        logger.info(f"Successfully generated hierarchy with {len(hierarchy_data['nodes'])} nodes")
-        
-        return HierarchyResponse(**hierarchy_data)
-        
     except Exception as e:
         logger.error(f"Error generating asset hierarchy: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to generate asset hierarchy: {str(e)}")
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api.deps import get_current_active_user
+from app.core.events import emit_event, asset_delta, transaction_delta
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.asset import Asset
@@ -112,6 +113,9 @@ async def create_asset_via_transaction(
         db_transaction = Transaction(**transaction_data)
         db.add(db_transaction)
         
+        emit_event(db, current_user.id, "asset.created", lambda: asset_delta(db_asset))
+        emit_event(db, current_user.id, "transaction.created", lambda: transaction_delta(db_transaction))
+        
         # 3. Commit both asset and transaction
         db.commit()
         db.refresh(db_transaction)
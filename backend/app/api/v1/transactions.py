@@ -3,37 +3,48 @@ Transactions API endpoints for transaction management.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status  # type: ignore
-from sqlalchemy.orm import Session  # type: ignore
+from sqlalchemy.orm import Session, contains_eager  # type: ignore
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_read_db
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.asset import Asset
 from app.schemas.transaction import Transaction as TransactionSchema, TransactionCreate, TransactionUpdate, TransactionWithAsset
 from typing import List
+from app.core.serialization import ResponseSerializer
+from app.core.events import emit_event, asset_delta, transaction_delta
 from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Precompiled serializers for the transaction lists (the largest responses)
+transactions_serializer = ResponseSerializer(List[TransactionWithAsset])
+asset_transactions_serializer = ResponseSerializer(List[TransactionSchema])
+
 @router.get("/", response_model=List[TransactionWithAsset])
 async def get_transactions(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all transactions for the current user."""
-    transactions = db.query(Transaction).join(Asset).filter(
+    transactions = db.query(Transaction).join(Asset).options(
+        contains_eager(Transaction.asset)
+    ).filter(
         Transaction.user_id == current_user.id
     ).order_by(Transaction.created_at.desc()).all()
     
-    # Add asset information to transactions
+    # Add current asset information to transactions
     result = []
     for transaction in transactions:
-        transaction_dict = TransactionSchema.model_validate(transaction).model_dump()
-        transaction_dict['asset_name'] = transaction.asset.name
-        transaction_dict['asset_type'] = transaction.asset.asset_type
-        result.append(transaction_dict)
+        item = TransactionWithAsset.model_validate(transaction)
+        item.asset_name = transaction.asset.name
+        item.asset_type = transaction.asset.asset_type
+        result.append(item)
     
-    return result
+    return transactions_serializer.response(result)
 
 @router.post("/", response_model=TransactionSchema)
 async def create_transaction(
@@ -43,8 +54,8 @@ async def create_transaction(
 ):
     """Create a new transaction. For 'create' type, also creates the asset."""
     
-    print(f"🚀 TRANSACTION_CREATE_START: {transaction.transaction_type} for user {current_user.id}")
-    print(f"📋 Transaction data: {transaction.model_dump()}")
+    # The model is passed unformatted so it is only rendered when debug is on
+    logger.debug("TRANSACTION_CREATE_START: %s", transaction)
     
     # Initialize asset variable
     asset = None
@@ -124,7 +135,7 @@ async def create_transaction(
     
     # 🗑️ HANDLE DELETE TRANSACTION TYPE - IMMEDIATE ASSET DELETION
     if transaction.transaction_type == "delete":
-        print(f"🗑️ DELETE_ASSET: Processing delete transaction for asset {asset.name}")
+        logger.debug("DELETE_ASSET: Processing delete transaction for asset %s", asset.name)
         
         # Get count of all transactions for this asset before deletion
         total_transactions = db.query(Transaction).filter(
@@ -141,9 +152,10 @@ async def create_transaction(
         # Delete the asset itself
         asset_name = asset.name
         db.delete(asset)
+        emit_event(db, current_user.id, "asset.deleted", {"id": str(asset.id)})
         db.commit()
         
-        print(f"🗑️ DELETE_COMPLETE: Deleted asset '{asset_name}' and {total_transactions} related transactions")
+        logger.info(f"DELETE_COMPLETE: Deleted asset '{asset_name}' and {total_transactions} related transactions")
         
         # Create a response without creating the delete transaction since asset is gone
         return {
@@ -166,14 +178,14 @@ async def create_transaction(
         if transaction.transaction_type == "purchase" and transaction.quantity_change:
             current_quantity = asset.quantity or 0
             asset.quantity = current_quantity + transaction.quantity_change  # type: ignore
-            print(f"🔄 PURCHASE: Updated asset {asset.name} quantity: {current_quantity} + {transaction.quantity_change} = {asset.quantity}")
+            logger.debug("PURCHASE: Updated asset %s quantity: %s + %s = %s", asset.name, current_quantity, transaction.quantity_change, asset.quantity)
         elif transaction.transaction_type == "sale":
             # For sale transactions, mark the asset as sold by setting quantity to 0
             # This effectively removes it from the active assets list
-            print(f"🔥 SALE: Marking asset {asset.name} as sold (was quantity: {asset.quantity}, value: {asset.current_value})")
+            logger.debug("SALE: Marking asset %s as sold (was quantity: %s, value: %s)", asset.name, asset.quantity, asset.current_value)
             asset.quantity = 0  # type: ignore
             asset.current_value = 0  # type: ignore # Set value to 0 when sold
-            print(f"🔥 SALE: Asset {asset.name} now has quantity: {asset.quantity}, value: {asset.current_value}")
+            logger.debug("SALE: Asset %s now has quantity: %s, value: %s", asset.name, asset.quantity, asset.current_value)
         elif transaction.transaction_type == "value_update" and transaction.amount:
             asset.current_value = transaction.amount  # type: ignore
         elif transaction.transaction_type == "update_market_value" and transaction.amount:
@@ -183,7 +195,7 @@ async def create_transaction(
             current_value = asset.current_value or 0
             new_value = current_value + transaction.amount
             asset.current_value = new_value  # type: ignore
-            print(f"💰 CASH_DEPOSIT: Added ${transaction.amount} to asset {asset.name} - old: ${current_value}, new: ${new_value}")
+            logger.debug("CASH_DEPOSIT: Added $%s to asset %s - old: $%s, new: $%s", transaction.amount, asset.name, current_value, new_value)
         elif transaction.transaction_type == "update_acquisition_value" and transaction.amount:
             asset.initial_value = transaction.amount  # type: ignore
         elif transaction.transaction_type == "update_name" and transaction.asset_name:
@@ -206,9 +218,9 @@ async def create_transaction(
                     if len(parts) == 2:
                         asset.quantity = float(parts[0])  # type: ignore
                         asset.unit_of_measure = parts[1]  # type: ignore
-                        print(f"🔢 UPDATE_QUANTITY_UNITS: Updated {asset.name} - quantity: {asset.quantity}, unit: {asset.unit_of_measure}")
+                        logger.debug("UPDATE_QUANTITY_UNITS: Updated %s - quantity: %s, unit: %s", asset.name, asset.quantity, asset.unit_of_measure)
                 except (ValueError, IndexError):
-                    print(f"⚠️ Invalid quantity_units format: {transaction.update_quantity_units}")
+                    logger.warning(f"Invalid quantity_units format: {transaction.update_quantity_units}")
         elif transaction.transaction_type == "update_description_properties":
             # Update description and properties from update_description_properties field
             if hasattr(transaction, 'update_description_properties') and transaction.update_description_properties:
@@ -223,23 +235,28 @@ async def create_transaction(
                         current_metadata = asset.asset_metadata or {}
                         current_metadata.update(updates['custom_properties'])
                         asset.asset_metadata = current_metadata  # type: ignore
-                    print(f"📝 UPDATE_DESCRIPTION_PROPERTIES: Updated {asset.name} description and properties")
+                    logger.debug("UPDATE_DESCRIPTION_PROPERTIES: Updated %s description and properties", asset.name)
                 except Exception:
                     # Fallback: treat as simple description update
                     asset.description = transaction.update_description_properties  # type: ignore
-                    print(f"📝 UPDATE_DESCRIPTION_PROPERTIES: Updated {asset.name} description (simple)")
+                    logger.debug("UPDATE_DESCRIPTION_PROPERTIES: Updated %s description (simple)", asset.name)
         
         # Handle asset_purpose updates for both create and update transactions
         if hasattr(transaction, 'asset_purpose') and transaction.asset_purpose:
             asset.asset_purpose = transaction.asset_purpose  # type: ignore
-            print(f"🎯 ASSET_PURPOSE: Updated {asset.name} purpose to {transaction.asset_purpose}")
+            logger.debug("ASSET_PURPOSE: Updated %s purpose to %s", asset.name, transaction.asset_purpose)
 
+    emit_event(db, current_user.id, "transaction.created", lambda: transaction_delta(db_transaction))
+    if asset:
+        asset_event = "asset.created" if transaction.transaction_type == "create" else "asset.updated"
+        emit_event(db, current_user.id, asset_event, lambda: asset_delta(asset))
     db.commit()
     db.refresh(db_transaction)
     
-    print(f"✅ TRANSACTION_CREATE_SUCCESS: {transaction.transaction_type} transaction created with ID {db_transaction.id}")
-    if asset:
-        print(f"✅ Asset {asset.name} updated - quantity: {asset.quantity}, current_value: {asset.current_value}")
+    logger.debug("TRANSACTION_CREATE_SUCCESS: %s transaction created with ID %s", transaction.transaction_type, db_transaction.id)
+    # Guarded: reading the expired asset after commit would cost a reload query
+    if asset and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Asset %s updated - quantity: %s, current_value: %s", asset.name, asset.quantity, asset.current_value)
     
     return db_transaction
 
@@ -247,7 +264,7 @@ async def create_transaction(
 async def get_transaction(
     transaction_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific transaction by ID."""
     transaction = db.query(Transaction).filter(
@@ -267,7 +284,7 @@ async def get_transaction(
 async def get_asset_transactions(
     asset_id: UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all transactions for a specific asset."""
     # Verify that the asset belongs to the current user
@@ -287,7 +304,7 @@ async def get_asset_transactions(
         Transaction.user_id == current_user.id
     ).order_by(Transaction.created_at.desc()).all()
     
-    return transactions
+    return asset_transactions_serializer.response(transactions)
 
 @router.put("/{transaction_id}", response_model=TransactionSchema)
 async def update_transaction(
@@ -312,6 +329,7 @@ async def update_transaction(
     for field, value in update_data.items():
         setattr(transaction, field, value)
     
+    emit_event(db, current_user.id, "transaction.updated", lambda: transaction_delta(transaction))
     db.commit()
     db.refresh(transaction)
     return transaction
@@ -2,10 +2,11 @@
 User settings API endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api.deps import get_current_user
+from app.core.etag import user_data_etag, etag_matches, not_modified, with_etag
 from app.models.user import User
 from app.schemas.user_settings import UserSettingsCreate, UserSettingsUpdate, UserSettingsResponse
 from app.services.user_code_service import UserCodeService
@@ -16,30 +17,40 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def user_settings_response(current_user: User) -> UserSettingsResponse:
+    """Settings fields of the user record as a UserSettingsResponse."""
+    # Return the current user with settings fields using Pydantic from_attributes
+    user_dict = {
+        "id": str(current_user.id),
+        "user_id": str(current_user.id),  # Map id to user_id for schema compatibility
+        "first_name": current_user.first_name,
+        "last_name": current_user.last_name,
+        "recovery_email": current_user.recovery_email,
+        "country": current_user.country,
+        "currency": current_user.currency or "USD",
+        "date_format": current_user.date_format or "MM/DD/YYYY",
+        "dark_mode": current_user.dark_mode or False,
+        "theme": current_user.theme or "default",
+        "font_preference": current_user.font_preference or "guardian_mono",
+        "created_at": current_user.created_at,
+        "updated_at": current_user.updated_at,
+    }
+    return UserSettingsResponse(**user_dict)
+
 @router.get("", response_model=UserSettingsResponse)
 async def get_user_settings(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get user settings from the user record."""
+    etag = user_data_etag(current_user, "user-settings")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    with_etag(response, etag)
     try:
-        # Return the current user with settings fields using Pydantic from_attributes
-        user_dict = {
-            "id": str(current_user.id),
-            "user_id": str(current_user.id),  # Map id to user_id for schema compatibility
-            "first_name": current_user.first_name,
-            "last_name": current_user.last_name,
-            "recovery_email": current_user.recovery_email,
-            "country": current_user.country,
-            "currency": current_user.currency or "USD",
-            "date_format": current_user.date_format or "MM/DD/YYYY",
-            "dark_mode": current_user.dark_mode or False,
-            "theme": current_user.theme or "default",
-            "font_preference": current_user.font_preference or "guardian_mono",
-            "created_at": current_user.created_at,
-            "updated_at": current_user.updated_at,
-        }
-        return UserSettingsResponse(**user_dict)
+        return user_settings_response(current_user)
     except Exception as e:
         logger.error(f"Error fetching user settings: {e}")
         raise HTTPException(
@@ -0,0 +1,199 @@
+"""
+Admission control: per route class concurrency caps with bounded queues (pure ASGI).
+
+Requests are classified by ADMISSION_ROUTE_CLASSES, whose keys are
+"METHOD /pattern" or "/pattern" globs matched against the whole path (`*`
+also matches across `/`); the most specific rule wins and unmatched requests
+belong to the "default" class. Each class in ADMISSION_CLASS_LIMITS runs at
+most `concurrency` requests at once per worker; up to `queue` more wait in
+FIFO order for at most `queue_timeout` seconds. Anything beyond that is
+answered right away with 503 and a Retry-After estimated from the class's
+recent service time, so slow routes (hierarchies, uploads, full ledgers)
+cannot occupy the whole worker and cheap routes keep a bounded latency.
+
+Classes without limits are not admission controlled: the event stream and
+/metrics are exempt this way. /health has a class of its own, so probes are
+never queued behind application traffic.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from fnmatch import translate
+from typing import Deque, Dict, List, Optional, Pattern, Tuple, TypeVar
+from fastapi import status
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.rate_limit import retry_after_header
+
+T = TypeVar("T")
+
+ADMISSION_REQUESTS = Counter(
+    "admission_requests_total",
+    "Requests by route class and admission outcome (admitted, queued, rejected, timeout).",
+    ("route_class", "result")
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Admitted requests running, by route class.", ("route_class",)
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued", "Requests waiting for admission, by route class.", ("route_class",)
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time queued requests waited before admission, by route class.",
+    ("route_class",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+DEFAULT_CLASS = "default"
+
+# Retry-After never promises more than this
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+# Weight of the latest request in the service time average
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+RouteRules = List[Tuple[Optional[str], Pattern, T]]
+
+
+def compile_route_rules(route_rules: Dict[str, T]) -> RouteRules:
+    """Parse "METHOD /glob" / "/glob" keys, most specific rules first."""
+    rules = []
+    for key, value in route_rules.items():
+        method, _, pattern = key.strip().rpartition(" ")
+        rules.append((method.upper() or None, pattern, value))
+    # Longer patterns first; method-specific rules before method-agnostic ones
+    rules.sort(key=lambda rule: (len(rule[1]), rule[0] is not None), reverse=True)
+    return [(method, re.compile(translate(pattern)), value) for method, pattern, value in rules]
+
+
+def match_route_rule(rules: RouteRules, method: str, path: str, default: T) -> T:
+    """Value of the first (most specific) rule matching the request, else `default`."""
+    for rule_method, pattern, value in rules:
+        if (rule_method is None or rule_method == method) and pattern.match(path):
+            return value
+    return default
+
+
+class RouteClassLimiter:
+    """Concurrency slots of one route class with a bounded FIFO queue."""
+
+    def __init__(self, name: str, concurrency: int, queue: int, queue_timeout: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.service_time = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def retry_after(self) -> float:
+        """Rough time until a newly queued request would be admitted."""
+        backlog = len(self._waiters) + 1
+        estimate = backlog * self.service_time / max(1, self.concurrency)
+        return min(MAX_RETRY_AFTER_SECONDS, estimate)
+
+    async def acquire(self) -> str:
+        """Take a slot; returns the admission outcome ("rejected"/"timeout": no slot)."""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            return "admitted"
+        if len(self._waiters) >= self.queue:
+            return "rejected"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUED.inc(self.name)
+        start = time.perf_counter()
+        try:
+            # release() hands its slot over by resolving the waiter
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            return "timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            ADMISSION_QUEUED.dec(self.name)
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - start, self.name)
+        return "queued"
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def record(self, seconds: float) -> None:
+        if self.service_time == 0.0:
+            self.service_time = seconds
+        else:
+            self.service_time += SERVICE_TIME_SMOOTHING * (seconds - self.service_time)
+
+
+class AdmissionControlMiddleware:
+    """Shed load per route class before it reaches the handlers (pure ASGI)."""
+
+    def __init__(
+        self,
+        app,
+        route_classes: Optional[Dict[str, str]] = None,
+        class_limits: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        self.app = app
+        self.rules = compile_route_rules(
+            settings.ADMISSION_ROUTE_CLASSES if route_classes is None else route_classes
+        )
+        limits = settings.ADMISSION_CLASS_LIMITS if class_limits is None else class_limits
+        self.limiters: Dict[str, RouteClassLimiter] = {
+            name: RouteClassLimiter(
+                name,
+                concurrency=int(limit["concurrency"]),
+                queue=int(limit.get("queue", 0)),
+                queue_timeout=float(limit.get("queue_timeout", 1.0))
+            )
+            for name, limit in limits.items()
+        }
+
+    def route_class(self, method: str, path: str) -> str:
+        return match_route_rule(self.rules, method, path, DEFAULT_CLASS)
+
+    async def __call__(self, scope, receive, send):
+        # CORS preflights are answered before this middleware and never limited
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters.get(self.route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        result = await limiter.acquire()
+        ADMISSION_REQUESTS.inc(limiter.name, result)
+        if result in ("rejected", "timeout"):
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is busy. Please try again shortly."},
+                headers={"Retry-After": retry_after_header(limiter.retry_after())}
+            )
+            await response(scope, receive, send)
+            return
+
+        ADMISSION_IN_FLIGHT.inc(limiter.name)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_IN_FLIGHT.dec(limiter.name)
+            limiter.record(time.perf_counter() - start)
+            limiter.release()
@@ -0,0 +1,186 @@
+"""
+Response compression (pure ASGI).
+
+Compresses text-like responses (JSON, text, XML, SVG) with Brotli when the
+client accepts it, otherwise with gzip. `brotli` is in requirements.txt;
+without it (bare development installs) only gzip is offered. Encodings are picked from Accept-Encoding honouring q-values.
+
+Skipped: HEAD requests, bodies under COMPRESSION_MIN_SIZE, responses that
+already have a Content-Encoding, non text-like content types (images, PDFs,
+archives are compressed already), Server-Sent Events and responses marked
+`Cache-Control: no-transform`. Streaming responses are compressed chunk by
+chunk with a flush after each one, so clients still receive data as it is
+produced. Compressed responses get `Vary: Accept-Encoding` and a weak ETag,
+since the bytes differ from the identity representation.
+"""
+
+import zlib
+from typing import Optional, Sequence
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+# Chunks this large are compressed in a worker thread (zlib and brotli release
+# the GIL) so a big ledger response does not stall the event loop
+OFFLOAD_MIN_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+})
+
+
+def available_encodings() -> Sequence[str]:
+    """Supported encodings in server preference order."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """Best encoding from an Accept-Encoding header, or None for identity."""
+    preferences = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = preferences.get(encoding, preferences.get("*", 0.0))
+        # Ties keep the earlier (server preferred) encoding
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", "").lower():
+        return False
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if content_type == "text/event-stream":
+        return False
+    return (
+        content_type.startswith("text/")
+        or content_type in COMPRESSIBLE_TYPES
+        or content_type.endswith("+json")
+        or content_type.endswith("+xml")
+    )
+
+
+class _Encoder:
+    """Incremental gzip / Brotli compressor."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16 + MAX_WBITS writes a gzip header and trailer
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress_sync(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    async def compress(self, data: bytes, final: bool) -> bytes:
+        if len(data) >= OFFLOAD_MIN_SIZE:
+            return await anyio.to_thread.run_sync(self.compress_sync, data, final)
+        return self.compress_sync(data, final)
+
+
+class CompressionMiddleware:
+    """Negotiate and apply gzip / Brotli content encoding to responses."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = settings.COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                # Held back until the first body chunk shows whether compression is worthwhile
+                start_message = message
+                return
+            if message_type != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(raw=list(start_message.get("headers", [])))
+                start_message["headers"] = headers.raw
+                if (
+                    start_message["status"] in (204, 304)
+                    or not is_compressible(headers)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = "W/" + etag
+                del headers["content-length"]
+                data = await encoder.compress(body, final=not more_body)
+                if not more_body:
+                    headers["content-length"] = str(len(data))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": await encoder.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,94 @@
+"""
+Per-user data versions.
+
+users.data_version is incremented in the same transaction as any ORM write
+to a user's own rows (assets, transactions, policies, goals, schedules,
+settings and the user record itself). Read endpoints derive their ETag from
+it, so "has anything of this user changed?" is answered by the user row that
+authentication loads anyway.
+
+On PostgreSQL the same transaction also sends a NOTIFY on
+INVALIDATION_CHANNEL with the user id and the tables written, delivered to
+every listening worker when (and only if) the transaction commits; see
+app.core.invalidation.
+
+Writes that bypass the ORM unit of work (Query.update()/delete(), raw SQL)
+do not bump the version on their own; the routers only use bulk deletes next
+to an ORM delete of the parent asset, which bumps it.
+"""
+
+import json
+import logging
+from typing import Dict, Set
+from uuid import UUID
+from sqlalchemy import BigInteger, column, event, func, select, table
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tables whose rows belong to one user through a user_id column
+VERSIONED_TABLES = frozenset({
+    "assets",
+    "transactions",
+    "insurance_policies",
+    "user_goals",
+    "payment_schedules",
+    "user_settings",
+})
+
+# session.info key: ids of users whose data the session's transaction wrote
+# (read-your-writes pinning, see app.core.read_replica)
+WRITTEN_USERS = "written_user_ids"
+
+# Lightweight handle on users; importing the models here would be circular
+_users = table("users", column("id", PG_UUID(as_uuid=True)), column("data_version", BigInteger))
+
+
+def _changed_user_ids(session: Session) -> Dict[UUID, Set[str]]:
+    """User ids whose data the pending flush writes, with the tables written."""
+    changes: Dict[UUID, Set[str]] = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tablename = getattr(obj, "__tablename__", None)
+        if tablename == "users":
+            # New users start at version 0; only changes to existing ones count
+            if obj not in session.new and session.is_modified(obj):
+                changes.setdefault(obj.id, set()).add(tablename)
+        elif tablename in VERSIONED_TABLES:
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            user_id = getattr(obj, "user_id", None)
+            if user_id is not None:
+                changes.setdefault(user_id, set()).add(tablename)
+    return changes
+
+
+def invalidation_payload(user_id: UUID, entities: Set[str]) -> str:
+    return json.dumps({"user_id": str(user_id), "entities": sorted(entities)})
+
+
+def _bump_data_versions(session: Session, flush_context, instances) -> None:
+    changes = _changed_user_ids(session)
+    if not changes:
+        return
+    session.info.setdefault(WRITTEN_USERS, set()).update(changes)
+    connection = session.connection()
+    # Core UPDATE on the flush's connection: atomic increment, no nested flush
+    connection.execute(
+        _users.update()
+        .where(_users.c.id.in_(changes))
+        .values(data_version=_users.c.data_version + 1)
+    )
+    if settings.INVALIDATION_BUS_ENABLED and connection.dialect.name == "postgresql":
+        # Queued by the server and delivered on commit; dropped on rollback
+        for user_id, entities in changes.items():
+            connection.execute(select(func.pg_notify(
+                settings.INVALIDATION_CHANNEL, invalidation_payload(user_id, entities)
+            )))
+
+
+def install_data_versioning(session_factory: sessionmaker) -> None:
+    """Bump users.data_version on every flush that writes a user's data."""
+    if not event.contains(session_factory, "before_flush", _bump_data_versions):
+        event.listen(session_factory, "before_flush", _bump_data_versions)
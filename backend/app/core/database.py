@@ -6,17 +6,48 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.query_stats import install_query_instrumentation
+from app.core.deadlines import install_deadlines
+from app.core.metrics import InstrumentedQueuePool, register_pool_metrics
+from app.core.data_version import install_data_versioning
+from app.core.events import install_event_publishing
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,  # QueuePool that times checkout waits
     pool_pre_ping=True,
     pool_recycle=300,
     echo=True if settings.ENVIRONMENT == "development" else False
 )
 
+# Per-request query/row/time counters (see QueryStatsMiddleware)
+install_query_instrumentation(engine)
+# Pool size/utilization gauges for /metrics
+register_pool_metrics(engine)
+# statement_timeout and cancellation from the current request's deadline
+install_deadlines(engine)
+
+# Optional read replica for read-only endpoints (see app.core.read_replica)
+replica_engine = create_engine(
+    settings.DATABASE_REPLICA_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_pre_ping=True,
+    pool_recycle=300
+) if settings.DATABASE_REPLICA_URL else None
+if replica_engine is not None:
+    install_query_instrumentation(replica_engine)
+    install_deadlines(replica_engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Replica sessions only read: no data versioning or event publishing hooks
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+# Bump users.data_version whenever a flush writes a user's data
+install_data_versioning(SessionLocal)
+# Publish emit_event() events when their transaction commits
+install_event_publishing(SessionLocal)
 
 # Create base class for models
 Base = declarative_base()
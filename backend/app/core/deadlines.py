@@ -0,0 +1,259 @@
+"""
+Per-request deadlines for database work.
+
+DeadlineMiddleware gives each HTTP request a time budget from
+REQUEST_DEADLINES ("METHOD /glob" or "/glob" rules like admission control,
+REQUEST_DEADLINE_SECONDS otherwise, 0 for none) and keeps it in a context
+variable that SQLAlchemy engine events read:
+
+- every transaction on PostgreSQL starts with
+  `SET LOCAL statement_timeout` set to the time left, so the server stops
+  runaway statements itself; the setting ends with the transaction and never
+  leaks to the next user of the pooled connection;
+- a statement about to start after the deadline, or after the client went
+  away, raises DeadlineExceeded instead of reaching the database;
+- when the client disconnects, statements in flight for the request are
+  cancelled (psycopg2 connection.cancel()), which frees the connection.
+  Handlers that run their queries on the event loop only notice the
+  disconnect at their next statement; queries in worker threads (single
+  flight, response cache, bootstrap) are cancelled right away.
+
+Requests that ran out of time are answered with 503, also when the handler
+caught the database error and turned it into a 500.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from typing import Optional, Set
+import anyio
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.admission import compile_route_rules, match_route_rule
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.core.rate_limit import retry_after_header
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DEADLINE_OUTCOMES = Counter(
+    "request_deadline_outcomes_total",
+    "Requests stopped by their deadline (timeout) or by a client disconnect (cancelled).",
+    ("outcome",)
+)
+
+# SQLSTATE of statements stopped by statement_timeout or a cancel request
+QUERY_CANCELED = "57014"
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of running a statement once the request cannot use its result."""
+
+
+class RequestDeadline:
+    """Deadline and in-flight DBAPI connections of one request."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+        self.timed_out = False
+        self.disconnected = False
+        self._lock = threading.Lock()
+        # Statements run in worker threads too, so guard the set
+        self._executing: Set = set()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def started(self, dbapi_connection) -> None:
+        with self._lock:
+            self._executing.add(dbapi_connection)
+
+    def finished(self, dbapi_connection) -> None:
+        with self._lock:
+            self._executing.discard(dbapi_connection)
+
+    async def cancel(self) -> None:
+        """Mark the client gone and cancel the statements still running for it."""
+        self.disconnected = True
+        with self._lock:
+            executing = list(self._executing)
+        for dbapi_connection in executing:
+            cancel = getattr(dbapi_connection, "cancel", None)
+            if cancel is None:
+                continue
+            try:
+                # Opens a separate connection to the server: keep it off the loop
+                await anyio.to_thread.run_sync(cancel)
+            except Exception as e:
+                logger.warning(f"Could not cancel query of disconnected request: {e}")
+
+
+_current_deadline: contextvars.ContextVar[Optional[RequestDeadline]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[RequestDeadline]:
+    """Deadline of the current request, if any."""
+    return _current_deadline.get()
+
+
+def _set_statement_timeout(conn) -> None:
+    deadline = _current_deadline.get()
+    if deadline is None or conn.dialect.name != "postgresql":
+        return
+    milliseconds = max(1, int(deadline.remaining() * 1000))
+    # Raw cursor: not a statement of the request as far as query stats go
+    with conn.connection.dbapi_connection.cursor() as cursor:
+        cursor.execute(f"SET LOCAL statement_timeout = {milliseconds}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return
+    if deadline.disconnected:
+        raise DeadlineExceeded("Client disconnected")
+    if deadline.remaining() <= 0:
+        deadline.timed_out = True
+        raise DeadlineExceeded("Request deadline exceeded")
+    deadline.started(conn.connection.dbapi_connection)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.finished(conn.connection.dbapi_connection)
+
+
+def _handle_error(context) -> None:
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return
+    if context.connection is not None and not context.connection.invalidated:
+        deadline.finished(context.connection.connection.dbapi_connection)
+    if getattr(context.original_exception, "pgcode", None) == QUERY_CANCELED and not deadline.disconnected:
+        deadline.timed_out = True
+
+
+def install_deadlines(engine: Engine) -> None:
+    """Apply request deadlines to an engine's transactions and statements."""
+    for name, listener in (
+        ("begin", _set_statement_timeout),
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+
+
+def _has_body(scope) -> bool:
+    for key, value in scope["headers"]:
+        if key == b"transfer-encoding" or (key == b"content-length" and value.strip() != b"0"):
+            return True
+    return False
+
+
+class DeadlineMiddleware:
+    """Run each request under its route's deadline and watch for client disconnects (pure ASGI)."""
+
+    def __init__(self, app, deadlines: Optional[dict] = None, default_seconds: Optional[float] = None):
+        self.app = app
+        self.rules = compile_route_rules(settings.REQUEST_DEADLINES if deadlines is None else deadlines)
+        self.default_seconds = settings.REQUEST_DEADLINE_SECONDS if default_seconds is None else default_seconds
+
+    def budget(self, method: str, path: str) -> float:
+        return float(match_route_rule(self.rules, method, path, self.default_seconds))
+
+    async def _timeout_response(self, scope, receive, send) -> None:
+        response = JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "The request took too long. Please try again shortly."},
+            headers={"Retry-After": retry_after_header(1)}
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        seconds = self.budget(scope["method"], scope["path"])
+        if seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = RequestDeadline(seconds)
+        token = _current_deadline.set(deadline)
+        response_started = False
+        response_complete = False
+        replaced = False
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    break
+            if not response_complete:
+                REQUEST_DEADLINE_OUTCOMES.inc("cancelled")
+                await deadline.cancel()
+            return message
+
+        # Bodyless requests are watched from the start (the watcher consumes the
+        # server's empty request message), others once their body has been read
+        loop = asyncio.get_running_loop()
+        if _has_body(scope):
+            watcher: Optional[asyncio.Task] = None
+            request_message = None
+        else:
+            watcher = loop.create_task(watch_disconnect())
+            request_message = {"type": "http.request", "body": b"", "more_body": False}
+
+        async def receive_wrapper():
+            nonlocal watcher, request_message
+            if request_message is not None:
+                message, request_message = request_message, None
+                return message
+            if watcher is None:
+                message = await receive()
+                if message["type"] == "http.request" and not message.get("more_body", False):
+                    watcher = loop.create_task(watch_disconnect())
+                return message
+            # Shielded: the app giving up on receive() must not stop the watcher
+            return await asyncio.shield(watcher)
+
+        async def send_wrapper(message):
+            nonlocal response_started, response_complete, replaced
+            if message["type"] == "http.response.start":
+                response_started = True
+                if message["status"] == 500 and deadline.timed_out:
+                    # The handler turned the cancelled statement into a generic error
+                    replaced = True
+                    REQUEST_DEADLINE_OUTCOMES.inc("timeout")
+                    await self._timeout_response(scope, receive, send)
+                    return
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            if not replaced:
+                await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception as e:
+            if response_started or not (deadline.timed_out or deadline.disconnected or isinstance(e, DeadlineExceeded)):
+                raise
+            if deadline.disconnected:
+                logger.info(f"Stopped {scope['method']} {scope['path']} after client disconnect")
+                return
+            REQUEST_DEADLINE_OUTCOMES.inc("timeout")
+            logger.warning(f"{scope['method']} {scope['path']} exceeded its {seconds:.0f}s deadline")
+            await self._timeout_response(scope, receive, send)
+        finally:
+            response_complete = True
+            _current_deadline.reset(token)
+            if watcher is not None:
+                watcher.cancel()
@@ -0,0 +1,64 @@
+"""
+Conditional GET helpers (ETag / If-None-Match).
+
+Tags are strong and derived from the user's data version, so they can be
+computed before any query runs:
+
+    etag = user_data_etag(current_user, "assets")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    ...
+    return with_etag(response, etag)
+
+Responses are marked `Cache-Control: private, no-cache`: the browser keeps
+a copy but revalidates every time, and gets a 304 with an empty body while
+nothing has changed. If-None-Match uses weak comparison, so tags weakened by
+response compression still match.
+"""
+
+import hashlib
+from typing import Any
+from fastapi import Request
+from starlette.responses import Response
+from app.core.config import settings
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def user_data_etag(user: Any, resource: str) -> str:
+    """Strong ETag for `resource` of `user` at the user's current data version."""
+    version = user.data_version or 0
+    digest = hashlib.sha1(f"{settings.ETAG_SALT}:{user.id}:{resource}".encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag for content that does not depend on the user (hash of the body)."""
+    return f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches `etag` (weak comparison)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,331 @@
+"""
+Per-user Server-Sent Events: compact deltas of portfolio changes.
+
+Write paths call emit_event(db, user_id, type, data) before committing. The
+event is published with the transaction:
+
+- on PostgreSQL it is sent with pg_notify on EVENTS_CHANNEL inside the
+  transaction, so it reaches the EventHub of every worker (through the
+  invalidation listener's connection) only if the write commits;
+- elsewhere it is handed to this worker's hub after the commit.
+
+`data` may be a callable; it is evaluated at commit time after a flush, so
+ids and defaults of new rows are available.
+
+The hub keeps, per user, the last EVENTS_REPLAY_SIZE events of the last
+EVENTS_REPLAY_SECONDS for resuming via Last-Event-ID. Event ids are opaque;
+since every worker receives the same notifications in commit order, a client
+can resume on any worker. When the id is unknown (too old, or the worker
+started later) the stream sends a `resync` event and the client should
+reload its data (e.g. through /api/v1/bootstrap).
+
+Connections cost a small buffer and no task or timer of their own: one hub
+task sends heartbeats to all idle connections. A connection that falls more
+than EVENTS_MAX_BUFFER events behind has its buffer replaced by `resync`.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Union
+import pydantic_core
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM_CONNECTIONS = Gauge("event_stream_connections", "Open Server-Sent Events connections.")
+EVENTS_RECEIVED = Counter("events_received_total", "Events received by this worker's hub by type.", ("type",))
+EVENT_STREAM_RESYNCS = Counter(
+    "event_stream_resyncs_total", "Resync events sent, by reason.", ("reason",)
+)
+
+HEARTBEAT = b": heartbeat\n\n"
+RESYNC = b"event: resync\ndata: {}\n\n"
+
+# pg_notify payloads are limited to 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7900
+
+_PENDING = "pending_events"
+_READY = "ready_events"
+
+EventData = Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+
+
+@dataclass
+class Event:
+    id: str
+    type: str
+    data: Dict[str, Any]
+    published_at: float
+
+    def encode(self) -> bytes:
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+            self.id.encode(), self.type.encode(), pydantic_core.to_json(self.data)
+        )
+
+
+class Subscription:
+    """One stream connection: a bounded buffer of encoded events."""
+
+    def __init__(self, user_id: str, max_buffer: int):
+        self.user_id = user_id
+        self.max_buffer = max_buffer
+        self._buffer: Deque[bytes] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, chunk: bytes) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            # The client fell behind: drop what it missed and make it reload
+            self._buffer.clear()
+            self._buffer.append(RESYNC)
+            EVENT_STREAM_RESYNCS.inc("overflow")
+        else:
+            self._buffer.append(chunk)
+        self._ready.set()
+
+    def heartbeat(self) -> None:
+        if not self._buffer:
+            self._buffer.append(HEARTBEAT)
+            self._ready.set()
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._buffer:
+                yield self._buffer.popleft()
+
+
+class _UserEvents:
+    __slots__ = ("history", "subscribers")
+
+    def __init__(self, replay_size: int):
+        self.history: Deque[Event] = deque(maxlen=replay_size)
+        self.subscribers: Set[Subscription] = set()
+
+
+class EventHub:
+    """Fan-out of published events to the stream connections of each user."""
+
+    def __init__(
+        self,
+        replay_size: int = 100,
+        replay_seconds: float = 300.0,
+        max_buffer: int = 256,
+        heartbeat_seconds: float = 15.0
+    ):
+        self.replay_size = replay_size
+        self.replay_seconds = replay_seconds
+        self.max_buffer = max_buffer
+        self.heartbeat_seconds = heartbeat_seconds
+        self._users: Dict[str, _UserEvents] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    def _user(self, user_id: str) -> _UserEvents:
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = _UserEvents(self.replay_size)
+        return user
+
+    def publish(self, user_id: str, event: Event) -> None:
+        EVENTS_RECEIVED.inc(event.type)
+        user = self._user(user_id)
+        user.history.append(event)
+        chunk = event.encode()
+        for subscription in user.subscribers:
+            subscription.push(chunk)
+
+    def subscribe(self, user_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        """Open a subscription, replaying events after `last_event_id` when known."""
+        user = self._user(user_id)
+        subscription = Subscription(user_id, self.max_buffer)
+        if last_event_id:
+            ids = [event.id for event in user.history]
+            if last_event_id in ids:
+                for event in list(user.history)[ids.index(last_event_id) + 1:]:
+                    subscription.push(event.encode())
+            else:
+                subscription.push(RESYNC)
+                EVENT_STREAM_RESYNCS.inc("unknown_last_event_id")
+        user.subscribers.add(subscription)
+        EVENT_STREAM_CONNECTIONS.inc()
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        user = self._users.get(subscription.user_id)
+        if user is not None and subscription in user.subscribers:
+            user.subscribers.discard(subscription)
+            EVENT_STREAM_CONNECTIONS.dec()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            cutoff = time.time() - self.replay_seconds
+            for user_id, user in list(self._users.items()):
+                while user.history and user.history[0].published_at < cutoff:
+                    user.history.popleft()
+                if not user.subscribers and not user.history:
+                    del self._users[user_id]
+                    continue
+                for subscription in user.subscribers:
+                    subscription.heartbeat()
+
+    async def handle_notification(self, payload: str) -> None:
+        """Invalidation listener handler for EVENTS_CHANNEL."""
+        try:
+            message = json.loads(payload)
+            user_id = str(message["user_id"])
+            event = Event(
+                id=str(message["id"]),
+                type=str(message["type"]),
+                data=message.get("data") or {},
+                published_at=float(message.get("published_at") or time.time())
+            )
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed event payload: {payload[:200]!r}")
+            return
+        self.publish(user_id, event)
+
+    async def stop(self) -> None:
+        task, self._heartbeat_task = self._heartbeat_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+event_hub = EventHub(
+    replay_size=settings.EVENTS_REPLAY_SIZE,
+    replay_seconds=settings.EVENTS_REPLAY_SECONDS,
+    max_buffer=settings.EVENTS_MAX_BUFFER,
+    heartbeat_seconds=settings.EVENTS_HEARTBEAT_SECONDS
+)
+
+
+# --- Emitting ---
+
+def emit_event(db: Session, user_id: Any, event_type: str, data: EventData) -> None:
+    """Publish an event for `user_id` when the session's transaction commits."""
+    if settings.EVENTS_ENABLED:
+        if not db.in_transaction():
+            # Tie the event to a transaction so a rollback discards it
+            db.begin()
+        db.info.setdefault(_PENDING, []).append((str(user_id), event_type, data))
+
+
+def _notify_payload(user_id: str, event: Event) -> str:
+    payload = json.dumps({
+        "user_id": user_id,
+        "id": event.id,
+        "type": event.type,
+        "data": event.data,
+        "published_at": event.published_at,
+    }, default=str)
+    if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+        logger.warning(f"Event {event.type} too large for NOTIFY, sending without data")
+        payload = json.dumps({
+            "user_id": user_id,
+            "id": event.id,
+            "type": event.type,
+            "data": {"truncated": True},
+            "published_at": event.published_at,
+        })
+    return payload
+
+
+def _prepare_events(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    # Ids and defaults of new rows are assigned by the flush
+    session.flush()
+    now = time.time()
+    events: List[tuple] = [
+        (user_id, Event(uuid.uuid4().hex, event_type, data() if callable(data) else data, now))
+        for user_id, event_type, data in pending
+    ]
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        for user_id, prepared in events:
+            connection.execute(select(func.pg_notify(
+                settings.EVENTS_CHANNEL, _notify_payload(user_id, prepared)
+            )))
+    else:
+        session.info.setdefault(_READY, []).extend(events)
+
+
+def _publish_local_events(session: Session) -> None:
+    for user_id, prepared in session.info.pop(_READY, ()):
+        # Round-trip through JSON so local delivery matches NOTIFY delivery
+        prepared.data = json.loads(json.dumps(prepared.data, default=str))
+        event_hub.publish(user_id, prepared)
+
+
+def _discard_events(session: Session, previous_transaction) -> None:
+    # Soft rollback also covers transactions that never reached the database.
+    # Savepoint rollbacks are ignored: pending events are not tracked per
+    # savepoint, so they stay with the outer transaction
+    if previous_transaction.parent is not None:
+        return
+    session.info.pop(_PENDING, None)
+    session.info.pop(_READY, None)
+
+
+def install_event_publishing(session_factory: sessionmaker) -> None:
+    """Publish events passed to emit_event() when their transaction commits."""
+    for name, listener in (
+        ("before_commit", _prepare_events),
+        ("after_commit", _publish_local_events),
+        ("after_soft_rollback", _discard_events),
+    ):
+        if not event.contains(session_factory, name, listener):
+            event.listen(session_factory, name, listener)
+
+
+# --- Compact deltas ---
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def asset_delta(asset: Any) -> Dict[str, Any]:
+    return {
+        "id": str(asset.id),
+        "name": asset.name,
+        "asset_type": asset.asset_type,
+        "current_value": _number(asset.current_value),
+        "quantity": _number(asset.quantity),
+    }
+
+
+def transaction_delta(transaction: Any) -> Dict[str, Any]:
+    return {
+        "id": str(transaction.id),
+        "asset_id": str(transaction.asset_id),
+        "transaction_type": transaction.transaction_type,
+        "amount": _number(transaction.amount),
+        "transaction_date": transaction.transaction_date.isoformat() if transaction.transaction_date else None,
+    }
+
+
+def policy_delta(policy: Any) -> Dict[str, Any]:
+    return {
+        "id": str(policy.id),
+        "policy_name": policy.policy_name,
+        "policy_type": policy.policy_type,
+        "coverage_amount": _number(policy.coverage_amount),
+        "premium_amount": _number(policy.premium_amount),
+        "status": policy.status,
+    }
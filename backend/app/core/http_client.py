@@ -0,0 +1,84 @@
+"""
+Shared outbound HTTP client.
+
+Calls to Supabase (auth, storage) go through one pooled httpx.AsyncClient
+instead of opening a new connection per request, and every call is timed
+into the http_client_request_duration_seconds histogram, labelled by target.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
+import httpx
+from app.core.config import settings
+from app.core.metrics import OUTBOUND_REQUEST_DURATION
+
+_SUPABASE_HOST = urlparse(settings.SUPABASE_URL).hostname
+
+
+def outbound_target(url: httpx.URL) -> str:
+    """Low-cardinality label for an outbound URL."""
+    if url.host == _SUPABASE_HOST:
+        service = url.path.lstrip("/").split("/", 1)[0]
+        return f"supabase_{service}" if service else "supabase"
+    return url.host
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that records the latency of every request."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, **transport_options):
+        self._transport = transport or httpx.AsyncHTTPTransport(**transport_options)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            OUTBOUND_REQUEST_DURATION.observe(
+                time.perf_counter() - start, outbound_target(request.url), request.method, status
+            )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled client for the running event loop (created on first use)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=settings.HTTP_CLIENT_TIMEOUT,
+            transport=InstrumentedTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS
+                )
+            )
+        )
+        _client_loop = loop
+    return _client
+
+
+@asynccontextmanager
+async def outbound_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Drop-in for `async with httpx.AsyncClient() as client` that reuses the shared pool."""
+    yield get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
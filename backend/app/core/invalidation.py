@@ -0,0 +1,176 @@
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Every ORM write to a user's data sends `NOTIFY <INVALIDATION_CHANNEL>` with
+{"user_id": ..., "entities": [table, ...]} inside the writing transaction
+(see app.core.data_version), so the message is delivered only once the write
+has committed, to every worker and container connected to the database,
+including the one that wrote.
+
+Each worker keeps one dedicated listener connection outside the pool. It is
+watched with loop.add_reader, so waiting costs no thread, and subscribed
+handlers (the response cache's invalidate_user) run on the event loop. Other
+channels can share the connection through add_channel (the event stream hub
+listens on EVENTS_CHANNEL this way).
+
+The connection is re-established with backoff when it drops. Notifications
+sent while it was down are lost; cached entries are keyed by data version,
+so that only delays eviction and never serves stale data.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_MESSAGES = Counter(
+    "invalidation_messages_total", "Invalidation notifications received by this worker."
+)
+INVALIDATION_LISTENER_CONNECTED = Gauge(
+    "invalidation_listener_connected", "1 while the LISTEN connection is up."
+)
+
+# Handler(user_id, entities)
+InvalidationHandler = Callable[[str, Set[str]], Awaitable[None]]
+# Handler(raw payload) for additional channels
+PayloadHandler = Callable[[str], Awaitable[None]]
+
+# Idle listener connections are checked this often, so a silently dropped
+# connection is noticed and replaced
+KEEPALIVE_SECONDS = 60.0
+
+
+class InvalidationListener:
+    """Receive invalidation notifications and pass them to subscribed handlers."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str,
+        reconnect_min: float = 1.0,
+        reconnect_max: float = 30.0
+    ):
+        self.engine = engine
+        self.channel = channel
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self._handlers: List[InvalidationHandler] = []
+        self._channels: Dict[str, PayloadHandler] = {channel: self.dispatch}
+        self._task: Optional[asyncio.Task] = None
+        self._connection = None
+
+    def subscribe(self, handler: InvalidationHandler) -> None:
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def add_channel(self, channel: str, handler: PayloadHandler) -> None:
+        """Also LISTEN on `channel` and pass its payloads to `handler` (call before start)."""
+        self._channels[channel] = handler
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        if self.engine.dialect.name != "postgresql":
+            logger.info(f"Invalidation bus disabled: {self.engine.dialect.name} has no LISTEN/NOTIFY")
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def _connect(self):
+        """Open a dedicated autocommit connection and LISTEN (blocking)."""
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        connection = self.engine.dialect.dbapi.connect(*cargs, **cparams)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            for channel in self._channels:
+                quoted = channel.replace('"', '""')
+                cursor.execute(f'LISTEN "{quoted}"')
+        return connection
+
+    @staticmethod
+    def _ping(connection) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    async def _run(self) -> None:
+        delay = self.reconnect_min
+        connected_before = False
+        while True:
+            try:
+                self._connection = await asyncio.to_thread(self._connect)
+                INVALIDATION_LISTENER_CONNECTED.set(1)
+                if connected_before:
+                    logger.info(f"Invalidation listener reconnected to {', '.join(self._channels)}")
+                connected_before = True
+                delay = self.reconnect_min
+                await self._listen(self._connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Invalidation listener connection failed, retrying in {delay:.0f}s: {e}")
+            finally:
+                INVALIDATION_LISTENER_CONNECTED.set(0)
+                if self._connection is not None:
+                    try:
+                        self._connection.close()
+                    except Exception:
+                        pass
+                    self._connection = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max)
+
+    async def _listen(self, connection) -> None:
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        # Kept for remove_reader: fileno() fails once the connection is closed
+        fd = connection.fileno()
+        loop.add_reader(fd, readable.set)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(readable.wait(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    await asyncio.to_thread(self._ping, connection)
+                readable.clear()
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    handler = self._channels.get(notify.channel)
+                    if handler is not None:
+                        await handler(notify.payload)
+        finally:
+            loop.remove_reader(fd)
+
+    async def dispatch(self, payload: str) -> None:
+        """Decode one notification payload and run every handler on it."""
+        try:
+            message = json.loads(payload)
+            user_id = str(message["user_id"])
+            entities = set(message.get("entities", ()))
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed invalidation payload: {payload[:200]!r}")
+            return
+        INVALIDATION_MESSAGES.inc()
+        for handler in self._handlers:
+            try:
+                await handler(user_id, entities)
+            except Exception:
+                logger.exception("Invalidation handler failed")
+
+
+invalidation_listener = InvalidationListener(engine, settings.INVALIDATION_CHANNEL)
@@ -0,0 +1,243 @@
+"""
+Application logging setup.
+
+Records are handed to a bounded in-memory queue and written by a background
+listener thread, so request handlers never block on stdout. Output is one
+JSON object per line (or plain text in development) carrying the request id,
+user id and any `extra={...}` fields passed at the call site.
+
+Debug output costs almost nothing when disabled: module loggers normally run
+at LOG_LEVEL, and `logger.debug(...)` returns before formatting anything.
+Debug detail can be switched on for a single request (X-Debug-Log header with
+LOG_DEBUG_TOKEN) or for specific users (LOG_DEBUG_USER_IDS) without changing
+the global level. Debug records are rate limited per call site.
+
+Import this module before the application modules so their loggers are
+created with the request-aware logger class.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from hmac import compare_digest
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+user_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("user_id", default=None)
+debug_enabled_var: contextvars.ContextVar[bool] = contextvars.ContextVar("debug_enabled", default=False)
+
+# LogRecord attributes that are not user supplied `extra` fields
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id", "user_id", "taskName"
+}
+
+
+class RequestAwareLogger(logging.Logger):
+    """Logger that also emits DEBUG records while debug is on for the current request."""
+
+    def isEnabledFor(self, level: int) -> bool:
+        if level == logging.DEBUG and debug_enabled_var.get():
+            return not self.manager.disable >= level
+        return super().isEnabledFor(level)
+
+
+logging.setLoggerClass(RequestAwareLogger)
+
+
+def enable_request_debug() -> None:
+    """Turn on debug logging for the rest of the current request."""
+    debug_enabled_var.set(True)
+
+
+def bind_user(user_id: Any) -> None:
+    """Attach the authenticated user to log records of the current request."""
+    user_id = str(user_id)
+    user_id_var.set(user_id)
+    if user_id in settings.LOG_DEBUG_USER_IDS:
+        debug_enabled_var.set(True)
+
+
+class ContextFilter(logging.Filter):
+    """Copy request context onto the record in the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.user_id = user_id_var.get()
+        return True
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Admit at most `per_second` DEBUG records per call site (file:line).
+
+    Records from requests with debug explicitly enabled are never dropped.
+    The first record admitted after a drop carries `suppressed=<count>`.
+    """
+
+    def __init__(self, per_second: float):
+        super().__init__()
+        self.per_second = per_second
+        self._lock = threading.Lock()
+        # call site -> (tokens, last_refill, suppressed)
+        self._buckets: Dict[Tuple[str, int], Tuple[float, float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or debug_enabled_var.get() or self.per_second <= 0:
+            return True
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(site, (self.per_second, now, 0))
+            tokens = min(self.per_second, tokens + (now - last) * self.per_second)
+            if tokens < 1.0:
+                self._buckets[site] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[site] = (tokens - 1.0, now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep args/exc_info so the listener does the formatting, off the request path
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the standard fields plus any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "user_id", None):
+            entry["user_id"] = record.user_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human readable format for development, with `extra` fields appended."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {
+            key: value for key, value in record.__dict__.items()
+            if key not in _RESERVED_ATTRS and not key.startswith("_")
+        }
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging() -> None:
+    """Install the queue handler on the root logger and start the writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(DebugRateLimitFilter(settings.LOG_DEBUG_PER_SECOND))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestLogContextMiddleware:
+    """
+    Bind a request id to every log record of a request (pure ASGI).
+
+    Uses the caller's X-Request-ID when present and echoes it on the
+    response. Sending `X-Debug-Log: <LOG_DEBUG_TOKEN>` enables debug output
+    for that request only.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.debug_token = settings.LOG_DEBUG_TOKEN.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        debug = False
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+            elif name == b"x-debug-log" and self.debug_token:
+                debug = compare_digest(value, self.debug_token)
+        request_id = request_id or uuid.uuid4().hex
+
+        request_id_token = request_id_var.set(request_id)
+        debug_token = debug_enabled_var.set(debug)
+        user_token = user_id_var.set(None)
+        encoded_request_id = request_id.encode("latin-1")
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", encoded_request_id)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(request_id_token)
+            debug_enabled_var.reset(debug_token)
+            user_id_var.reset(user_token)
@@ -0,0 +1,167 @@
+"""
+Event loop lag and blocking-call detection.
+
+Route handlers are `async def` but run synchronous SQLAlchemy and other
+blocking code on the event loop thread, so one slow query stalls every
+request in flight on that worker. LoopMonitor makes those stalls visible:
+
+- a heartbeat task sleeps for `interval` and measures how late it wakes up
+  (event_loop_lag_seconds histogram);
+- a watchdog thread notices when the heartbeat is overdue by more than
+  `threshold` and samples the loop thread's stack with sys._current_frames()
+  while it stays blocked, so the warning logged afterwards shows the code
+  that was running, not the code that happened to run next.
+
+In tests, wrap the code under test in `detect_loop_blocking()` to fail with
+LoopBlocked when anything holds the loop longer than the budget.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as _StackCounter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, List, Optional
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the event loop heartbeat woke up.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total", "Times the event loop was blocked longer than the threshold."
+)
+
+# Innermost frames kept per stack sample
+STACK_DEPTH = 12
+
+
+class LoopBlocked(AssertionError):
+    """Raised by detect_loop_blocking when the loop was blocked beyond the budget."""
+
+
+@dataclass
+class Stall:
+    """One period where the loop was blocked longer than the threshold."""
+    seconds: float
+    stack: Optional[str]
+    samples: int
+
+
+def _format_stack(frame) -> str:
+    entries = traceback.extract_stack(frame)[-STACK_DEPTH:]
+    return "".join(traceback.format_list(entries))
+
+
+class LoopMonitor:
+    """Heartbeat task plus stack-sampling watchdog thread for one event loop."""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, history: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[Stall] = deque(maxlen=history)
+        self._sample_every = min(interval, threshold) / 2
+        self._lock = threading.Lock()
+        self._samples: _StackCounter = _StackCounter()
+        self._expected_wake = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._expected_wake = time.monotonic() + self.interval
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._thread.join(timeout=1.0)
+        self._task = None
+        self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - self._expected_wake, 0.0)
+            self._expected_wake = now + self.interval
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                self._record_stall(lag)
+            else:
+                with self._lock:
+                    self._samples.clear()
+
+    def _watchdog(self) -> None:
+        while not self._stopping.wait(self._sample_every):
+            if time.monotonic() - self._expected_wake < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = _format_stack(frame)
+            with self._lock:
+                self._samples[stack] += 1
+
+    def _record_stall(self, lag: float) -> None:
+        with self._lock:
+            samples = self._samples
+            self._samples = _StackCounter()
+        stack, count = samples.most_common(1)[0] if samples else (None, 0)
+        stall = Stall(seconds=lag, stack=stack, samples=sum(samples.values()))
+        self.stalls.append(stall)
+        EVENT_LOOP_STALLS.inc()
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f}ms",
+            extra={"lag_ms": round(lag * 1000, 1), "stack_samples": stall.samples, "blocking_stack": stack}
+        )
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000
+)
+
+
+@asynccontextmanager
+async def detect_loop_blocking(budget_ms: Optional[float] = None) -> AsyncIterator[List[Stall]]:
+    """
+    Fail if the enclosed code blocks the event loop longer than `budget_ms`.
+
+    Usage (in an async test):
+        async with detect_loop_blocking(budget_ms=50):
+            await client.get("/api/v1/dashboard/summary")
+    """
+    budget = (settings.LOOP_BLOCK_THRESHOLD_MS if budget_ms is None else budget_ms) / 1000
+    monitor = LoopMonitor(interval=min(budget, 0.01), threshold=budget)
+    monitor.start()
+    try:
+        yield monitor.stalls
+        # Let a heartbeat that is due right now observe a stall at the very end
+        await asyncio.sleep(monitor.interval * 2)
+    finally:
+        await monitor.stop()
+    if monitor.stalls:
+        worst = max(monitor.stalls, key=lambda stall: stall.seconds)
+        raise LoopBlocked(
+            f"Event loop blocked for {worst.seconds * 1000:.0f}ms (budget {budget * 1000:.0f}ms)\n"
+            f"{worst.stack or '(no stack sample)'}"
+        )
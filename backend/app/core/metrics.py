@@ -0,0 +1,299 @@
+"""
+In-process runtime metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are plain dicts keyed by label values, so
+recording a sample is a dict lookup and an addition under a lock; nothing is
+formatted until /metrics is scraped. Values that already live elsewhere (DB
+pool state) are read at scrape time through callbacks.
+
+Each worker process has its own registry; with several uvicorn workers the
+scraper sees whichever worker answers, so rates should be aggregated by the
+`instance` label Prometheus adds.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers fast cached reads up to slow report endpoints
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together on scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render_samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[MetricsRegistry] = REGISTRY
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+        self._callbacks: List[Callable[[], Dict[LabelValues, float]]] = []
+        if registry is not None:
+            registry.register(self)
+
+    def add_callback(self, callback: Callable[[], Dict[LabelValues, float]]) -> None:
+        """Read extra samples (label values -> value) at scrape time."""
+        self._callbacks.append(callback)
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _collect(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            values = dict(self._values)
+        for callback in self._callbacks:
+            values.update(callback())
+        return values
+
+    def render_samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._collect().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional[MetricsRegistry] = REGISTRY
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render_samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = {labels: (list(counts), total[0]) for labels, (counts, total) in self._series.items()}
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(bucket_labelnames, labels + (_format_value(float(bound)),))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+# --- Application metrics ---
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response.", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.")
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Database pool connections by state.", ("state",)
+)
+DB_POOL_UTILIZATION = Gauge(
+    "db_pool_utilization", "Checked out connections as a fraction of pool_size + max_overflow."
+)
+
+OUTBOUND_REQUEST_DURATION = Histogram(
+    "http_client_request_duration_seconds", "Outbound HTTP calls until response headers arrive.",
+    ("target", "method", "status")
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result")
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+# --- Database pool ---
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+def register_pool_metrics(
+    engine: Engine,
+    connections_gauge: Optional[Gauge] = None,
+    utilization_gauge: Optional[Gauge] = None
+) -> None:
+    """Read pool size / checked out / overflow from the engine at scrape time."""
+    def connections() -> Dict[LabelValues, float]:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return {}
+        return {
+            ("size",): pool.size(),
+            ("checked_out",): pool.checkedout(),
+            ("idle",): pool.checkedin(),
+            ("overflow",): max(pool.overflow(), 0),
+        }
+
+    def utilization() -> Dict[LabelValues, float]:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return {}
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        return {(): pool.checkedout() / capacity if capacity else 0.0}
+
+    (connections_gauge or DB_POOL_CONNECTIONS).add_callback(connections)
+    (utilization_gauge or DB_POOL_UTILIZATION).add_callback(utilization)
+
+
+# --- HTTP requests ---
+
+_route_templates: Dict[int, Dict[Tuple[object, str], str]] = {}
+
+
+def route_template(scope) -> Optional[str]:
+    """Path template of the route the router matched ("/api/v1/assets/{asset_id}")."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return None
+    templates = _route_templates.get(id(app))
+    if templates is None:
+        templates = {}
+        for route in getattr(app, "routes", []):
+            for method in getattr(route, "methods", None) or ():
+                templates.setdefault((getattr(route, "endpoint", None), method), route.path)
+        _route_templates[id(app)] = templates
+    return templates.get((endpoint, scope["method"]))
+
+
+class MetricsMiddleware:
+    """Count requests and time responses per route template (pure ASGI)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Unmatched paths share one label so scanners cannot blow up cardinality
+            route = route_template(scope) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method, route)
@@ -0,0 +1,222 @@
+"""
+Opt-in profiling of single requests.
+
+A request carrying `X-Profile: <PROFILE_TOKEN>` is profiled: a background
+thread samples the event loop thread's stack every PROFILE_SAMPLE_INTERVAL_MS
+and every SQL statement is timed. The result is kept in a small in-memory
+store and its id returned in the X-Profile-Id response header; fetch it from
+/api/v1/debug/profiles/{id} as JSON or as folded stacks
+(`?format=folded`, for flamegraph.pl or speedscope).
+
+Requests without the header only pay for the header check. Samples cover the
+loop thread plus the worker threads the request hands its computations to
+through profiled_in_thread() (coalesced routes, bootstrap sections). Work of
+other requests running concurrently on the loop shows up too, and a request
+that joins another one's coalesced computation only shows itself waiting;
+profile on a quiet worker when precision matters.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from hmac import compare_digest
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from app.core.config import settings
+from app.core.logging_config import request_id_var
+from app.core.query_stats import current_query_stats, track_queries
+
+
+T = TypeVar("T")
+
+
+class StackSampler:
+    """Background thread that counts folded stacks of one thread, plus any it is told to follow."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        # Replaced, never mutated, so the sampling thread can read it without a lock
+        self.followed_thread_ids: frozenset = frozenset()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._thread.join()
+
+    def follow(self, thread_id: int) -> None:
+        self.followed_thread_ids = self.followed_thread_ids | {thread_id}
+
+    def unfollow(self, thread_id: int) -> None:
+        self.followed_thread_ids = self.followed_thread_ids - {thread_id}
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in (self.thread_id, *self.followed_thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[_fold(frame)] += 1
+                    self.samples += 1
+
+
+# Sampler of the profiled request this context belongs to (None when not profiling)
+_request_sampler: ContextVar[Optional[StackSampler]] = ContextVar("request_sampler", default=None)
+
+
+def profiled_in_thread(fn: Callable[[], T]) -> Callable[[], T]:
+    """
+    Wrap a computation handed to a worker thread so a profiled request's
+    sampler follows that thread while it runs; `fn` itself when not profiling.
+    """
+    sampler = _request_sampler.get()
+    if sampler is None:
+        return fn
+
+    def run() -> T:
+        thread_id = threading.get_ident()
+        sampler.follow(thread_id)
+        try:
+            return fn()
+        finally:
+            sampler.unfollow(thread_id)
+    return run
+
+
+def _fold(frame) -> str:
+    """Root-first "func (file:line);..." string, one entry per frame."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def summarize_statements(statements: List[Tuple[str, float, int]]) -> List[Dict[str, Any]]:
+    """Group executed statements by SQL text, slowest total first."""
+    grouped: Dict[str, Dict[str, Any]] = {}
+    for statement, seconds, rows in statements:
+        entry = grouped.setdefault(statement, {"sql": statement, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0})
+        entry["count"] += 1
+        entry["total_ms"] += seconds * 1000
+        entry["max_ms"] = max(entry["max_ms"], seconds * 1000)
+        entry["rows"] += rows
+    for entry in grouped.values():
+        entry["total_ms"] = round(entry["total_ms"], 3)
+        entry["max_ms"] = round(entry["max_ms"], 3)
+    return sorted(grouped.values(), key=lambda entry: entry["total_ms"], reverse=True)
+
+
+class ProfileStore:
+    """Most recent profiles, oldest evicted first."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+profile_store = ProfileStore(settings.PROFILE_STORE_SIZE)
+
+
+def profile_token_valid(value: Optional[str]) -> bool:
+    """Whether a header value matches PROFILE_TOKEN (always False when no token is configured)."""
+    if not settings.PROFILE_TOKEN or not value:
+        return False
+    return compare_digest(value.encode("latin-1"), settings.PROFILE_TOKEN.encode("latin-1"))
+
+
+def folded_stacks(profile: Dict[str, Any]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].items())
+
+
+class RequestProfilerMiddleware:
+    """
+    Profile requests that send a valid X-Profile header (pure ASGI).
+
+    Added inside QueryStatsMiddleware so it can switch on per-statement
+    recording for the request's existing query collector.
+    """
+
+    def __init__(self, app, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store or profile_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILE_TOKEN:
+            await self.app(scope, receive, send)
+            return
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                token = value.decode("latin-1")
+                break
+        if not profile_token_valid(token):
+            await self.app(scope, receive, send)
+            return
+        await self._profile(scope, receive, send)
+
+    async def _profile(self, scope, receive, send):
+        profile_id = request_id_var.get() or uuid.uuid4().hex
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        status_code = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode("latin-1"))]
+            await send(message)
+
+        with ExitStack() as stack:
+            stats = current_query_stats() or stack.enter_context(track_queries())
+            stats.statements = []
+            started_at = datetime.now(timezone.utc)
+            start = time.perf_counter()
+            sampler.start()
+            sampler_token = _request_sampler.set(sampler)
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                _request_sampler.reset(sampler_token)
+                sampler.stop()
+                duration = time.perf_counter() - start
+                self.store.add({
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "started_at": started_at.isoformat(),
+                    "duration_ms": round(duration * 1000, 3),
+                    "sample_interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+                    "samples": sampler.samples,
+                    "stacks": dict(sampler.stacks.most_common()),
+                    "sql": {
+                        "count": stats.count,
+                        "rows": stats.rows,
+                        "total_ms": round(stats.milliseconds, 3),
+                        "statements": summarize_statements(stats.statements),
+                    },
+                })
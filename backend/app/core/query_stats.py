@@ -0,0 +1,160 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events count the statements, rows and time spent in the
+database while a QueryStats collector is active for the current context.
+QueryStatsMiddleware activates one per HTTP request, reports the numbers as
+X-DB-* response headers outside production and checks them against
+per-endpoint query budgets (QUERY_BUDGETS). With QUERY_BUDGET_ENFORCE on (in
+tests) a request over budget raises QueryBudgetExceeded, so regressions such
+as an extra debug query or an N+1 loop fail instead of going unnoticed.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Running totals for the statements executed in one request or block."""
+
+    __slots__ = ("count", "rows", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.rows = 0
+        self.seconds = 0.0
+        # Set to a list to also keep (statement, seconds, rows) per query (request profiling)
+        self.statements: Optional[List[Tuple[str, float, int]]] = None
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000.0
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in test mode when an endpoint runs more queries than its budget."""
+
+
+_current_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Collector of the current request, if any."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collect query stats for the enclosed block.
+
+    Usage:
+        with track_queries() as stats:
+            get_dashboard_summary(...)
+        assert stats.count <= 5
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    elapsed = time.perf_counter() - start_times.pop() if start_times else 0.0
+    stats.seconds += elapsed
+    stats.count += 1
+    # psycopg2 reports the number of rows fetched for SELECTs, affected rows otherwise
+    rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+    stats.rows += rows
+    if stats.statements is not None:
+        stats.statements.append((statement, elapsed, rows))
+
+
+def install_query_instrumentation(engine: Engine) -> None:
+    """Attach the counting hooks to an engine (cheap no-ops outside a collector)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Collect query stats per HTTP request (pure ASGI).
+
+    Budgets are keyed by "METHOD /route/template", e.g.
+    "GET /api/v1/assets/". The route template is resolved from the endpoint
+    the router matched, so path parameters do not need their own entries.
+    """
+
+    def __init__(
+        self,
+        app,
+        expose_headers: Optional[bool] = None,
+        budgets: Optional[Dict[str, int]] = None,
+        enforce: Optional[bool] = None
+    ):
+        self.app = app
+        self.expose_headers = (not settings.is_production) if expose_headers is None else expose_headers
+        self.budgets = settings.QUERY_BUDGETS if budgets is None else budgets
+        self.enforce = settings.QUERY_BUDGET_ENFORCE if enforce is None else enforce
+
+    def _route_key(self, scope) -> Optional[str]:
+        template = route_template(scope)
+        return f"{scope['method']} {template}" if template else None
+
+    def _check_budget(self, scope, stats: QueryStats) -> None:
+        if not self.budgets:
+            return
+        route_key = self._route_key(scope)
+        budget = self.budgets.get(route_key) if route_key else None
+        if budget is None or stats.count <= budget:
+            return
+        message = f"{route_key} ran {stats.count} queries (budget {budget})"
+        if self.enforce:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message, extra={"query_count": stats.count, "query_budget": budget})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                # Non-streaming endpoints have finished all their queries by now
+                self._check_budget(scope, stats)
+                if self.expose_headers:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(stats.count).encode("latin-1")),
+                        (b"x-db-rows", str(stats.rows).encode("latin-1")),
+                        (b"x-db-time-ms", f"{stats.milliseconds:.1f}".encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
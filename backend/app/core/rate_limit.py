@@ -0,0 +1,219 @@
+"""
+Sliding-window rate limiting with pluggable backends.
+
+Each client key keeps two fixed-window counters (current and previous). The
+request rate is estimated as
+
+    previous * (1 - elapsed_fraction_of_current_window) + current
+
+which approximates a true sliding window with O(1) time and memory per
+client, instead of storing a timestamp per request.
+"""
+
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Tuple
+from app.core.config import settings
+from app.core.redis_client import RedisClient, parse_int
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a single rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+
+def _sliding_estimate(previous: int, current: int, elapsed_fraction: float) -> float:
+    return previous * (1.0 - elapsed_fraction) + current
+
+
+def _retry_after(previous: int, current: int, cost: int, limit: int,
+                 elapsed_fraction: float, window_seconds: float) -> float:
+    """Seconds until the estimate drops enough to admit `cost` more."""
+    if current + cost > limit:
+        # Even with the previous window fully decayed this one is too full
+        return (1.0 - elapsed_fraction) * window_seconds
+    if previous <= 0:
+        return 0.0
+    # previous * (1 - f) + current + cost <= limit  =>  f >= 1 - (limit - current - cost) / previous
+    needed_fraction = 1.0 - (limit - current - cost) / previous
+    return max(0.0, (needed_fraction - elapsed_fraction) * window_seconds)
+
+
+class RateLimitBackend(ABC):
+    """Storage for per-client window counters."""
+
+    @abstractmethod
+    async def hit(self, key: str, cost: int, limit: int, window_seconds: float) -> RateLimitResult:
+        """Record `cost` units for `key` if within `limit`, and report the outcome."""
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process backend with bounded memory.
+
+    Clients are kept in LRU order; clients idle for two windows are evicted
+    as new requests come in, and the table never holds more than
+    `max_clients` entries.
+    """
+
+    def __init__(self, max_clients: int = 10000, clock=time.monotonic):
+        self.max_clients = max_clients
+        self._clock = clock
+        # key -> (window_id, current_count, previous_count, last_seen)
+        self._clients: "OrderedDict[str, Tuple[int, int, int, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _evict(self, now: float, window_seconds: float) -> None:
+        idle_cutoff = now - 2 * window_seconds
+        while self._clients:
+            oldest_key, oldest = next(iter(self._clients.items()))
+            if len(self._clients) > self.max_clients or oldest[3] < idle_cutoff:
+                del self._clients[oldest_key]
+            else:
+                break
+
+    async def hit(self, key: str, cost: int, limit: int, window_seconds: float) -> RateLimitResult:
+        now = self._clock()
+        window_id = int(now // window_seconds)
+        elapsed_fraction = (now % window_seconds) / window_seconds
+
+        entry = self._clients.get(key)
+        if entry is None:
+            current, previous = 0, 0
+        else:
+            stored_window, stored_current, stored_previous, _ = entry
+            if stored_window == window_id:
+                current, previous = stored_current, stored_previous
+            elif stored_window == window_id - 1:
+                current, previous = 0, stored_current
+            else:
+                current, previous = 0, 0
+
+        allowed = _sliding_estimate(previous, current + cost, elapsed_fraction) <= limit
+        if allowed:
+            current += cost
+
+        self._clients[key] = (window_id, current, previous, now)
+        self._clients.move_to_end(key)
+        self._evict(now, window_seconds)
+
+        estimate = _sliding_estimate(previous, current, elapsed_fraction)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(0, int(limit - estimate)),
+            retry_after=0.0 if allowed else _retry_after(
+                previous, current, cost, limit, elapsed_fraction, window_seconds
+            )
+        )
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Shared backend for multiple workers/containers on a Redis-protocol server.
+
+    Uses only INCRBY/DECRBY/GET/PEXPIRE so any RESP-compatible stand-in
+    works. Counters expire after two windows, so memory is bounded by the
+    number of active clients. If the server is unreachable the limiter fails
+    open rather than rejecting traffic.
+    """
+
+    def __init__(self, client: RedisClient, prefix: str = "aura:rl"):
+        self.client = client
+        self.prefix = prefix
+
+    async def hit(self, key: str, cost: int, limit: int, window_seconds: float) -> RateLimitResult:
+        now = time.time()
+        window_id = int(now // window_seconds)
+        elapsed_fraction = (now % window_seconds) / window_seconds
+        current_key = f"{self.prefix}:{key}:{window_id}"
+        previous_key = f"{self.prefix}:{key}:{window_id - 1}"
+
+        try:
+            current, _, previous = await self.client.pipeline([
+                ("INCRBY", current_key, cost),
+                ("PEXPIRE", current_key, int(window_seconds * 2000)),
+                ("GET", previous_key),
+            ])
+            current = parse_int(current)
+            previous = parse_int(previous)
+
+            allowed = _sliding_estimate(previous, current, elapsed_fraction) <= limit
+            if not allowed:
+                # Rejected requests do not consume quota
+                await self.client.execute("DECRBY", current_key, cost)
+                current -= cost
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            return RateLimitResult(allowed=True, limit=limit, remaining=limit, retry_after=0.0)
+
+        estimate = _sliding_estimate(previous, current, elapsed_fraction)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(0, int(limit - estimate)),
+            retry_after=0.0 if allowed else _retry_after(
+                previous, current, cost, limit, elapsed_fraction, window_seconds
+            )
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Build the backend selected by RATE_LIMIT_BACKEND ('memory' or 'redis')."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("RATE_LIMIT_BACKEND=redis requires REDIS_URL")
+        return RedisRateLimitBackend(RedisClient(settings.REDIS_URL))
+    return InMemoryRateLimitBackend(max_clients=settings.RATE_LIMIT_MAX_CLIENTS)
+
+
+def route_cost(path: str, route_costs: Dict[str, int]) -> int:
+    """Cost of a request: the weight of the longest matching path prefix, default 1."""
+    best_prefix_length = -1
+    cost = 1
+    for prefix, weight in route_costs.items():
+        if path.startswith(prefix) and len(prefix) > best_prefix_length:
+            best_prefix_length = len(prefix)
+            cost = weight
+    return cost
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def client_key(scope, trusted_proxy_hops: int = 0) -> str:
+    """
+    Address a request is rate limited by.
+
+    Behind `trusted_proxy_hops` proxies the client is the entry that many
+    places from the right of X-Forwarded-For: entries further left come from
+    the client itself and could be forged to dodge the limit.
+    """
+    if trusted_proxy_hops > 0:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                hosts = [host.strip() for host in value.decode("latin-1").split(",")]
+                if len(hosts) >= trusted_proxy_hops and hosts[-trusted_proxy_hops]:
+                    return hosts[-trusted_proxy_hops]
+                break
+    client = scope.get("client")
+    return client[0] if client else "unknown"
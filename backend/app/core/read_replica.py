@@ -0,0 +1,226 @@
+"""
+Read-replica routing for read-only endpoints.
+
+With DATABASE_REPLICA_URL set, handlers that depend on get_read_db (see
+app.api.deps) query the replica instead of the primary, unless:
+
+- the user wrote recently: every committed write to a user's data pins that
+  user to the primary for READ_YOUR_WRITES_SECONDS (at least
+  REPLICA_MAX_LAG_SECONDS). Writes are recorded by the committing worker
+  right away and by every other worker through the invalidation bus, so the
+  pin holds whichever worker serves the next request;
+- the replica is lagging or unreachable: a monitor task measures its replay
+  lag every REPLICA_LAG_CHECK_SECONDS and sends all reads to the primary
+  while the lag exceeds REPLICA_MAX_LAG_SECONDS or the check fails;
+- the replica has not replayed the user's current data version yet: ETags
+  and cached responses are keyed by the users.data_version the primary
+  returned at authentication, so before a request reads from the replica
+  its users row must show at least that version. Pins and lag make this
+  rare, but they are timing based; the version check is what keeps an
+  older body from being tagged and cached under a newer version.
+
+Writes always use the primary session from get_db.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.data_version import WRITTEN_USERS
+from app.core.database import replica_engine, ReplicaSessionLocal, SessionLocal
+from app.core.metrics import Counter, Gauge, register_pool_metrics
+
+logger = logging.getLogger(__name__)
+
+DB_REPLICA_LAG = Gauge("db_replica_lag_seconds", "Replay lag of the read replica at the last check.")
+DB_REPLICA_AVAILABLE = Gauge("db_replica_available", "1 while reads may be routed to the replica.")
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions_total",
+    "Read sessions by database and reason (replica, pinned, lagging, unavailable, stale).",
+    ("target", "reason")
+)
+DB_REPLICA_POOL_CONNECTIONS = Gauge(
+    "db_replica_pool_connections", "Replica pool connections by state.", ("state",)
+)
+DB_REPLICA_POOL_UTILIZATION = Gauge(
+    "db_replica_pool_utilization", "Checked out replica connections as a fraction of pool_size + max_overflow."
+)
+
+# 0 while the replica has replayed everything it received: an idle primary
+# sends no new transactions, so the age of the last replayed one says nothing
+REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+# The replica's copy of one user's data version (psycopg2 paramstyle, raw cursor)
+REPLICA_USER_VERSION_SQL = "SELECT data_version FROM users WHERE id = %s"
+
+
+class ReplicaRouter:
+    """Decide per user whether reads may use the replica, and watch its lag."""
+
+    def __init__(
+        self,
+        engine: Optional[Engine],
+        max_lag_seconds: float = 5.0,
+        pin_seconds: float = 10.0,
+        check_interval: float = 5.0
+    ):
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        # A pin shorter than the tolerated lag would not guarantee read-your-writes
+        self.pin_seconds = max(pin_seconds, max_lag_seconds)
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._pinned: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def available(self) -> bool:
+        return self.engine is not None and self.lag is not None and self.lag <= self.max_lag_seconds
+
+    def record_write(self, user_id) -> None:
+        self._pinned[str(user_id)] = time.monotonic() + self.pin_seconds
+
+    async def handle_invalidation(self, user_id: str, entities: Set[str]) -> None:
+        """Invalidation listener handler: writes committed by any worker pin the user."""
+        self.record_write(user_id)
+
+    def is_pinned(self, user_id) -> bool:
+        until = self._pinned.get(str(user_id))
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._pinned.pop(str(user_id), None)
+            return False
+        return True
+
+    def use_replica(self, user_id) -> bool:
+        """Whether this user's next read may go to the replica (primary reads counted)."""
+        if self.engine is None:
+            return False
+        if not self.available:
+            DB_READ_SESSIONS.inc("primary", "lagging" if self.lag is not None else "unavailable")
+            return False
+        if self.is_pinned(user_id):
+            DB_READ_SESSIONS.inc("primary", "pinned")
+            return False
+        return True
+
+    @staticmethod
+    def _replica_data_version(session: Session, user_id) -> Optional[int]:
+        # Raw cursor in the session's transaction: bookkeeping, not a statement
+        # of the request as far as query stats and budgets go
+        with session.connection().connection.dbapi_connection.cursor() as cursor:
+            cursor.execute(REPLICA_USER_VERSION_SQL, (str(user_id),))
+            row = cursor.fetchone()
+        return None if row is None else int(row[0])
+
+    def session_for(self, user) -> Optional[Session]:
+        """
+        A replica session for this user's read, or None to read from the primary.
+
+        Only when use_replica() allows it and the replica has replayed at least
+        the data version `user` was loaded with from the primary.
+        """
+        if not self.use_replica(user.id):
+            return None
+        session = ReplicaSessionLocal()
+        try:
+            replica_version = self._replica_data_version(session, user.id)
+        except Exception as e:
+            session.close()
+            logger.warning(f"Read replica check failed, reading from the primary: {e}")
+            DB_READ_SESSIONS.inc("primary", "unavailable")
+            return None
+        if replica_version is None or replica_version < (user.data_version or 0):
+            session.close()
+            DB_READ_SESSIONS.inc("primary", "stale")
+            return None
+        DB_READ_SESSIONS.inc("replica", "replica")
+        return session
+
+    def _measure_lag(self) -> float:
+        with self.engine.connect() as connection:
+            return float(connection.execute(REPLICA_LAG_SQL).scalar() or 0.0)
+
+    async def check(self) -> None:
+        """Measure replica lag once; failures make the replica unavailable."""
+        try:
+            lag = await asyncio.to_thread(self._measure_lag)
+        except Exception as e:
+            if self.lag is not None:
+                logger.warning(f"Read replica unavailable, reading from the primary: {e}")
+            self.lag = None
+        else:
+            if self.lag is not None and self.lag <= self.max_lag_seconds < lag:
+                logger.warning(f"Read replica lagging {lag:.1f}s, reading from the primary")
+            self.lag = lag
+            DB_REPLICA_LAG.set(lag)
+        DB_REPLICA_AVAILABLE.set(1 if self.available else 0)
+        # Forget expired pins so the map stays as small as the set of recent writers
+        now = time.monotonic()
+        for user_id in [user_id for user_id, until in self._pinned.items() if until <= now]:
+            del self._pinned[user_id]
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        if self.engine is None or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def _pin_written_users(session: Session) -> None:
+    for user_id in session.info.pop(WRITTEN_USERS, ()):
+        replica_router.record_write(user_id)
+
+
+def _discard_written_users(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(WRITTEN_USERS, None)
+
+
+def install_read_your_writes(session_factory: sessionmaker) -> None:
+    """Pin users to the primary when a session of this factory commits writes to their data."""
+    for name, listener in (
+        ("after_commit", _pin_written_users),
+        ("after_soft_rollback", _discard_written_users),
+    ):
+        if not event.contains(session_factory, name, listener):
+            event.listen(session_factory, name, listener)
+
+
+if replica_engine is not None:
+    register_pool_metrics(replica_engine, DB_REPLICA_POOL_CONNECTIONS, DB_REPLICA_POOL_UTILIZATION)
+
+replica_router = ReplicaRouter(
+    replica_engine,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_SECONDS
+)
+
+# This worker's own commits pin at once; other workers learn from the invalidation bus
+install_read_your_writes(SessionLocal)
@@ -0,0 +1,149 @@
+"""
+Minimal asyncio client for Redis-protocol (RESP2) servers.
+
+Only what the shared backends need: send commands, optionally pipelined,
+over a small pool of connections. Works with Redis, Valkey, KeyDB or any
+local stand-in that speaks RESP, without adding a client library dependency.
+"""
+
+import asyncio
+from typing import Any, List, Optional, Sequence, Union
+from urllib.parse import urlparse, unquote
+
+Command = Sequence[Union[str, bytes, int, float]]
+
+
+class RedisError(Exception):
+    """Error reply from the server or a protocol/connection failure."""
+
+
+def _encode_command(args: Command) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        else:
+            data = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise RedisError("Connection closed by server")
+    prefix, payload = line[:1], line[1:-2]
+
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        return RedisError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(count)]
+    raise RedisError(f"Unexpected reply prefix: {prefix!r}")
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, commands: Sequence[Command]) -> List[Any]:
+        self.writer.write(b"".join(_encode_command(cmd) for cmd in commands))
+        await self.writer.drain()
+        return [await _read_reply(self.reader) for _ in commands]
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RedisClient:
+    """
+    Pooled RESP client.
+
+    Usage:
+        client = RedisClient("redis://localhost:6379/0")
+        await client.execute("SET", "key", "value")
+        replies = await client.pipeline([("INCR", "a"), ("GET", "b")])
+    """
+
+    def __init__(self, url: str, pool_size: int = 4, timeout: float = 1.0):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", ""):
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        path = (parsed.path or "").lstrip("/")
+        self.db = int(path) if path else 0
+        self.timeout = timeout
+        self._pool_size = pool_size
+        self._idle: List[_Connection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        conn = _Connection(reader, writer)
+        setup: List[Command] = []
+        if self.password:
+            setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            for reply in await conn.send(setup):
+                if isinstance(reply, RedisError):
+                    conn.close()
+                    raise reply
+        return conn
+
+    async def pipeline(self, commands: Sequence[Command]) -> List[Any]:
+        """Send several commands in one round trip and return their replies in order."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._pool_size)
+
+        async with self._semaphore:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                replies = await asyncio.wait_for(conn.send(commands), timeout=self.timeout)
+            except BaseException:
+                # The connection may hold a partial reply; never reuse it
+                conn.close()
+                raise
+            self._idle.append(conn)
+
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    async def execute(self, *args: Union[str, bytes, int, float]) -> Any:
+        """Send a single command and return its reply."""
+        return (await self.pipeline([args]))[0]
+
+    async def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+
+def parse_int(reply: Any, default: int = 0) -> int:
+    """Convert a bulk-string/integer reply to int (None -> default)."""
+    if reply is None:
+        return default
+    return int(reply)
+
@@ -0,0 +1,251 @@
+"""
+Per-user response cache for read-heavy aggregate endpoints.
+
+Entries are keyed by (user id, endpoint, parameters, users.data_version).
+Every ORM write to a user's data bumps the data version in the same
+transaction (see app.core.data_version), so a write makes the user's old
+entries unreachable without any explicit invalidation. The in-process
+backend additionally drops them as soon as the invalidation bus reports the
+write (app.core.invalidation), from whichever worker it came; otherwise they
+age out through LRU eviction or their TTL.
+
+Bodies are stored as serialized JSON bytes, so a hit skips both the queries
+and the serialization. Backends are pluggable like the rate limiter's:
+in-memory per process by default (bounded by entry count and total bytes),
+or a Redis-protocol server shared across workers. A shared backend that is
+unreachable degrades to computing every response.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+import anyio
+import pydantic_core
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.core.metrics import Gauge, record_cache
+from app.core.profiling import profiled_in_thread
+from app.core.redis_client import RedisClient
+from app.core.serialization import JSONBytesResponse
+from app.core.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENTRIES = Gauge("response_cache_entries", "Entries held by the in-process response cache.")
+RESPONSE_CACHE_BYTES = Gauge("response_cache_bytes", "Body bytes held by the in-process response cache.")
+
+
+class CacheBackend(ABC):
+    """Storage for cached response bodies."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Cached body for `key`, or None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """Store `value` under `key` for at most `ttl_seconds`."""
+
+    async def invalidate_user(self, user_id: str) -> int:
+        """Drop all entries of a user and return how many were dropped."""
+        return 0
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Per-process LRU backend.
+
+    Holds at most `max_entries` entries and `max_bytes` of body data; the
+    least recently used entries are evicted first. Bodies larger than
+    `max_bytes` are not cached.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._clock = clock
+        # key -> (expires_at, body)
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # user id -> keys, for invalidate_user
+        self._user_keys: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.bytes -= len(value)
+        user_id = key.split(":", 1)[0]
+        keys = self._user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[user_id]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + ttl_seconds, value)
+        self._user_keys.setdefault(key.split(":", 1)[0], set()).add(key)
+        self.bytes += len(value)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate_user(self, user_id: str) -> int:
+        keys = list(self._user_keys.get(user_id, ()))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared backend on a Redis-protocol server.
+
+    Entries are written with a TTL (SET PX), so the server's own eviction
+    policy and expiry bound memory. Errors are logged and treated as misses.
+    Entries of older data versions are never read again and simply expire,
+    so invalidate_user is a no-op.
+    """
+
+    def __init__(self, client: RedisClient, prefix: str = "aura:rc"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.execute("GET", f"{self.prefix}:{key}")
+        except Exception as e:
+            logger.warning(f"Response cache backend unavailable: {e}")
+            return None
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        try:
+            await self.client.execute("SET", f"{self.prefix}:{key}", value, "PX", int(ttl_seconds * 1000))
+        except Exception as e:
+            logger.warning(f"Response cache backend unavailable: {e}")
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_cache_backend() -> CacheBackend:
+    """Build the backend selected by RESPONSE_CACHE_BACKEND ('memory' or 'redis')."""
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("RESPONSE_CACHE_BACKEND=redis requires REDIS_URL")
+        return RedisCacheBackend(RedisClient(settings.REDIS_URL))
+    return InMemoryCacheBackend(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES
+    )
+
+
+def cache_key(user: Any, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Key for `endpoint` of `user` at the user's current data version."""
+    digest = hashlib.sha1(
+        json.dumps(params or {}, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    return f"{user.id}:{endpoint}:{user.data_version or 0}:{digest}"
+
+
+def encode_body(content: Any) -> bytes:
+    """Serialize content the way FastAPI would render it for a JSON response."""
+    return pydantic_core.to_json(jsonable_encoder(content))
+
+
+class ResponseCache:
+    """
+    Cache of rendered JSON bodies in front of an aggregate computation.
+
+    Usage:
+        return await response_cache.response(
+            current_user, "insurance_hierarchy", {"policies_per_type": n},
+            lambda: InsuranceHierarchyService.build_hierarchy(db, current_user.id, n)
+        )
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        if isinstance(backend, InMemoryCacheBackend):
+            RESPONSE_CACHE_ENTRIES.add_callback(lambda: {(): len(backend)})
+            RESPONSE_CACHE_BYTES.add_callback(lambda: {(): backend.bytes})
+
+    async def get_or_compute(
+        self,
+        user: Any,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        compute: Callable[[], Any]
+    ) -> bytes:
+        """
+        Cached body, or the serialized result of `compute()` (which is then cached).
+
+        Concurrent misses for the same key are coalesced when `endpoint` is
+        one of SINGLE_FLIGHT_ROUTES.
+        """
+        key = cache_key(user, endpoint, params)
+        if self.enabled:
+            body = await self.backend.get(key)
+            record_cache(endpoint, body is not None)
+            if body is not None:
+                return body
+
+        async def compute_body() -> bytes:
+            if single_flight.enabled_for(endpoint):
+                body = await anyio.to_thread.run_sync(profiled_in_thread(lambda: encode_body(compute())))
+            else:
+                body = encode_body(compute())
+            if self.enabled:
+                await self.backend.set(key, body, self.ttl_seconds)
+            return body
+
+        return await single_flight.run(endpoint, key, compute_body)
+
+    async def response(
+        self,
+        user: Any,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        compute: Callable[[], Any]
+    ) -> JSONBytesResponse:
+        return JSONBytesResponse(await self.get_or_compute(user, endpoint, params, compute))
+
+    async def invalidate_user(self, user_id: str, entities: Set[str]) -> None:
+        """Evict a user's entries after a write (invalidation bus handler)."""
+        evicted = await self.backend.invalidate_user(user_id)
+        if evicted:
+            logger.debug(f"Evicted {evicted} cached responses of user {user_id} ({', '.join(sorted(entities))})")
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+response_cache = ResponseCache(
+    create_cache_backend(),
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
@@ -2,11 +2,13 @@
 Security utilities for authentication and authorization.
 """
 
+import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from app.core.config import settings
+from app.core.config import Settings, settings
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -39,3 +41,63 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
+# Audience of event stream tickets; verify_token() rejects tokens that carry one
+STREAM_TICKET_AUDIENCE = "event-stream"
+
+# Shipped SECRET_KEY default: public, so anything signed with it can be forged
+_PLACEHOLDER_SECRET_KEY = Settings.model_fields["SECRET_KEY"].default
+
+# jti -> expiry (epoch seconds) of tickets already used on this worker
+_redeemed_stream_tickets: Dict[str, float] = {}
+
+class StreamTicketsDisabled(Exception):
+    """Raised when asked for a stream ticket while SECRET_KEY cannot sign one safely."""
+
+def stream_tickets_enabled() -> bool:
+    """
+    Whether SECRET_KEY is fit to sign stream tickets.
+
+    User authentication goes through Supabase and never needed SECRET_KEY,
+    so a deployment may still run the placeholder. Tickets are refused then
+    (and for keys under 32 bytes) rather than signed with a known key.
+    """
+    secret_key = settings.SECRET_KEY
+    return secret_key != _PLACEHOLDER_SECRET_KEY and len(secret_key.encode("utf-8")) >= 32
+
+def create_stream_ticket(user_id: str) -> str:
+    """Create a short-lived, single-use ticket that opens the user's event stream."""
+    if not stream_tickets_enabled():
+        raise StreamTicketsDisabled("SECRET_KEY is the placeholder or shorter than 32 bytes")
+    return create_access_token(
+        {"sub": str(user_id), "aud": STREAM_TICKET_AUDIENCE, "jti": secrets.token_urlsafe(16)},
+        expires_delta=timedelta(seconds=settings.EVENTS_TICKET_SECONDS)
+    )
+
+def redeem_stream_ticket(ticket: str) -> Optional[str]:
+    """
+    User id of a valid stream ticket, or None if it is invalid, expired or used.
+
+    Used tickets are remembered until they expire, so a ticket copied from a
+    URL in a log is useless once its stream was opened, and useless
+    everywhere after EVENTS_TICKET_SECONDS. The record is per worker: with
+    several workers a ticket can be replayed on another worker within that
+    window, so keep EVENTS_TICKET_SECONDS short.
+    """
+    if not stream_tickets_enabled():
+        return None
+    try:
+        payload = jwt.decode(
+            ticket, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], audience=STREAM_TICKET_AUDIENCE
+        )
+    except JWTError:
+        return None
+    jti, expires_at = payload.get("jti"), payload.get("exp")
+    if not jti or not expires_at or not payload.get("sub"):
+        return None
+    now = time.time()
+    for used_jti in [used_jti for used_jti, expiry in _redeemed_stream_tickets.items() if expiry <= now]:
+        del _redeemed_stream_tickets[used_jti]
+    if jti in _redeemed_stream_tickets:
+        return None
+    _redeemed_stream_tickets[jti] = float(expires_at)
+    return payload["sub"]
@@ -2,80 +2,147 @@
 Security middleware for production deployment.
 """
 
-from fastapi import FastAPI, Request, HTTPException, status
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
-from starlette.middleware.sessions import SessionMiddleware
 import time
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 from app.core.config import settings
+from app.core.rate_limit import (
+    RateLimitBackend,
+    create_rate_limit_backend,
+    route_cost,
+    client_key,
+    retry_after_header
+)
 
 logger = logging.getLogger(__name__)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses."""
+# Allows the Sentry tunnel/ingest and Supabase while keeping everything else same-origin
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "connect-src 'self' "
+    "https://*.sentry.io "
+    "https://o4510169956679680.ingest.de.sentry.io "
+    "https://aura-asset-manager-production.up.railway.app "
+    "https://api.supabase.com "
+    "https://buuyvrysvjwqqfoyfbdr.supabase.co; "
+    "img-src 'self' data: https:; "
+    "script-src 'self' 'unsafe-inline'; "
+    "style-src 'self' 'unsafe-inline'; "
+    "font-src 'self' data:; "
+    "frame-ancestors 'none'; "
+    "base-uri 'self';"
+)
+
+def build_security_headers(production: bool) -> List[Tuple[bytes, bytes]]:
+    """Encoded security headers for one environment (HSTS only in production)."""
+    headers = {
+        "content-security-policy": CONTENT_SECURITY_POLICY,
+        "x-content-type-options": "nosniff",
+        "x-frame-options": "DENY",
+        "x-xss-protection": "1; mode=block",
+        "referrer-policy": "strict-origin-when-cross-origin",
+        "permissions-policy": "geolocation=(), microphone=(), camera=()",
+    }
+    if production:
+        headers["strict-transport-security"] = "max-age=31536000; includeSubDomains"
+    return [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+class SecurityHeadersMiddleware:
+    """
+    Add security headers to all responses (pure ASGI).
     
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
+    The header block is encoded once when the app is built and appended in
+    http.response.start, so requests pay no string building and streaming
+    responses pass through untouched. Headers of the same name set by a
+    route are replaced, matching the previous behaviour.
+    """
+    
+    def __init__(self, app, production: Optional[bool] = None, enabled: Optional[bool] = None):
+        self.app = app
+        if production is None:
+            production = settings.is_production
+        if enabled is None:
+            enabled = settings.ENABLE_SECURITY_HEADERS
+        self.headers = build_security_headers(production) if enabled else []
+        self.header_names = frozenset(name for name, _ in self.headers)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.headers:
+            await self.app(scope, receive, send)
+            return
         
-        if settings.ENABLE_SECURITY_HEADERS:
-            # Security headers for production
-            response.headers["X-Content-Type-Options"] = "nosniff"
-            response.headers["X-Frame-Options"] = "DENY"
-            response.headers["X-XSS-Protection"] = "1; mode=block"
-            response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-            response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-            
-            if settings.is_production:
-                # Strict Transport Security for HTTPS
-                response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-                # Content Security Policy
-                response.headers["Content-Security-Policy"] = (
-                    "default-src 'self'; "
-                    "script-src 'self' 'unsafe-inline'; "
-                    "style-src 'self' 'unsafe-inline'; "
-                    "img-src 'self' data: https:; "
-                    "connect-src 'self' https://*.supabase.co; "
-                    "frame-ancestors 'none';"
-                )
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value) for name, value in message.get("headers", [])
+                    if name.lower() not in self.header_names
+                ]
+                headers.extend(self.headers)
+                message["headers"] = headers
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware."""
+class RateLimitMiddleware:
+    """
+    Sliding-window rate limiting per client IP (pure ASGI).
     
-    def __init__(self, app, calls: int = 60, period: timedelta = timedelta(minutes=1)):
-        super().__init__(app)
+    Expensive routes consume more of the quota (RATE_LIMIT_ROUTE_COSTS).
+    State lives in a RateLimitBackend: in-memory per process by default, or
+    a shared Redis-protocol server so limits hold across workers. Behind a
+    proxy, clients are told apart by X-Forwarded-For
+    (RATE_LIMIT_TRUSTED_PROXY_HOPS).
+    """
+    
+    def __init__(
+        self,
+        app,
+        calls: int = 60,
+        period: timedelta = timedelta(minutes=1),
+        backend: Optional[RateLimitBackend] = None,
+        route_costs: Optional[Dict[str, int]] = None,
+        trusted_proxy_hops: Optional[int] = None
+    ):
+        self.app = app
         self.calls = calls
-        self.period = period
-        self.clients = defaultdict(list)
+        self.window_seconds = period.total_seconds()
+        self.backend = backend or create_rate_limit_backend()
+        self.route_costs = settings.RATE_LIMIT_ROUTE_COSTS if route_costs is None else route_costs
+        self.trusted_proxy_hops = (
+            settings.RATE_LIMIT_TRUSTED_PROXY_HOPS if trusted_proxy_hops is None else trusted_proxy_hops
+        )
     
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "unknown"
-        now = datetime.now()
+    async def __call__(self, scope, receive, send):
+        # CORS preflights are never limited
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
         
-        # Clean old entries
-        self.clients[client_ip] = [
-            timestamp for timestamp in self.clients[client_ip]
-            if now - timestamp < self.period
-        ]
+        client_ip = client_key(scope, self.trusted_proxy_hops)
+        cost = route_cost(scope["path"], self.route_costs)
+        result = await self.backend.hit(client_ip, cost, self.calls, self.window_seconds)
         
-        # Check rate limit
-        if len(self.clients[client_ip]) >= self.calls:
+        if not result.allowed:
             logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            raise HTTPException(
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please try again later."
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers={
+                    "Retry-After": retry_after_header(result.retry_after),
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0"
+                }
             )
+            await response(scope, receive, send)
+            return
         
-        # Add current request
-        self.clients[client_ip].append(now)
-        
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Log all requests for monitoring."""
@@ -103,6 +170,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
 
 def setup_security_middleware(app: FastAPI):
     """Set up all security middleware for the application."""
+    # Imported here: SessionMiddleware needs itsdangerous, which is not a
+    # requirement of apps that only use the headers/rate limit middleware
+    from starlette.middleware.sessions import SessionMiddleware
     
     # Session middleware (if needed)
     app.add_middleware(
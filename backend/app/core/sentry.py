@@ -0,0 +1,134 @@
+"""
+Sentry initialisation with per-route, load-aware trace sampling.
+
+Every transaction goes through `traces_sampler`:
+
+1. The rate comes from SENTRY_ROUTE_SAMPLE_RATES, matched by the longest
+   "METHOD /prefix" or "/prefix" rule, falling back to
+   SENTRY_TRACES_SAMPLE_RATE.
+2. A caller that did not sample its trace (distributed tracing from the
+   frontend) is followed, so no orphan server halves are sent. A caller that
+   did sample is not: browsers choose their own rate, so honouring it would
+   let every client bypass the route rates and the load cap below.
+3. Under load the rate is scaled down so this process sends at most about
+   SENTRY_MAX_TRACES_PER_SECOND traces, no matter how much traffic arrives.
+
+Profiles are taken for SENTRY_PROFILES_SAMPLE_RATE of the sampled traces.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import sentry_sdk
+from sentry_sdk.integrations.fastapi import FastApiIntegration
+from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _compile_route_rates(route_rates: Dict[str, float]) -> List[Tuple[Optional[str], str, float]]:
+    """Parse "METHOD /prefix" / "/prefix" keys, most specific rules first."""
+    rules = []
+    for key, rate in route_rates.items():
+        method, _, prefix = key.strip().rpartition(" ")
+        rules.append((method.upper() or None, prefix, float(rate)))
+    # Longer prefixes first; method-specific rules before method-agnostic ones
+    rules.sort(key=lambda rule: (len(rule[1]), rule[0] is not None), reverse=True)
+    return rules
+
+
+class LoadAdaptiveRate:
+    """
+    Scale sampling down when the expected traces per second exceed a budget.
+
+    Each sampler call adds its base rate to the current one-second bucket;
+    completed buckets feed an exponentially weighted moving average of the
+    expected traces per second. The multiplier is budget / average, capped
+    at 1, so quiet periods sample at the configured rates and traffic
+    spikes cost a bounded number of traces.
+    """
+
+    def __init__(self, max_per_second: float, smoothing: float = 0.3, clock=time.monotonic):
+        self.max_per_second = max_per_second
+        self.smoothing = smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._bucket_start = clock()
+        self._bucket_weight = 0.0
+        self._average = 0.0
+
+    def record(self, base_rate: float) -> float:
+        """Account for one transaction with `base_rate` and return the multiplier to apply."""
+        if self.max_per_second <= 0:
+            return 1.0
+        now = self._clock()
+        with self._lock:
+            elapsed = now - self._bucket_start
+            if elapsed >= 1.0:
+                observed = self._bucket_weight / elapsed
+                self._average += self.smoothing * (observed - self._average)
+                self._bucket_start = now
+                self._bucket_weight = 0.0
+            self._bucket_weight += base_rate
+            # The current bucket counts too, so a sudden burst reacts within the second
+            expected = max(self._average, self._bucket_weight)
+        if expected <= self.max_per_second:
+            return 1.0
+        return self.max_per_second / expected
+
+
+class TracesSampler:
+    """Callable passed to sentry_sdk.init(traces_sampler=...)."""
+
+    def __init__(
+        self,
+        default_rate: float,
+        route_rates: Dict[str, float],
+        max_traces_per_second: float = 0.0
+    ):
+        self.default_rate = default_rate
+        self.rules = _compile_route_rates(route_rates)
+        self.load = LoadAdaptiveRate(max_traces_per_second)
+
+    def route_rate(self, method: str, path: str) -> float:
+        for rule_method, prefix, rate in self.rules:
+            if (rule_method is None or rule_method == method) and path.startswith(prefix):
+                return rate
+        return self.default_rate
+
+    def __call__(self, sampling_context: Dict[str, Any]) -> float:
+        scope = sampling_context.get("asgi_scope") or {}
+        rate = self.route_rate(scope.get("method", ""), scope.get("path", ""))
+        if rate <= 0:
+            return 0.0
+
+        if sampling_context.get("parent_sampled") is False:
+            return 0.0
+
+        return rate * self.load.record(rate)
+
+
+def init_sentry() -> None:
+    """Initialise the Sentry SDK from settings (no-op without a DSN)."""
+    if not settings.SENTRY_DSN:
+        logger.info("Sentry disabled: no SENTRY_DSN configured")
+        return
+
+    integrations = [FastApiIntegration()]
+    if settings.SENTRY_SQLALCHEMY_SPANS:
+        integrations.append(SqlalchemyIntegration())
+
+    sentry_sdk.init(
+        dsn=settings.SENTRY_DSN,
+        integrations=integrations,
+        traces_sampler=TracesSampler(
+            default_rate=settings.SENTRY_TRACES_SAMPLE_RATE,
+            route_rates=settings.SENTRY_ROUTE_SAMPLE_RATES,
+            max_traces_per_second=settings.SENTRY_MAX_TRACES_PER_SECOND
+        ),
+        # Fraction of sampled transactions that are also profiled
+        profiles_sample_rate=settings.SENTRY_PROFILES_SAMPLE_RATE,
+        environment=settings.SENTRY_ENVIRONMENT or settings.ENVIRONMENT,
+    )
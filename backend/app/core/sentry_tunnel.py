@@ -0,0 +1,208 @@
+"""
+Fire-and-forget forwarding of frontend Sentry envelopes.
+
+The tunnel endpoint only puts the envelope on a bounded in-memory queue and
+answers 202 straight away. A few background workers drain the queue in small
+batches and post each envelope to Sentry over one pooled HTTP client,
+retrying network errors, 429 and 5xx responses with exponential backoff.
+When the queue is full new envelopes are rejected (the endpoint answers 429
+with Retry-After, which the browser SDK honours), so an error storm on the
+frontend costs a bounded amount of memory and never ties up API workers
+waiting on Sentry. Without a DSN to forward to the tunnel is disabled and the
+endpoint answers 404.
+"""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import httpx
+from starlette.requests import Request
+from app.core.config import settings
+from app.core.http_client import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+
+def envelope_url_from_dsn(dsn: str) -> Optional[str]:
+    """Sentry envelope ingestion URL for a DSN (None if the DSN is empty or malformed)."""
+    if not dsn:
+        return None
+    parsed = urlparse(dsn)
+    project_id = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+    if not parsed.hostname or not project_id:
+        return None
+    host = parsed.hostname if parsed.port is None else f"{parsed.hostname}:{parsed.port}"
+    return f"{parsed.scheme}://{host}/api/{project_id}/envelope/"
+
+
+class EnvelopeTooLarge(Exception):
+    """Raised while reading an envelope that exceeds the size limit."""
+
+
+async def read_envelope(request: Request, max_bytes: int) -> bytes:
+    """
+    Read a request body of at most `max_bytes`.
+
+    A declared Content-Length over the limit is rejected before any of the
+    body is read; otherwise the body is streamed and reading stops as soon
+    as it grows past the limit, so oversized or chunked uploads never sit
+    in memory whole.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise EnvelopeTooLarge()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise EnvelopeTooLarge()
+    return bytes(body)
+
+
+@dataclass
+class _Envelope:
+    body: bytes
+    user_agent: str
+    attempts: int = 0
+
+
+class SentryTunnelForwarder:
+    """Bounded queue plus background workers that forward envelopes to Sentry."""
+
+    def __init__(
+        self,
+        url: Optional[str],
+        max_queue: int = 1000,
+        workers: int = 2,
+        batch_size: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 10.0
+    ):
+        self.url = url
+        self.max_queue = max_queue
+        self.worker_count = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.stats: Dict[str, int] = {"queued": 0, "forwarded": 0, "rejected": 0, "retried": 0, "failed": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def enabled(self) -> bool:
+        """Whether there is a Sentry project to forward envelopes to."""
+        return self.url is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Create the pooled client and worker tasks on the running event loop."""
+        if self._workers or not self.enabled:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=InstrumentedTransport(
+                limits=httpx.Limits(max_connections=self.worker_count * self.batch_size, max_keepalive_connections=self.worker_count)
+            )
+        )
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """Give queued envelopes a moment to go out, then stop the workers."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Sentry tunnel stopped with {self.queue_depth} envelopes still queued")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self._client.aclose()
+        self._client = None
+
+    def submit(self, body: bytes, user_agent: str = "") -> bool:
+        """Queue an envelope for forwarding; False if the queue is full."""
+        if not self.enabled:
+            raise RuntimeError("Sentry tunnel is disabled (no DSN)")
+        if not self._workers:
+            self.start()
+        try:
+            self._queue.put_nowait(_Envelope(body, user_agent))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.gather(*(self._forward(envelope) for envelope in batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        # Full jitter so retries from several workers do not line up
+        return random.uniform(0, delay)
+
+    async def _forward(self, envelope: _Envelope) -> None:
+        headers = {
+            "Content-Type": "application/x-sentry-envelope",
+            "User-Agent": envelope.user_agent,
+        }
+        while True:
+            retry_after = None
+            try:
+                response = await self._client.post(self.url, content=envelope.body, headers=headers)
+                if response.status_code < 400:
+                    self.stats["forwarded"] += 1
+                    return
+                if response.status_code != 429 and response.status_code < 500:
+                    # Malformed or rejected by Sentry; retrying will not help
+                    self.stats["failed"] += 1
+                    logger.debug("Sentry rejected tunnelled envelope: %s", response.status_code)
+                    return
+                retry_after = response.headers.get("Retry-After")
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = str(e) or type(e).__name__
+
+            if envelope.attempts >= self.max_retries:
+                self.stats["failed"] += 1
+                logger.warning(f"Dropping Sentry envelope after {envelope.attempts + 1} attempts: {error}")
+                return
+            delay = self._backoff(envelope.attempts, retry_after)
+            envelope.attempts += 1
+            self.stats["retried"] += 1
+            await asyncio.sleep(delay)
+
+
+sentry_tunnel_forwarder = SentryTunnelForwarder(
+    url=envelope_url_from_dsn(settings.SENTRY_TUNNEL_DSN or settings.SENTRY_DSN),
+    max_queue=settings.SENTRY_TUNNEL_QUEUE_SIZE,
+    workers=settings.SENTRY_TUNNEL_WORKERS,
+    max_retries=settings.SENTRY_TUNNEL_MAX_RETRIES
+)
@@ -0,0 +1,53 @@
+"""
+Fast JSON responses.
+
+FastAPI serializes a `response_model` by validating the returned objects,
+dumping them to JSON-compatible Python (Decimal -> str, UUID -> str, ...)
+and then encoding that with the stdlib json module. For large lists most of
+the time goes into building and re-walking those intermediate dicts.
+
+ResponseSerializer compiles a TypeAdapter for the response type once and
+serializes validated models straight to bytes in pydantic-core; list
+endpoints return `serializer.response(rows)` and keep `response_model=` for
+the OpenAPI schema. FastJSONResponse is the application's default response
+class and encodes already JSON-compatible content with pydantic-core as
+well. Output is the same JSON FastAPI would produce.
+"""
+
+from typing import Any, Dict, Optional
+import pydantic_core
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with pydantic-core instead of the json module."""
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+class JSONBytesResponse(Response):
+    """Response for a body that is already serialized JSON."""
+
+    media_type = "application/json"
+
+
+class ResponseSerializer:
+    """Precompiled validator/serializer for one response type."""
+
+    def __init__(self, response_type: Any):
+        self.adapter = TypeAdapter(response_type)
+
+    def dump(self, content: Any) -> bytes:
+        """Validate ORM objects (or models) and serialize them to JSON bytes."""
+        validated = self.adapter.validate_python(content, from_attributes=True)
+        return self.adapter.dump_json(validated, by_alias=True)
+
+    def response(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None
+    ) -> JSONBytesResponse:
+        return JSONBytesResponse(self.dump(content), status_code=status_code, headers=headers)
@@ -0,0 +1,103 @@
+"""
+Request coalescing ("single flight") for idempotent reads.
+
+Several tabs or components of the frontend often request the same summary
+for the same user at the same moment. For the routes listed in
+SINGLE_FLIGHT_ROUTES, the first request for a key computes the result and
+every identical request that arrives while it is in flight waits for that
+result instead of repeating the queries:
+
+    body = await single_flight.run_sync(
+        "assets", (current_user.id, current_user.data_version),
+        lambda: build_body(db, current_user)
+    )
+
+Keys must include everything the result depends on (user, data version,
+parameters), and the result must not be tied to one request: share
+serialized bytes, not ORM objects of the leader's session. Synchronous
+computations of coalesced routes run in a worker thread, otherwise no other
+request could join them while they hold the event loop.
+
+If the leading request fails, its waiters get the same exception; if it is
+cancelled (client went away), one of the waiters takes over.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Tuple, TypeVar
+import anyio
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.core.profiling import profiled_in_thread
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "single_flight_requests_total",
+    "Coalescable requests by route and whether they computed (leader) or waited (coalesced).",
+    ("route", "result")
+)
+
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the computing request was cancelled."""
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Avoid "exception was never retrieved" when nobody was waiting
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """In-flight computations per key, shared by concurrent callers."""
+
+    def __init__(self, routes: Iterable[str]):
+        self.routes = frozenset(routes)
+        self._calls: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+
+    def enabled_for(self, route: str) -> bool:
+        return route in self.routes
+
+    async def run(self, route: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await `fn()` once per (route, key) among concurrent callers."""
+        if route not in self.routes:
+            return await fn()
+        call_key = (route, key)
+        while True:
+            future = self._calls.get(call_key)
+            if future is None:
+                break
+            SINGLE_FLIGHT_REQUESTS.inc(route, "coalesced")
+            try:
+                # Shielded: a waiter going away must not cancel the shared call
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        SINGLE_FLIGHT_REQUESTS.inc(route, "leader")
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._calls[call_key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(call_key) is future:
+                del self._calls[call_key]
+
+    async def run_sync(self, route: str, key: Hashable, compute: Callable[[], T]) -> T:
+        """Like run() for a blocking computation, which is moved to a worker thread."""
+        if route not in self.routes:
+            return compute()
+        return await self.run(route, key, lambda: anyio.to_thread.run_sync(profiled_in_thread(compute)))
+
+
+single_flight = SingleFlight(settings.SINGLE_FLIGHT_ROUTES)
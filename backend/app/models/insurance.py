@@ -2,7 +2,7 @@
 Insurance model for SQLAlchemy.
 """
 
-from sqlalchemy import Column, String, DateTime, Text, Date, ForeignKey, Numeric, Integer
+from sqlalchemy import Column, String, DateTime, Text, Date, ForeignKey, Numeric, Integer, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -42,3 +42,24 @@ class InsurancePolicy(Base):
     def __repr__(self):
         return f"<InsurancePolicy(id={self.id}, name={self.policy_name}, type={self.policy_type})>"
 
+
+
+class InsuranceReminder(Base):
+    """Reminder generated for an upcoming policy renewal, expiry or premium due date."""
+    
+    __tablename__ = "insurance_reminders"
+    __table_args__ = (
+        UniqueConstraint("policy_id", "event_type", "event_date", name="uq_insurance_reminders_event"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    policy_id = Column(UUID(as_uuid=True), ForeignKey("insurance_policies.id", ondelete="CASCADE"), nullable=False)
+    event_type = Column(Text, nullable=False)  # 'renewal', 'expiry', 'premium_due'
+    event_date = Column(Date, nullable=False)
+    amount = Column(Numeric(18, 2))  # Premium amount for 'premium_due' events
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    notified_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<InsuranceReminder(policy_id={self.policy_id}, event={self.event_type}, date={self.event_date})>"
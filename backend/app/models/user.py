@@ -2,7 +2,7 @@
 User model for SQLAlchemy.
 """
 
-from sqlalchemy import Column, String, DateTime, Text, Boolean, Date, Integer
+from sqlalchemy import Column, String, DateTime, Text, Boolean, Date, Integer, BigInteger
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -19,6 +19,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     theme = Column(Text, default="default")
+    # Incremented on every write to the user's data (see app.core.data_version); drives ETags
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
     
     # User settings fields
     first_name = Column(String(100))
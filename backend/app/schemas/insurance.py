@@ -7,6 +7,9 @@ from datetime import datetime, date
 from typing import Optional, Dict, Any
 from uuid import UUID
 from decimal import Decimal
+import logging
+
+logger = logging.getLogger(__name__)
 
 class InsurancePolicyBase(BaseModel):
     """Base insurance policy schema."""
@@ -48,11 +51,9 @@ class InsurancePolicyBase(BaseModel):
     @validator('start_date', 'end_date', 'renewal_date', pre=True, always=False)
     def validate_optional_dates(cls, v):
         """Handle empty strings for optional date fields during input validation only."""
-        print(f"🔍 DATE VALIDATOR (Create) - Input: {v} (type: {type(v)})")
+        logger.debug("Date validator (Create) input: %r", v)
         if v == "" or v is None:
-            print(f"🔍 DATE VALIDATOR (Create) - Converting empty/None to None")
             return None
-        print(f"🔍 DATE VALIDATOR (Create) - Returning: {v}")
         return v
 
 class InsurancePolicyCreate(InsurancePolicyBase):
@@ -92,11 +93,9 @@ class InsurancePolicyUpdate(BaseModel):
     @validator('start_date', 'end_date', 'renewal_date', pre=True, always=False)
     def validate_optional_date_fields(cls, v):
         """Handle empty strings for optional date fields in updates."""
-        print(f"🔍 DATE VALIDATOR (Update) - Input: {v} (type: {type(v)})")
+        logger.debug("Date validator (Update) input: %r", v)
         if v == "" or v is None:
-            print(f"🔍 DATE VALIDATOR (Update) - Converting empty/None to None")
             return None
-        print(f"🔍 DATE VALIDATOR (Update) - Returning: {v}")
         return v
 
 class InsurancePolicyResponse(BaseModel):
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, validator
 from datetime import date, datetime
 from decimal import Decimal
@@ -79,3 +79,29 @@ class PaymentProjection(BaseModel):
 
     class Config:
         from_attributes = True
+
+class CashFlowPayment(BaseModel):
+    schedule_id: str
+    date: date
+    amount: Decimal
+    schedule_type: str
+    related_id: Optional[str] = None
+    related_type: Optional[str] = None
+
+class CashFlowPeriod(BaseModel):
+    period: str
+    inflow: Decimal
+    outflow: Decimal
+    net: Decimal
+    payment_count: int
+
+class CashFlowCalendar(BaseModel):
+    start_date: date
+    end_date: date
+    granularity: str
+    periods: List[CashFlowPeriod]
+    total_inflow: Decimal
+    total_outflow: Decimal
+    net: Decimal
+    payment_count: int
+    payments: Optional[List[CashFlowPayment]] = None
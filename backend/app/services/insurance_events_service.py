@@ -0,0 +1,173 @@
+"""
+Insurance upcoming-events service.
+
+Finds renewals, expiries and premium due dates of active policies within a
+window. The same set-based query backs the per-user endpoint and the batch
+reminder job, which covers every user in a single INSERT ... SELECT.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from app.services.insurance_hierarchy_service import PREMIUM_PERIOD_MONTHS
+
+EVENT_TYPES = ("renewal", "expiry", "premium_due")
+
+# Months between premium payments, keyed by lower-cased premium_frequency; the
+# same table annualizes premiums, so due dates and totals agree on every spelling.
+# Frequencies not listed there (e.g. one-off premiums) have no due dates.
+_PREMIUM_STEP_MONTHS_SQL = (
+    "CASE lower(p.premium_frequency) "
+    + " ".join(f"WHEN '{name}' THEN {months}" for name, months in PREMIUM_PERIOD_MONTHS.items())
+    + " END"
+)
+
+
+def _events_cte(user_scoped: bool) -> str:
+    """
+    Build the `events` CTE.
+
+    Renewal and expiry branches filter on the raw date columns so the
+    partial indexes on active policies are used. The premium branch computes
+    the next due date in closed form: k0 full periods since start_date, then
+    one more period if that lands before today.
+    """
+    user_filter = "AND p.user_id = :user_id" if user_scoped else ""
+    return f"""
+    events AS (
+        SELECT p.id AS policy_id, p.user_id, p.policy_name, p.policy_type, p.provider,
+               'renewal' AS event_type, p.renewal_date AS event_date,
+               NULL::numeric AS amount
+        FROM insurance_policies p
+        WHERE p.status = 'active' {user_filter}
+          AND p.renewal_date BETWEEN :today AND :horizon
+
+        UNION ALL
+
+        SELECT p.id, p.user_id, p.policy_name, p.policy_type, p.provider,
+               'expiry', p.end_date, NULL::numeric
+        FROM insurance_policies p
+        WHERE p.status = 'active' {user_filter}
+          AND p.end_date BETWEEN :today AND :horizon
+
+        UNION ALL
+
+        SELECT p.id, p.user_id, p.policy_name, p.policy_type, p.provider,
+               'premium_due', due.next_due, p.premium_amount
+        FROM insurance_policies p
+        CROSS JOIN LATERAL (SELECT {_PREMIUM_STEP_MONTHS_SQL} AS step_months) f
+        CROSS JOIN LATERAL (
+            SELECT floor(
+                (date_part('year', age(:today, p.start_date)) * 12
+                 + date_part('month', age(:today, p.start_date))) / f.step_months
+            )::int AS k0
+        ) k
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN p.start_date >= :today THEN p.start_date
+                WHEN (p.start_date + make_interval(months => k.k0 * f.step_months))::date >= :today
+                    THEN (p.start_date + make_interval(months => k.k0 * f.step_months))::date
+                ELSE (p.start_date + make_interval(months => (k.k0 + 1) * f.step_months))::date
+            END AS next_due
+        ) due
+        WHERE p.status = 'active' {user_filter}
+          AND p.start_date IS NOT NULL
+          AND f.step_months IS NOT NULL
+          AND due.next_due <= :horizon
+          AND (p.end_date IS NULL OR due.next_due <= p.end_date)
+    )
+    """
+
+
+_USER_EVENTS_SQL = text(f"""
+    WITH {_events_cte(user_scoped=True)}
+    SELECT policy_id, policy_name, policy_type, provider, event_type, event_date, amount,
+           (event_date - :today) AS days_until,
+           count(*) OVER () AS total_count
+    FROM events
+    WHERE event_type IN :event_types
+    ORDER BY event_date, event_type, policy_id
+    LIMIT :limit OFFSET :offset
+""").bindparams(bindparam("event_types", expanding=True))
+
+
+_REMINDERS_SQL = text(f"""
+    WITH {_events_cte(user_scoped=False)},
+    inserted AS (
+        INSERT INTO insurance_reminders (user_id, policy_id, event_type, event_date, amount)
+        SELECT user_id, policy_id, event_type, event_date, amount
+        FROM events
+        ON CONFLICT (policy_id, event_type, event_date) DO NOTHING
+        RETURNING user_id
+    )
+    SELECT count(*) AS reminders_created, count(DISTINCT user_id) AS users_notified
+    FROM inserted
+""")
+
+
+class InsuranceEventsService:
+    """Upcoming insurance events for the API and the reminder batch job."""
+
+    @staticmethod
+    def get_upcoming_events(
+        db: Session,
+        user_id: UUID,
+        days_ahead: int = 30,
+        event_types: Optional[Sequence[str]] = None,
+        limit: int = 50,
+        offset: int = 0,
+        today: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of a user's upcoming events, soonest first.
+
+        Returns:
+            {"events": [...], "total": int} where total counts all matching
+            events, not just this page
+        """
+        today = today or date.today()
+        rows = db.execute(_USER_EVENTS_SQL, {
+            "user_id": user_id,
+            "today": today,
+            "horizon": today + timedelta(days=days_ahead),
+            "event_types": list(event_types or EVENT_TYPES),
+            "limit": limit,
+            "offset": offset
+        }).all()
+
+        events: List[Dict[str, Any]] = [
+            {
+                "policy_id": str(row.policy_id),
+                "policy_name": row.policy_name,
+                "policy_type": row.policy_type,
+                "provider": row.provider,
+                "event_type": row.event_type,
+                "event_date": row.event_date.isoformat(),
+                "days_until": int(row.days_until),
+                "amount": float(row.amount) if row.amount is not None else None
+            }
+            for row in rows
+        ]
+        total = int(rows[0].total_count) if rows else 0
+        return {"events": events, "total": total}
+
+    @staticmethod
+    def compute_reminders(db: Session, days_ahead: int = 30, today: Optional[date] = None) -> Dict[str, int]:
+        """
+        Record reminders for every user's upcoming events in one statement.
+
+        Idempotent: the unique key (policy_id, event_type, event_date) means
+        re-running the job only inserts events that are new since last run.
+        The caller owns the transaction.
+        """
+        today = today or date.today()
+        row = db.execute(_REMINDERS_SQL, {
+            "today": today,
+            "horizon": today + timedelta(days=days_ahead)
+        }).one()
+        return {
+            "reminders_created": int(row.reminders_created),
+            "users_notified": int(row.users_notified)
+        }
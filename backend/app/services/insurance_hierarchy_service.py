@@ -0,0 +1,241 @@
+"""
+Insurance hierarchy aggregation service.
+"""
+
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app.models.insurance import InsurancePolicy
+
+# Type labels mapping
+TYPE_LABELS = {
+    'life': 'Life Insurance',
+    'health': 'Health Insurance',
+    'auto': 'Auto Insurance',
+    'home': 'Home Insurance',
+    'loan': 'Loan Insurance',
+    'travel': 'Travel Insurance',
+    'asset': 'Asset Insurance',
+    'factory': 'Factory Insurance',
+    'fire': 'Fire Insurance'
+}
+
+# Label of policies without a policy_type. Their type key stays None (null in
+# JSON) so no stored type, 'other' or 'unspecified' included, can share it.
+UNTYPED_LABEL = 'Insurance (No Type)'
+
+# Months between premium payments by lower-cased premium_frequency, with the
+# spellings the UI accepts (frontend/src/utils/insuranceAggregation.js)
+PREMIUM_PERIOD_MONTHS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'semi-annually': 6,
+    'semi-annual': 6,
+    'annually': 12,
+    'annual': 12,
+}
+
+# Default number of policy details returned per type in the mind map
+DEFAULT_POLICIES_PER_TYPE = 25
+
+
+def annual_premium_expression():
+    """
+    SQL expression that annualizes a policy premium from its frequency.
+    Unknown or missing frequencies are treated as annual (same as the UI).
+    """
+    frequency = func.lower(InsurancePolicy.premium_frequency)
+    multiplier = case(
+        *((frequency == name, 12 // months) for name, months in PREMIUM_PERIOD_MONTHS.items()),
+        else_=1
+    )
+    return func.coalesce(InsurancePolicy.premium_amount, 0) * multiplier
+
+
+def type_label(policy_type: Optional[str]) -> str:
+    """Human-readable label for a policy type (None: policies without one)."""
+    if policy_type is None:
+        return UNTYPED_LABEL
+    return TYPE_LABELS.get(policy_type, policy_type.capitalize() + ' Insurance')
+
+
+class InsuranceHierarchyService:
+    """Builds the insurance mind-map hierarchy with aggregation done in SQL."""
+
+    @staticmethod
+    def _active_policy_filter(user_id: UUID):
+        return (
+            InsurancePolicy.user_id == user_id,
+            InsurancePolicy.status == 'active'
+        )
+
+    @staticmethod
+    def _policy_type_filter(policy_type: Optional[str]):
+        if policy_type is None:
+            return InsurancePolicy.policy_type.is_(None)
+        return InsurancePolicy.policy_type == policy_type
+
+    @staticmethod
+    def get_type_totals(db: Session, user_id: UUID) -> Dict[str, Any]:
+        """
+        Aggregate coverage, annualized premium and counts per policy type.
+
+        Uses GROUP BY ROLLUP so the root totals come back as an extra row
+        (grouping = 1) in the same round trip. Policies without a type form
+        their own group with type None.
+
+        Returns:
+            {"root": {...}, "types": [{...}, ...]} sorted by coverage descending
+        """
+        stmt = (
+            select(
+                InsurancePolicy.policy_type,
+                func.grouping(InsurancePolicy.policy_type).label('is_total'),
+                func.coalesce(func.sum(InsurancePolicy.coverage_amount), 0).label('total_coverage'),
+                func.coalesce(func.sum(annual_premium_expression()), 0).label('total_annual_premium'),
+                func.count(InsurancePolicy.id).label('policy_count')
+            )
+            .where(*InsuranceHierarchyService._active_policy_filter(user_id))
+            .group_by(func.rollup(InsurancePolicy.policy_type))
+        )
+
+        root = {
+            'total_coverage': 0.0,
+            'total_annual_premium': 0.0,
+            'policy_count': 0
+        }
+        types: List[Dict[str, Any]] = []
+
+        for row in db.execute(stmt):
+            totals = {
+                'total_coverage': float(row.total_coverage),
+                'total_annual_premium': float(row.total_annual_premium),
+                'policy_count': int(row.policy_count)
+            }
+            if row.is_total:
+                root = totals
+                continue
+
+            policy_type = str(row.policy_type) if row.policy_type is not None else None
+            types.append({
+                'type': policy_type,
+                'type_label': type_label(policy_type),
+                **totals,
+                'policies': []
+            })
+
+        types.sort(key=lambda x: x['total_coverage'], reverse=True)
+        return {'root': root, 'types': types}
+
+    @staticmethod
+    def get_top_policies(
+        db: Session,
+        user_id: UUID,
+        limit_per_type: int,
+        policy_type: Optional[str] = None
+    ) -> Dict[Optional[str], List[Dict[str, Any]]]:
+        """
+        Fetch the top-N policies (by coverage) for each type.
+
+        A ROW_NUMBER window partitioned by type keeps this to a single query
+        regardless of how many types the user has. Policies without a type
+        are keyed by None.
+        """
+        if limit_per_type <= 0:
+            return {}
+
+        filters = list(InsuranceHierarchyService._active_policy_filter(user_id))
+        if policy_type is not None:
+            filters.append(InsuranceHierarchyService._policy_type_filter(policy_type))
+
+        rank = func.row_number().over(
+            partition_by=InsurancePolicy.policy_type,
+            order_by=(InsurancePolicy.coverage_amount.desc().nullslast(), InsurancePolicy.id)
+        ).label('rank')
+
+        ranked = (
+            select(
+                InsurancePolicy.id,
+                InsurancePolicy.policy_type,
+                InsurancePolicy.policy_name,
+                InsurancePolicy.coverage_amount,
+                annual_premium_expression().label('annual_premium'),
+                InsurancePolicy.provider,
+                InsurancePolicy.status,
+                InsurancePolicy.policy_number,
+                rank
+            )
+            .where(*filters)
+            .subquery()
+        )
+
+        stmt = (
+            select(ranked)
+            .where(ranked.c.rank <= limit_per_type)
+            .order_by(ranked.c.policy_type, ranked.c.rank)
+        )
+
+        policies_by_type: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for row in db.execute(stmt):
+            policy_type = str(row.policy_type) if row.policy_type is not None else None
+            policies_by_type.setdefault(policy_type, []).append(
+                InsuranceHierarchyService._policy_node(row)
+            )
+        return policies_by_type
+
+    @staticmethod
+    def get_type_policies(
+        db: Session,
+        user_id: UUID,
+        policy_type: Optional[str],
+        limit: int,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Page through the policies of a single type, None for untyped ones (drill-down on demand)."""
+        stmt = (
+            select(
+                InsurancePolicy.id,
+                InsurancePolicy.policy_name,
+                InsurancePolicy.coverage_amount,
+                annual_premium_expression().label('annual_premium'),
+                InsurancePolicy.provider,
+                InsurancePolicy.status,
+                InsurancePolicy.policy_number
+            )
+            .where(
+                *InsuranceHierarchyService._active_policy_filter(user_id),
+                InsuranceHierarchyService._policy_type_filter(policy_type)
+            )
+            .order_by(InsurancePolicy.coverage_amount.desc().nullslast(), InsurancePolicy.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return [InsuranceHierarchyService._policy_node(row) for row in db.execute(stmt)]
+
+    @staticmethod
+    def build_hierarchy(db: Session, user_id: UUID, policies_per_type: int) -> Dict[str, Any]:
+        """Aggregate totals and attach the top-N policy details to each type."""
+        hierarchy = InsuranceHierarchyService.get_type_totals(db, user_id)
+        if not hierarchy['types']:
+            return hierarchy
+
+        top_policies = InsuranceHierarchyService.get_top_policies(db, user_id, policies_per_type)
+        for type_data in hierarchy['types']:
+            type_data['policies'] = top_policies.get(type_data['type'], [])
+            type_data['has_more_policies'] = type_data['policy_count'] > len(type_data['policies'])
+
+        return hierarchy
+
+    @staticmethod
+    def _policy_node(row) -> Dict[str, Any]:
+        """Convert a result row into a mind-map policy node."""
+        return {
+            'id': str(row.id),
+            'name': str(row.policy_name) if row.policy_name else 'Unnamed Policy',
+            'coverage': float(row.coverage_amount) if row.coverage_amount is not None else 0.0,
+            'annual_premium': float(row.annual_premium) if row.annual_premium is not None else 0.0,
+            'provider': str(row.provider) if row.provider else 'Unknown Provider',
+            'status': str(row.status) if row.status else 'active',
+            'policy_number': str(row.policy_number) if row.policy_number else None
+        }
@@ -0,0 +1,206 @@
+"""
+Payment schedule projection engine.
+
+Occurrence dates are generated in closed form from the schedule's
+start_date: the k-th payment falls `k * step` months after it, with the day
+of month clamped to the length of the target month. Computing every date from
+start_date (instead of stepping from the previous payment, or from a
+next_payment_date that was already clamped) means a schedule starting on the
+31st pays on Jan 31, Feb 28/29, Mar 31, ... without drifting to the 28th.
+next_payment_date only marks where the unpaid occurrences begin.
+"""
+
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Months between payments for each supported frequency
+FREQUENCY_MONTHS = {
+    "monthly": 1,
+    "quarterly": 3,
+    "semi-annually": 6,
+    "annually": 12,
+}
+
+# Schedule types that are money coming in; everything else is an outflow
+INFLOW_SCHEDULE_TYPES = {"payment_in"}
+
+
+@lru_cache(maxsize=4096)
+def _days_in_month(year: int, month: int) -> int:
+    return monthrange(year, month)[1]
+
+
+def _month_index(d: date) -> int:
+    """Months since year 0, so month arithmetic is plain integer addition."""
+    return d.year * 12 + d.month - 1
+
+
+def _date_from_index(month_index: int, day: int) -> date:
+    year, month0 = divmod(month_index, 12)
+    month = month0 + 1
+    return date(year, month, min(day, _days_in_month(year, month)))
+
+
+def add_months(d: date, months: int) -> date:
+    """Add months to a date, clamping the day to the end of the target month."""
+    return _date_from_index(_month_index(d) + months, d.day)
+
+
+def next_occurrence_after(anchor: date, frequency: str, after: date) -> Optional[date]:
+    """First occurrence of a schedule starting on anchor that falls after `after`, if any."""
+    dates = occurrence_dates(anchor, frequency, window_start=after + timedelta(days=1), max_periods=1)
+    return dates[0] if dates else None
+
+
+def occurrence_dates(
+    anchor: date,
+    frequency: str,
+    window_start: Optional[date] = None,
+    window_end: Optional[date] = None,
+    end_date: Optional[date] = None,
+    max_periods: Optional[int] = None
+) -> List[date]:
+    """
+    All payment dates of a schedule within [window_start, window_end].
+
+    Args:
+        anchor: First payment date of the schedule (its start_date)
+        frequency: One of FREQUENCY_MONTHS
+        window_start: Skip occurrences before this date (defaults to anchor)
+        window_end: Last date to include
+        end_date: Schedule end date; no occurrences after it
+        max_periods: Cap on the number of dates returned
+
+    Returns:
+        Sorted list of dates. Unknown frequencies yield only the anchor.
+    """
+    last = min((d for d in (window_end, end_date) if d is not None), default=None)
+    if last is None and max_periods is None:
+        raise ValueError("occurrence_dates needs window_end, end_date or max_periods")
+
+    step = FREQUENCY_MONTHS.get(frequency)
+    if step is None:
+        in_window = (window_start is None or anchor >= window_start) and (last is None or anchor <= last)
+        return [anchor] if in_window and max_periods != 0 else []
+
+    base = _month_index(anchor)
+    day = anchor.day
+
+    # First period index inside the window, computed directly rather than by stepping
+    first_k = 0
+    if window_start is not None and window_start > anchor:
+        first_k = (_month_index(window_start) - base) // step
+        if _date_from_index(base + first_k * step, day) < window_start:
+            first_k += 1
+
+    if last is not None:
+        if last < anchor:
+            return []
+        last_k = (_month_index(last) - base) // step
+        if _date_from_index(base + last_k * step, day) > last:
+            last_k -= 1
+    else:
+        last_k = first_k + max_periods - 1
+
+    if max_periods is not None:
+        last_k = min(last_k, first_k + max_periods - 1)
+
+    return [_date_from_index(base + k * step, day) for k in range(first_k, last_k + 1)]
+
+
+def _period_key(d: date, granularity: str) -> str:
+    if granularity == "year":
+        return f"{d.year:04d}"
+    if granularity == "quarter":
+        return f"{d.year:04d}-Q{(d.month - 1) // 3 + 1}"
+    return f"{d.year:04d}-{d.month:02d}"
+
+
+def project_cash_flow(
+    schedules: Iterable[Any],
+    window_start: date,
+    window_end: date,
+    granularity: str = "month",
+    include_payments: bool = False
+) -> Dict[str, Any]:
+    """
+    Project many schedules at once into an aggregated cash-flow calendar.
+
+    Args:
+        schedules: Objects with start_date, next_payment_date, frequency,
+            end_date, amount, schedule_type and id (PaymentSchedule rows work
+            as-is); occurrences before next_payment_date are already paid
+        window_start: First date of the calendar
+        window_end: Last date of the calendar
+        granularity: 'month', 'quarter' or 'year'
+        include_payments: Also return each individual payment, sorted by date
+
+    Returns:
+        {"periods": [{"period", "inflow", "outflow", "net", "payment_count"}, ...],
+         "total_inflow", "total_outflow", "net", "payment_count", "payments"?}
+    """
+    inflow: Dict[str, Decimal] = defaultdict(Decimal)
+    outflow: Dict[str, Decimal] = defaultdict(Decimal)
+    counts: Dict[str, int] = defaultdict(int)
+    payments: List[Tuple[date, Dict[str, Any]]] = []
+
+    for schedule in schedules:
+        if schedule.next_payment_date is None:
+            continue
+
+        dates = occurrence_dates(
+            schedule.start_date,
+            schedule.frequency,
+            window_start=max(window_start, schedule.next_payment_date),
+            window_end=window_end,
+            end_date=schedule.end_date
+        )
+        if not dates:
+            continue
+
+        amount = Decimal(schedule.amount)
+        target = inflow if schedule.schedule_type in INFLOW_SCHEDULE_TYPES else outflow
+        for d in dates:
+            key = _period_key(d, granularity)
+            target[key] += amount
+            counts[key] += 1
+
+        if include_payments:
+            payments.extend(
+                (d, {
+                    "schedule_id": str(schedule.id),
+                    "date": d,
+                    "amount": amount,
+                    "schedule_type": schedule.schedule_type
+                })
+                for d in dates
+            )
+
+    periods = [
+        {
+            "period": key,
+            "inflow": inflow[key],
+            "outflow": outflow[key],
+            "net": inflow[key] - outflow[key],
+            "payment_count": counts[key]
+        }
+        for key in sorted(counts)
+    ]
+    total_inflow = sum(inflow.values(), Decimal("0"))
+    total_outflow = sum(outflow.values(), Decimal("0"))
+
+    result: Dict[str, Any] = {
+        "periods": periods,
+        "total_inflow": total_inflow,
+        "total_outflow": total_outflow,
+        "net": total_inflow - total_outflow,
+        "payment_count": sum(counts.values())
+    }
+    if include_payments:
+        payments.sort(key=lambda item: item[0])
+        result["payments"] = [payment for _, payment in payments]
+    return result
@@ -0,0 +1,322 @@
+"""
+Set-based payment schedule queries.
+
+These expand or advance schedules inside PostgreSQL so that work across many
+schedules is a single round trip instead of one projection call per schedule.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Date, bindparam, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+# to_char() formats matching the period keys used by payment_projection
+PERIOD_FORMATS = {
+    "month": "YYYY-MM",
+    "quarter": "YYYY-\"Q\"Q",
+    "year": "YYYY",
+}
+
+# Months between payments, keyed by payment_schedules.frequency
+_STEP_MONTHS_SQL = """
+    CASE s.frequency
+        WHEN 'monthly' THEN 1
+        WHEN 'quarterly' THEN 3
+        WHEN 'semi-annually' THEN 6
+        WHEN 'annually' THEN 12
+    END
+"""
+
+# Occurrences are generated as start_date + k * step months rather than
+# generate_series(start, stop, interval): Postgres applies an interval series
+# cumulatively, so a schedule on the 31st would drift to the 28th after
+# February. Adding k * step months to start_date clamps each date on its own;
+# anchoring on next_payment_date would carry an earlier clamp forward, so it
+# only bounds the window (occurrences before it are already paid). k starts at
+# the whole periods between start_date and the window start, which never
+# overshoots the first occurrence in the window, and ends one period past the
+# whole periods up to window_end; the outer filter trims both ends.
+_UPCOMING_CASH_FLOW_SQL = text(f"""
+    WITH occurrences AS (
+        SELECT s.id AS schedule_id,
+               s.related_id,
+               s.related_type,
+               s.schedule_type,
+               s.amount,
+               s.end_date,
+               f.window_lo,
+               (s.start_date + make_interval(months => k * f.step_months))::date AS payment_date
+        FROM payment_schedules s
+        CROSS JOIN LATERAL (
+            SELECT {_STEP_MONTHS_SQL} AS step_months,
+                   GREATEST(s.next_payment_date, :window_start) AS window_lo
+        ) f
+        CROSS JOIN LATERAL generate_series(
+            GREATEST(0, (date_part('year', age(f.window_lo, s.start_date)) * 12
+                         + date_part('month', age(f.window_lo, s.start_date)))::int / f.step_months),
+            ((date_part('year', age(:window_end, s.start_date)) * 12
+              + date_part('month', age(:window_end, s.start_date)))::int / f.step_months) + 1
+        ) AS k
+        WHERE s.user_id = :user_id
+          AND s.is_active = TRUE
+          AND s.next_payment_date IS NOT NULL
+          AND s.next_payment_date <= :window_end
+          AND f.step_months IS NOT NULL
+    ),
+    in_window AS (
+        SELECT o.*,
+               to_char(o.payment_date, :period_format) AS period,
+               CASE WHEN o.schedule_type = 'payment_in' THEN o.amount ELSE 0 END AS inflow,
+               CASE WHEN o.schedule_type = 'payment_in' THEN 0 ELSE o.amount END AS outflow
+        FROM occurrences o
+        WHERE o.payment_date BETWEEN o.window_lo AND :window_end
+          AND (o.end_date IS NULL OR o.payment_date <= o.end_date)
+    )
+    SELECT schedule_id, related_id, related_type, schedule_type, amount, payment_date, period,
+           sum(inflow) OVER (PARTITION BY period) AS period_inflow,
+           sum(outflow) OVER (PARTITION BY period) AS period_outflow,
+           count(*) OVER (PARTITION BY period) AS period_count
+    FROM in_window
+    ORDER BY payment_date, schedule_id
+""")
+
+
+# Upper bound (inclusive) of the next chunk of users with due schedules.
+# Keyset pagination over user_id keeps every chunk query an index range scan.
+# The bound is the chunk's last user_id: PostgreSQL has no max(uuid).
+_NEXT_USER_CHUNK_SQL = text("""
+    SELECT user_id AS upper_user_id
+    FROM (
+        SELECT DISTINCT s.user_id
+        FROM payment_schedules s
+        WHERE s.is_active = TRUE
+          AND s.next_payment_date IS NOT NULL
+          AND s.next_payment_date <= :as_of
+          AND s.user_id > :after_user_id
+        ORDER BY s.user_id
+        LIMIT :chunk_size
+    ) chunk
+    ORDER BY user_id DESC
+    LIMIT 1
+""").bindparams(
+    bindparam("as_of", type_=Date),
+    bindparam("after_user_id", type_=PG_UUID(as_uuid=True))
+).columns(upper_user_id=PG_UUID(as_uuid=True))
+
+# Catch up every due schedule of the users in (after_user_id, upper_user_id].
+# Like the cash-flow expansion, occurrences are start_date + k * step months.
+# k_first is the first occurrence on or after next_payment_date (the first
+# unpaid one), k_last the last one on or before limit_date (as_of capped by
+# end_date). age() gives the whole months elapsed; the CASEs add the period
+# that month-end clamping can hide from age() (e.g. Jan 31 -> Feb 29).
+# Rows locked by a concurrent record_payment call are skipped and picked up
+# by the next run. The raw UPDATE bypasses the ORM flush hooks, so the same
+# statement bumps users.data_version of every user it touched and, when
+# :notify is set, sends their invalidation NOTIFY (app.core.data_version).
+_CATCH_UP_SQL = text(f"""
+    WITH candidates AS (
+        SELECT s.id,
+               s.start_date AS anchor,
+               s.next_payment_date,
+               f.step_months,
+               LEAST(:as_of, COALESCE(s.end_date, :as_of)) AS limit_date
+        FROM payment_schedules s
+        CROSS JOIN LATERAL (SELECT {_STEP_MONTHS_SQL} AS step_months) f
+        WHERE s.is_active = TRUE
+          AND s.next_payment_date IS NOT NULL
+          AND s.next_payment_date <= :as_of
+          AND f.step_months IS NOT NULL
+          AND s.user_id > :after_user_id
+          AND s.user_id <= :upper_user_id
+        FOR UPDATE OF s SKIP LOCKED
+    ),
+    whole_periods AS (
+        SELECT c.*,
+               GREATEST(0, (date_part('year', age(c.next_payment_date, c.anchor)) * 12
+                            + date_part('month', age(c.next_payment_date, c.anchor)))::int / c.step_months) AS k_paid,
+               CASE WHEN c.limit_date < c.anchor THEN -1 ELSE
+                   ((date_part('year', age(c.limit_date, c.anchor)) * 12
+                     + date_part('month', age(c.limit_date, c.anchor)))::int / c.step_months)
+               END AS k_max
+        FROM candidates c
+    ),
+    due AS (
+        SELECT w.id,
+               w.k_paid
+                 + CASE WHEN (w.anchor + make_interval(months => w.k_paid * w.step_months))::date < w.next_payment_date
+                        THEN 1 ELSE 0 END AS k_first,
+               w.k_max
+                 + CASE WHEN w.k_max >= 0
+                         AND (w.anchor + make_interval(months => (w.k_max + 1) * w.step_months))::date <= w.limit_date
+                        THEN 1 ELSE 0 END AS k_last,
+               w.anchor,
+               w.step_months
+        FROM whole_periods w
+    ),
+    advanced AS (
+        SELECT d.id,
+               GREATEST(0, d.k_last - d.k_first + 1) AS periods,
+               (d.anchor + make_interval(months => GREATEST(d.k_last + 1, d.k_first) * d.step_months))::date
+                   AS new_next_date
+        FROM due d
+    ),
+    updated AS (
+        UPDATE payment_schedules s
+        SET total_payments_made = COALESCE(s.total_payments_made, 0) + a.periods,
+            total_amount_paid = COALESCE(s.total_amount_paid, 0) + a.periods * s.amount,
+            next_payment_date = CASE
+                WHEN s.end_date IS NOT NULL AND a.new_next_date > s.end_date THEN NULL
+                ELSE a.new_next_date
+            END,
+            is_active = NOT (s.end_date IS NOT NULL AND a.new_next_date > s.end_date),
+            updated_at = now()
+        FROM advanced a
+        WHERE s.id = a.id
+        RETURNING s.user_id, a.periods, s.is_active
+    ),
+    versioned AS (
+        UPDATE users u
+        SET data_version = u.data_version + 1
+        WHERE u.id IN (SELECT user_id FROM updated)
+        RETURNING u.id,
+                  CASE WHEN :notify THEN pg_notify(
+                      :channel,
+                      json_build_object('user_id', u.id::text, 'entities', json_build_array('payment_schedules'))::text
+                  ) END AS notified
+    )
+    SELECT count(*) AS schedules_updated,
+           COALESCE(sum(periods), 0) AS payments_recorded,
+           count(*) FILTER (WHERE NOT is_active) AS schedules_completed,
+           count(DISTINCT user_id) AS users_updated
+    FROM updated
+""")
+
+
+# Nil UUID sorts before every real user id, so it starts a full pass
+FIRST_USER_ID = UUID(int=0)
+
+
+class PaymentScheduleService:
+    """Database-side expansion and maintenance of payment schedules."""
+
+    @staticmethod
+    def get_upcoming_cash_flow(
+        db: Session,
+        user_id: UUID,
+        days_ahead: int = 30,
+        granularity: str = "month",
+        window_start: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Expand every active schedule's payments in the window in one query.
+
+        Returns:
+            Merged, date-sorted payments plus inflow/outflow totals per period,
+            in the same shape as payment_projection.project_cash_flow
+        """
+        window_start = window_start or date.today()
+        window_end = window_start + timedelta(days=days_ahead)
+
+        rows = db.execute(_UPCOMING_CASH_FLOW_SQL, {
+            "user_id": user_id,
+            "window_start": window_start,
+            "window_end": window_end,
+            "period_format": PERIOD_FORMATS[granularity]
+        }).all()
+
+        payments: List[Dict[str, Any]] = []
+        periods: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            payments.append({
+                "schedule_id": str(row.schedule_id),
+                "related_id": str(row.related_id),
+                "related_type": row.related_type,
+                "schedule_type": row.schedule_type,
+                "date": row.payment_date,
+                "amount": row.amount
+            })
+            if row.period not in periods:
+                periods[row.period] = {
+                    "period": row.period,
+                    "inflow": row.period_inflow,
+                    "outflow": row.period_outflow,
+                    "net": row.period_inflow - row.period_outflow,
+                    "payment_count": int(row.period_count)
+                }
+
+        period_list = sorted(periods.values(), key=lambda p: p["period"])
+        total_inflow = sum((p["inflow"] for p in period_list), Decimal("0"))
+        total_outflow = sum((p["outflow"] for p in period_list), Decimal("0"))
+
+        return {
+            "start_date": window_start,
+            "end_date": window_end,
+            "granularity": granularity,
+            "periods": period_list,
+            "total_inflow": total_inflow,
+            "total_outflow": total_outflow,
+            "net": total_inflow - total_outflow,
+            "payment_count": len(payments),
+            "payments": payments
+        }
+
+    @staticmethod
+    def iter_due_user_ranges(
+        db: Session,
+        as_of: date,
+        chunk_size: int = 500,
+        start_after: UUID = FIRST_USER_ID
+    ) -> Iterator[Tuple[UUID, UUID]]:
+        """
+        Yield (after_user_id, upper_user_id] ranges covering users with due schedules.
+
+        Each range holds at most chunk_size users. Ranges are computed lazily,
+        so schedules caught up by earlier chunks are not re-scanned.
+        """
+        after_user_id = start_after
+        while True:
+            upper_user_id = db.execute(_NEXT_USER_CHUNK_SQL, {
+                "as_of": as_of,
+                "after_user_id": after_user_id,
+                "chunk_size": chunk_size
+            }).scalar()
+            if upper_user_id is None:
+                return
+            yield after_user_id, upper_user_id
+            after_user_id = upper_user_id
+
+    @staticmethod
+    def catch_up_due_schedules(
+        db: Session,
+        as_of: date,
+        after_user_id: UUID,
+        upper_user_id: UUID
+    ) -> Dict[str, int]:
+        """
+        Advance all due schedules of one user range in a single UPDATE.
+
+        Every elapsed period up to as_of (capped at end_date) counts as paid:
+        total_payments_made and total_amount_paid are incremented and
+        next_payment_date moves past as_of. Schedules that run past their
+        end_date are deactivated. The data versions of affected users are
+        bumped in the same statement, so their ETags and cached responses
+        change on commit. Idempotent: after it runs, no schedule in
+        the range is due on as_of any more. The caller owns the transaction.
+        """
+        row = db.execute(_CATCH_UP_SQL, {
+            "as_of": as_of,
+            "after_user_id": after_user_id,
+            "upper_user_id": upper_user_id,
+            "notify": settings.INVALIDATION_BUS_ENABLED,
+            "channel": settings.INVALIDATION_CHANNEL
+        }).one()
+        return {
+            "schedules_updated": int(row.schedules_updated),
+            "payments_recorded": int(row.payments_recorded),
+            "schedules_completed": int(row.schedules_completed),
+            "users_updated": int(row.users_updated)
+        }
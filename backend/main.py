@@ -4,63 +4,103 @@ Main entry point for the FastAPI application.
 Updated: July 25, 2025 - CORS Fix Deployment + Cache Invalidation Fix
 """
 
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from app.core.logging_config import configure_logging, RequestLogContextMiddleware
 
-# Initialize Sentry for backend error tracking
-sentry_sdk.init(
-    dsn="https://27a3645cd8e778c6be27cf19eca40635@o4510169956679680.ingest.de.sentry.io/4510172314665040",
-    integrations=[
-        FastApiIntegration(),
-        SqlalchemyIntegration(),
-    ],
-    # Set tracesSampleRate to 1.0 to capture 100%
-    # of transactions for performance monitoring.
-    traces_sample_rate=1.0,
-    # Set profiles_sample_rate to 1.0 to profile 100%
-    # of sampled transactions.
-    # We recommend adjusting this value in production.
-    profiles_sample_rate=1.0,
-    environment="production",
-)
+# Set up logging before the application modules create their loggers
+configure_logging()
+logger = logging.getLogger(__name__)
+
+from app.core.sentry import init_sentry
+
+# Initialize Sentry for backend error tracking (sampling configured in Settings)
+init_sentry()
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from hmac import compare_digest
 from app.core.config import settings
-from app.api.v1 import auth, dashboard, assets, transactions, insurance, transaction_create, user_settings, feedback, profile, goals, tools
+from app.core.security_middleware import SecurityHeadersMiddleware, RateLimitMiddleware
+from app.core.security import stream_tickets_enabled
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.sentry_tunnel import EnvelopeTooLarge, read_envelope, sentry_tunnel_forwarder
+from app.core.http_client import close_http_client
+from app.core.loop_monitor import loop_monitor
+from app.core.response_cache import response_cache
+from app.core.invalidation import invalidation_listener
+from app.core.events import event_hub
+from app.core.read_replica import replica_router
+from app.core.profiling import RequestProfilerMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.admission import AdmissionControlMiddleware
+from app.core.deadlines import DeadlineMiddleware
+from app.core.serialization import FastJSONResponse
+from app.core.metrics import MetricsMiddleware, REGISTRY as METRICS_REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.api.v1 import auth, dashboard, assets, transactions, insurance, transaction_create, user_settings, feedback, profile, goals, tools, debug, bootstrap, events
 # Note: payment_schedules feature is disabled - requires frontend implementation before re-enabling
 # from app.api.v1 import payment_schedules
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background workers with the application."""
+    sentry_tunnel_forwarder.start()
+    if settings.METRICS_ENABLED and settings.is_production and not settings.METRICS_TOKEN:
+        logger.warning("/metrics disabled: set METRICS_TOKEN to expose it in production")
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    if settings.INVALIDATION_BUS_ENABLED:
+        invalidation_listener.subscribe(response_cache.invalidate_user)
+        if settings.DATABASE_REPLICA_URL:
+            # Writes committed by other workers pin their users to the primary too
+            invalidation_listener.subscribe(replica_router.handle_invalidation)
+    if settings.EVENTS_ENABLED and not stream_tickets_enabled():
+        logger.warning("Event stream tickets disabled: set SECRET_KEY to a private value of at least 32 bytes")
+    if settings.EVENTS_ENABLED:
+        invalidation_listener.add_channel(settings.EVENTS_CHANNEL, event_hub.handle_notification)
+    if settings.INVALIDATION_BUS_ENABLED or settings.EVENTS_ENABLED:
+        invalidation_listener.start()
+    replica_router.start()
+    yield
+    await replica_router.stop()
+    await invalidation_listener.stop()
+    await event_hub.stop()
+    await loop_monitor.stop()
+    await sentry_tunnel_forwarder.stop()
+    await close_http_client()
+    await response_cache.close()
+
 # Create FastAPI application instance
 app = FastAPI(
     title="Aura Asset Manager API",
     description="Backend API for the Aura Personal Asset Manager",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Custom validation exception handler for debugging
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    print(f"🚨 Validation Error Details:")
-    print(f"   URL: {request.url}")
-    print(f"   Method: {request.method}")
-    print(f"   Headers: {dict(request.headers)}")
-    
     body_content = None
     try:
         body = await request.body()
         body_content = body.decode() if body else None
-        print(f"   Body: {body_content}")
     except Exception as e:
-        print(f"   Body read error: {e}")
+        logger.warning(f"Could not read body of invalid request: {e}")
     
-    print(f"   Validation errors: {exc.errors()}")
-    print(f"   Full exception: {exc}")
+    logger.warning(
+        "Request validation failed",
+        extra={"method": request.method, "path": request.url.path, "errors": exc.errors()}
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in ("authorization", "cookie")}
+        logger.debug("Invalid request detail", extra={"headers": headers, "body": body_content})
     
     # Return the default FastAPI validation error response
     return JSONResponse(
@@ -68,10 +108,10 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors(), "body": body_content}
     )
 
-# Debug: Log CORS configuration
-print(f"🌐 CORS Configuration:")
-print(f"   Allowed Origins: {settings.ALLOWED_ORIGINS}")
-print(f"   Environment: {settings.ENVIRONMENT}")
+logger.info(
+    "CORS configuration",
+    extra={"allowed_origins": settings.ALLOWED_ORIGINS, "environment": settings.ENVIRONMENT}
+)
 
 # Configure CORS with dynamic origin checking for Vercel
 def is_allowed_origin(origin: str) -> bool:
@@ -110,12 +150,31 @@ def get_allowed_origins():
         if domain not in base_origins:
             base_origins.append(domain)
     
-    print(f"🔒 SECURE CORS: Using explicit origins: {base_origins}")
     return base_origins
 
+# Per-route deadlines for database work (503 on timeout, queries cancelled on disconnect);
+# innermost, so time spent queued for admission does not count
+if settings.REQUEST_DEADLINES_ENABLED:
+    app.add_middleware(DeadlineMiddleware)
+
+# Per route class concurrency caps and load shedding (503 + Retry-After).
+# Added before CORS so rejections carry CORS headers the frontend can read.
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
+# Per-client sliding-window rate limit (429 + Retry-After), when enabled.
+# Outside admission control so throttled clients never take a queue slot,
+# inside CORS so the frontend can read the 429; preflights pass untouched.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        calls=settings.RATE_LIMIT_PER_MINUTE,
+        period=timedelta(minutes=1)
+    )
+
 # SECURE CORS configuration with proper preflight handling
 origins = get_allowed_origins()
-print(f"🔒 CORS: Adding middleware with secure origins: {origins}")
+logger.info("CORS middleware origins", extra={"origins": origins})
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -142,56 +201,30 @@ app.add_middleware(
         # Standard Browser Headers
         "User-Agent",       # Browser identification
     ],
-    expose_headers=["Content-Length"],
+    expose_headers=["Content-Length", "Retry-After"],
     max_age=600,  # Cache preflight requests for 10 minutes
 )
 
-# Enhanced debugging for CORS/Auth errors + CSP Security Headers
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    """Add security headers including CSP for Sentry integration."""
-    method = request.method
-    path = str(request.url.path)
-    origin = request.headers.get("origin")
-    
-    # Debug CORS preflight requests
-    if method == "OPTIONS":
-        print(f"🔍 CORS Preflight: {method} {path}")
-        print(f"   Origin: {origin}")
-        print(f"   Headers: {dict(request.headers)}")
-    
-    response = await call_next(request)
-    
-    # Add Content Security Policy (CSP) headers
-    # This allows Sentry integration while maintaining security
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; "
-        "connect-src 'self' "
-        "https://*.sentry.io "
-        "https://o4510169956679680.ingest.de.sentry.io "
-        "https://aura-asset-manager-production.up.railway.app "
-        "https://api.supabase.com "
-        "https://buuyvrysvjwqqfoyfbdr.supabase.co; "
-        "img-src 'self' data: https:; "
-        "script-src 'self' 'unsafe-inline'; "
-        "style-src 'self' 'unsafe-inline'; "
-        "font-src 'self' data:; "
-        "frame-ancestors 'none'; "
-        "base-uri 'self';"
-    )
-    
-    # Additional security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-    
-    # HSTS in production
-    if settings.ENVIRONMENT == "production":
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    
-    return response
+# Security headers (CSP for Sentry integration, HSTS in production).
+# Added after CORS so preflight responses carry them too.
+app.add_middleware(SecurityHeadersMiddleware)
+
+# Opt-in single request profiling (X-Profile header); inside QueryStats to reuse its collector
+app.add_middleware(RequestProfilerMiddleware)
+
+# Per-request SQL counters (X-DB-* headers outside production) and query budgets
+app.add_middleware(QueryStatsMiddleware)
+
+# gzip/Brotli for large JSON responses
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Request counts and latency histograms per route for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Request id / per-request debug switch for log records (outermost)
+app.add_middleware(RequestLogContextMiddleware)
 
 # Include API routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
@@ -204,9 +237,12 @@ app.include_router(user_settings.router, prefix="/api/v1/user-settings", tags=["
 app.include_router(profile.router, prefix="/api/v1/profile", tags=["profile"])
 app.include_router(goals.router, prefix="/api/v1/goals", tags=["goals"])
 app.include_router(tools.router, prefix="/api/v1/tools", tags=["tools"])
+app.include_router(bootstrap.router, prefix="/api/v1/bootstrap", tags=["bootstrap"])
+app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
 # Note: payment_schedules feature is disabled - requires frontend implementation before re-enabling
 # app.include_router(payment_schedules.router, prefix="/api/v1/payment-schedules", tags=["payment-schedules"])
 app.include_router(feedback.router, prefix="/api/v1", tags=["feedback"])
+app.include_router(debug.router, prefix="/api/v1/debug", tags=["debug"], include_in_schema=False)
 
 @app.get("/")
 async def root():
@@ -228,46 +264,37 @@ async def cors_debug():
 async def sentry_tunnel(request: Request):
     """
     Sentry tunnel to avoid CORS issues and ad-blocker blocking.
-    Forwards Sentry envelope data from frontend to Sentry's ingestion API.
+    Queues the Sentry envelope from the frontend and answers immediately;
+    background workers forward it to Sentry's ingestion API.
     """
-    import httpx
-    
+    if not sentry_tunnel_forwarder.enabled:
+        return JSONResponse(status_code=404, content={"error": "Tunnel disabled"})
     try:
-        # Get the raw request body (Sentry envelope format)
-        envelope_data = await request.body()
-        
-        # Sentry ingestion URL from your DSN
-        sentry_dsn_host = "https://o4510169956679680.ingest.de.sentry.io"
-        sentry_project_id = "4510172314665040"
-        tunnel_url = f"{sentry_dsn_host}/api/{sentry_project_id}/envelope/"
-        
-        # Forward the request to Sentry with proper headers
-        headers = {
-            "Content-Type": "application/x-sentry-envelope",
-            "User-Agent": request.headers.get("user-agent", ""),
-        }
-        
-        # Forward to Sentry's ingestion API
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                tunnel_url,
-                content=envelope_data,
-                headers=headers,
-                timeout=10.0
-            )
-            
-        # Return success response to frontend
-        return JSONResponse(
-            status_code=response.status_code,
-            content={"status": "forwarded", "sentry_status": response.status_code}
-        )
-        
-    except Exception as e:
-        print(f"Sentry tunnel error: {e}")
+        envelope_data = await read_envelope(request, settings.SENTRY_TUNNEL_MAX_ENVELOPE_BYTES)
+    except EnvelopeTooLarge:
+        return JSONResponse(status_code=413, content={"error": "Envelope too large"})
+    if not envelope_data:
+        return JSONResponse(status_code=400, content={"error": "Empty envelope"})
+
+    if not sentry_tunnel_forwarder.submit(envelope_data, request.headers.get("user-agent", "")):
+        # Queue full: ask the SDK to back off instead of retrying at once
         return JSONResponse(
-            status_code=500,
-            content={"error": "Tunnel failed", "detail": str(e)}
+            status_code=429,
+            content={"error": "Tunnel busy"},
+            headers={"Retry-After": "60"}
         )
+    return JSONResponse(status_code=202, content={"status": "queued"})
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint (bearer token required in production)."""
+    if not settings.METRICS_ENABLED or (settings.is_production and not settings.METRICS_TOKEN):
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not compare_digest(authorization.encode("latin-1"), f"Bearer {settings.METRICS_TOKEN}".encode("latin-1")):
+            return JSONResponse(status_code=401, content={"detail": "Invalid metrics token"})
+    return Response(content=METRICS_REGISTRY.render(), headers={"Content-Type": METRICS_CONTENT_TYPE})
 
 @app.get("/health")
 async def health_check():
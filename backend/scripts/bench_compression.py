@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Measure compression ratio and cost on ledger-sized JSON responses.
+
+Builds a transactions payload shaped like GET /api/v1/transactions/ and runs
+it through CompressionMiddleware with each encoding/level, reporting the
+compressed size, ratio and time per response.
+
+Usage:
+    python scripts/bench_compression.py [--transactions 2000] [--repeat 50]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+from app.core.compression import CompressionMiddleware, brotli
+
+TRANSACTION_TYPES = ["purchase", "sale", "update_market_value", "dividend", "fee"]
+
+
+def build_payload(count: int) -> bytes:
+    rng = random.Random(42)
+    asset_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(40)]
+    user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    start = date(2020, 1, 1)
+    transactions = []
+    for i in range(count):
+        transactions.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": user_id,
+            "asset_id": rng.choice(asset_ids),
+            "transaction_type": rng.choice(TRANSACTION_TYPES),
+            "transaction_date": (start + timedelta(days=i // 3)).isoformat(),
+            "amount": f"{rng.uniform(10, 50000):.2f}",
+            "quantity_change": f"{rng.uniform(-5, 5):.4f}",
+            "current_value": f"{rng.uniform(1000, 500000):.2f}",
+            "notes": rng.choice([None, "Monthly contribution", "Rebalance", "Market update"]),
+            "created_at": f"{start + timedelta(days=i // 3)}T12:00:00+00:00",
+        })
+    return json.dumps(transactions).encode()
+
+
+def run(middleware: CompressionMiddleware, accept_encoding: bytes, repeat: int):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/transactions/",
+        "headers": [(b"accept-encoding", accept_encoding)],
+    }
+    sizes = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            sizes.append(len(message["body"]))
+
+    async def run_all() -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await middleware(scope, receive, send)
+        return (time.perf_counter() - start) / repeat
+
+    seconds = asyncio.run(run_all())
+    return sizes[-1], seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--transactions", type=int, default=2000, help="Transactions in the payload")
+    parser.add_argument("--repeat", type=int, default=50, help="Responses per configuration")
+    args = parser.parse_args()
+
+    payload = build_payload(args.transactions)
+
+    async def endpoint(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    variants = [("identity", b"identity", {})]
+    variants += [(f"gzip level {level}", b"gzip", {"gzip_level": level}) for level in (1, 6, 9)]
+    if brotli is not None:
+        variants += [(f"br quality {quality}", b"br", {"brotli_quality": quality}) for quality in (1, 5, 11)]
+    else:
+        print("brotli not installed; skipping br variants")
+
+    print(f"payload: {args.transactions} transactions, {len(payload) / 1024:.1f} KiB")
+    print(f"{'encoding':<16}{'KiB':>10}{'ratio':>8}{'ms/resp':>10}")
+    for label, accept_encoding, options in variants:
+        middleware = CompressionMiddleware(endpoint, minimum_size=1024, **options)
+        size, seconds = run(middleware, accept_encoding, args.repeat)
+        print(f"{label:<16}{size / 1024:>10.1f}{len(payload) / size:>8.1f}{seconds * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the security headers middleware.
+
+Compares requests/sec of a small JSON endpoint with no middleware, with the
+previous @app.middleware("http") implementation (BaseHTTPMiddleware) and with
+the pure ASGI SecurityHeadersMiddleware. Requests are driven straight through
+the ASGI interface so only application and middleware cost is measured.
+
+Usage:
+    python scripts/bench_security_headers.py [--requests 20000]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI, Request
+from app.core.security_middleware import CONTENT_SECURITY_POLICY, SecurityHeadersMiddleware
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/item")
+    async def item():
+        return {"id": 1, "name": "asset", "value": 1234.5}
+
+    if variant == "base_http":
+        @app.middleware("http")
+        async def add_security_headers(request: Request, call_next):
+            response = await call_next(request)
+            response.headers["Content-Security-Policy"] = CONTENT_SECURITY_POLICY
+            response.headers["X-Content-Type-Options"] = "nosniff"
+            response.headers["X-Frame-Options"] = "DENY"
+            response.headers["X-XSS-Protection"] = "1; mode=block"
+            response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+            response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+            return response
+    elif variant == "pure_asgi":
+        app.add_middleware(SecurityHeadersMiddleware, production=True, enabled=True)
+
+    return app
+
+
+async def run_requests(app: FastAPI, count: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/item",
+        "raw_path": b"/item",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+
+    async def run_one():
+        request_sent = False
+
+        async def receive():
+            # Like a real server: the body once, then block until the client goes away
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        await app(dict(scope), receive, send)
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"Unexpected status {message['status']}")
+
+    # Warm up (route compilation, middleware stack build)
+    for _ in range(200):
+        await run_one()
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await run_one()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark security headers middleware")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per variant")
+    args = parser.parse_args()
+
+    results = {}
+    for variant in ("none", "base_http", "pure_asgi"):
+        elapsed = asyncio.run(run_requests(build_app(variant), args.requests))
+        results[variant] = args.requests / elapsed
+
+    baseline = results["none"]
+    print(f"{'variant':<12}{'req/s':>12}{'vs none':>10}")
+    for variant, rps in results.items():
+        print(f"{variant:<12}{rps:>12.0f}{rps / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request overhead of Sentry tracing and profiling.
+
+Each configuration runs in its own subprocess (Sentry is process-global)
+against a small JSON endpoint driven straight through ASGI. Events go to a
+transport that discards them, so only in-process cost is measured.
+
+Usage:
+    python scripts/bench_sentry_sampling.py [--requests 5000]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import subprocess
+import time
+
+# (label, traces rate or "sampler", profiles rate); None disables Sentry entirely
+VARIANTS = [
+    ("no sentry", None, None),
+    ("traces 0.0", 0.0, 0.0),
+    ("traces 0.1", 0.1, 0.0),
+    ("traces 1.0", 1.0, 0.0),
+    ("traces 1.0 + profiles 1.0", 1.0, 1.0),
+    ("route sampler (settings)", "sampler", None),
+]
+
+
+def run_worker(traces, profiles, count: int) -> float:
+    import sentry_sdk
+    from sentry_sdk.transport import Transport
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+    from fastapi import FastAPI
+    from app.core.config import settings
+    from app.core.sentry import TracesSampler
+
+    class NullTransport(Transport):
+        def capture_envelope(self, envelope):
+            pass
+
+    if traces is not None:
+        options = {}
+        if traces == "sampler":
+            options["traces_sampler"] = TracesSampler(
+                default_rate=settings.SENTRY_TRACES_SAMPLE_RATE,
+                route_rates=settings.SENTRY_ROUTE_SAMPLE_RATES,
+                max_traces_per_second=settings.SENTRY_MAX_TRACES_PER_SECOND
+            )
+            options["profiles_sample_rate"] = settings.SENTRY_PROFILES_SAMPLE_RATE
+        else:
+            options["traces_sample_rate"] = traces
+            options["profiles_sample_rate"] = profiles
+        sentry_sdk.init(
+            dsn="https://public@example.invalid/1",
+            transport=NullTransport,
+            integrations=[FastApiIntegration(), SqlalchemyIntegration()],
+            **options
+        )
+
+    app = FastAPI()
+
+    @app.get("/api/v1/assets/")
+    async def assets():
+        return [{"id": i, "name": f"asset {i}", "value": i * 10.5} for i in range(20)]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/assets/",
+        "raw_path": b"/api/v1/assets/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+
+    async def send(message):
+        pass
+
+    async def run_one():
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        await app(dict(scope), receive, send)
+
+    async def run_all() -> float:
+        for _ in range(200):
+            await run_one()
+        start = time.perf_counter()
+        for _ in range(count):
+            await run_one()
+        return time.perf_counter() - start
+
+    return count / asyncio.run(run_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Sentry sampling overhead")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per configuration")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        traces, profiles = json.loads(args.worker)
+        print(run_worker(traces, profiles, args.requests))
+        return
+
+    results = []
+    for label, traces, profiles in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--requests", str(args.requests),
+             "--worker", json.dumps([traces, profiles])],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append((label, float(output.strip().splitlines()[-1])))
+
+    baseline = results[0][1]
+    print(f"{'configuration':<28}{'req/s':>10}{'us/req':>10}{'overhead':>10}")
+    for label, rps in results:
+        overhead_us = (1 / rps - 1 / baseline) * 1e6
+        print(f"{label:<28}{rps:>10.0f}{1e6 / rps:>10.0f}{overhead_us:>9.0f}us")
+
+
+if __name__ == "__main__":
+    main()
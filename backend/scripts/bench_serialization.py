@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Compare FastAPI's default response serialization with ResponseSerializer.
+
+Builds in-memory ORM rows (5k assets, 50k transactions by default) and
+serves them through two FastAPI endpoints each: one returning the rows with
+`response_model=` (validate -> Python dump -> json.dumps) and one returning
+`ResponseSerializer(...).response(rows)` (validate -> pydantic-core bytes).
+The transaction endpoints reproduce GET /api/v1/transactions/ before and
+after the change, including the current asset name/type override.
+Requests are driven straight through ASGI, so no network or database cost
+is included.
+
+Usage:
+    python scripts/bench_serialization.py [--assets 5000] [--transactions 50000] [--repeat 5]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from app.core.serialization import ResponseSerializer, FastJSONResponse
+from app.models.asset import Asset
+from app.models.transaction import Transaction
+from app.schemas.asset import Asset as AssetSchema
+from app.schemas.transaction import Transaction as TransactionSchema, TransactionWithAsset
+
+
+def loaded(row):
+    """Give every column a value, as rows loaded by a query have (unset ones hit slow paths)."""
+    for column in row.__table__.columns:
+        attribute = row.__mapper__.get_property_by_column(column).key
+        if attribute not in row.__dict__:
+            setattr(row, attribute, None)
+    return row
+
+
+def build_assets(count: int, user_id: uuid.UUID, rng: random.Random) -> List[Asset]:
+    now = datetime.now(timezone.utc)
+    return [
+        loaded(Asset(
+            id=uuid.uuid4(), user_id=user_id, name=f"Asset {i}", asset_type=rng.choice(["stocks", "real_estate", "cash"]),
+            description="Long-term holding", purchase_date=date(2020, 1, 1) + timedelta(days=i % 1000),
+            initial_value=Decimal(f"{rng.uniform(100, 100000):.2f}"), current_value=Decimal(f"{rng.uniform(100, 100000):.2f}"),
+            quantity=Decimal(f"{rng.uniform(1, 500):.4f}"), unit_of_measure="shares", liquid_assets=bool(i % 2),
+            is_selected=False, time_horizon="long_term", asset_purpose="Growth",
+            asset_metadata={"ticker": f"T{i}", "exchange": "NYSE"}, created_at=now, updated_at=now
+        ))
+        for i in range(count)
+    ]
+
+
+def build_transactions(count: int, user_id: uuid.UUID, assets: List[Asset], rng: random.Random) -> List[Transaction]:
+    now = datetime.now(timezone.utc)
+    return [
+        loaded(Transaction(
+            id=uuid.uuid4(), user_id=user_id, asset=asset, asset_id=asset.id,
+            transaction_type=rng.choice(["purchase", "sale", "update_market_value"]),
+            transaction_date=date.today() - timedelta(days=i % 2000), amount=Decimal(f"{rng.uniform(10, 50000):.2f}"),
+            quantity_change=Decimal(f"{rng.uniform(-5, 5):.4f}"), notes="Monthly contribution",
+            current_value=Decimal(f"{rng.uniform(100, 100000):.2f}"), created_at=now
+        ))
+        for i, asset in enumerate(rng.choice(assets) for _ in range(count))
+    ]
+
+
+def build_app(assets: List[Asset], transactions: List[Transaction]) -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    assets_serializer = ResponseSerializer(List[AssetSchema])
+    transactions_serializer = ResponseSerializer(List[TransactionWithAsset])
+
+    @app.get("/default/assets", response_model=List[AssetSchema])
+    async def default_assets():
+        return assets
+
+    @app.get("/fast/assets", response_model=List[AssetSchema])
+    async def fast_assets():
+        return assets_serializer.response(assets)
+
+    # Same shape as GET /api/v1/transactions/ before and after switching to ResponseSerializer
+    @app.get("/default/transactions", response_model=List[TransactionWithAsset])
+    async def default_transactions():
+        result = []
+        for transaction in transactions:
+            transaction_dict = TransactionSchema.model_validate(transaction).model_dump()
+            transaction_dict["asset_name"] = transaction.asset.name
+            transaction_dict["asset_type"] = transaction.asset.asset_type
+            result.append(transaction_dict)
+        return result
+
+    @app.get("/fast/transactions", response_model=List[TransactionWithAsset])
+    async def fast_transactions():
+        result = []
+        for transaction in transactions:
+            item = TransactionWithAsset.model_validate(transaction)
+            item.asset_name = transaction.asset.name
+            item.asset_type = transaction.asset.asset_type
+            result.append(item)
+        return transactions_serializer.response(result)
+
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8000),
+    }
+    body = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--assets", type=int, default=5000, help="Assets in the payload")
+    parser.add_argument("--transactions", type=int, default=50000, help="Transactions in the payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per endpoint")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    user_id = uuid.uuid4()
+    assets = build_assets(args.assets, user_id, rng)
+    transactions = build_transactions(args.transactions, user_id, assets, rng)
+    app = build_app(assets, transactions)
+
+    async def run_all():
+        print(f"{'payload':<16}{'default ms':>12}{'fast ms':>10}{'speedup':>9}{'MiB':>8}")
+        for name, count in (("assets", args.assets), ("transactions", args.transactions)):
+            timings = {}
+            for variant in ("default", "fast"):
+                path = f"/{variant}/{name}"
+                body = await request(app, path)  # warm up
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    await request(app, path)
+                timings[variant] = (time.perf_counter() - start) / args.repeat
+                timings[f"{variant}_body"] = body
+            if json.loads(timings["default_body"]) != json.loads(timings["fast_body"]):
+                raise SystemExit(f"{name}: serialized output differs")
+            print(
+                f"{f'{count} {name}':<16}{timings['default'] * 1000:>12.1f}{timings['fast'] * 1000:>10.1f}"
+                f"{timings['default'] / timings['fast']:>8.1f}x{len(timings['fast_body']) / 2 ** 20:>8.1f}"
+            )
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Scheduler job that catches up every due payment schedule across all users.
+Records all elapsed periods and advances next_payment_date with one UPDATE
+per chunk of users; each chunk commits on its own. Safe to re-run at any
+time (e.g. daily as a Railway cron job): already caught-up schedules are
+not due any more and are left untouched.
+
+Usage:
+    python scripts/catch_up_payment_schedules.py [--as-of YYYY-MM-DD]
+        [--chunk-size 500] [--start-after USER_ID]
+
+To resume an interrupted run, pass the last "completed through" user id
+printed by the previous run as --start-after.
+"""
+
+import argparse
+import sys
+import os
+from datetime import date
+from uuid import UUID
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.services.payment_schedule_service import PaymentScheduleService, FIRST_USER_ID
+
+def catch_up_payment_schedules(as_of: date, chunk_size: int, start_after: UUID):
+    """Catch up all due schedules, one committed transaction per user chunk."""
+    db: Session = SessionLocal()
+    totals = {"schedules_updated": 0, "payments_recorded": 0, "schedules_completed": 0, "users_updated": 0}
+    
+    try:
+        for after_user_id, upper_user_id in PaymentScheduleService.iter_due_user_ranges(
+            db, as_of, chunk_size=chunk_size, start_after=start_after
+        ):
+            try:
+                result = PaymentScheduleService.catch_up_due_schedules(db, as_of, after_user_id, upper_user_id)
+                db.commit()
+            except Exception:
+                db.rollback()
+                print(f"Chunk after {after_user_id} failed; resume with --start-after {after_user_id}")
+                raise
+            
+            for key, value in result.items():
+                totals[key] += value
+            print(
+                f"Updated {result['schedules_updated']} schedules for {result['users_updated']} users "
+                f"({result['payments_recorded']} payments) - completed through {upper_user_id}"
+            )
+        
+        print(
+            f"Caught up {totals['schedules_updated']} schedules for {totals['users_updated']} users: "
+            f"{totals['payments_recorded']} payments recorded, {totals['schedules_completed']} schedules completed"
+        )
+        
+    except Exception as e:
+        print(f"Error catching up payment schedules: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(), help="Catch up payments due on or before this date")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Users per transaction")
+    parser.add_argument("--start-after", type=UUID, default=FIRST_USER_ID, help="Resume after this user id")
+    args = parser.parse_args()
+    
+    print(f"Starting payment schedule catch-up as of {args.as_of}...")
+    catch_up_payment_schedules(args.as_of, args.chunk_size, args.start_after)
+    print("Payment schedule catch-up completed successfully!")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Batch job that records upcoming insurance reminders for all users.
+Runs one set-based INSERT ... SELECT over every active policy, so it can be
+scheduled daily (e.g. as a Railway cron job) and re-run safely.
+
+Usage:
+    python scripts/compute_insurance_reminders.py [--days-ahead 30]
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.services.insurance_events_service import InsuranceEventsService
+
+def compute_insurance_reminders(days_ahead: int):
+    """Insert reminders for renewals, expiries and premium due dates in the window."""
+    db: Session = SessionLocal()
+    
+    try:
+        result = InsuranceEventsService.compute_reminders(db, days_ahead=days_ahead)
+        db.commit()
+        print(
+            f"Created {result['reminders_created']} reminders "
+            f"for {result['users_notified']} users (next {days_ahead} days)"
+        )
+    except Exception as e:
+        print(f"Error computing insurance reminders: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days-ahead", type=int, default=30, help="Reminder window in days")
+    args = parser.parse_args()
+    
+    print("Starting insurance reminder computation...")
+    compute_insurance_reminders(args.days_ahead)
+    print("Insurance reminders completed successfully!")
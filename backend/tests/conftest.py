@@ -0,0 +1,179 @@
+"""
+Shared test fixtures.
+
+The application runs unchanged against an in-memory SQLite database: the
+PostgreSQL column types compile to SQLite equivalents, the app's session
+factory is bound to the test engine, and only Supabase authentication is
+replaced by a lookup of a seeded user (the same single query the real
+dependency runs). Query budgets are enforced, so any endpoint that runs more
+statements than QUERY_BUDGETS allows fails its test, and every request made
+through the `client` fixture runs under detect_loop_blocking(), so a handler
+that holds the event loop longer than LOOP_BLOCK_THRESHOLD_MS fails with
+LoopBlocked (opt out per test with @pytest.mark.allow_loop_blocking).
+
+Async tests use the anyio pytest plugin: mark them with pytest.mark.anyio.
+"""
+
+import gc
+import os
+
+# Before the app is imported: settings are read once at import time
+os.environ["QUERY_BUDGET_ENFORCE"] = "true"
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("SENTRY_DSN", "")
+# Stream tickets refuse the placeholder key
+os.environ.setdefault("SECRET_KEY", "test-secret-key-of-at-least-32-bytes")
+
+import uuid
+from datetime import date, timedelta
+import httpx
+import pytest
+from fastapi import Depends
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY, JSONB, UUID as PG_UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.types import ARRAY
+
+
+@compiles(JSONB, "sqlite")
+@compiles(ARRAY, "sqlite")
+@compiles(PG_ARRAY, "sqlite")
+def _compile_json(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(PG_UUID, "sqlite")
+def _compile_uuid(type_, compiler, **kw):
+    return "CHAR(36)"
+
+
+import main
+from app.api.deps import get_current_user
+from app.core.database import Base, SessionLocal, get_db
+from app.core.loop_monitor import detect_loop_blocking
+from app.core.query_stats import install_query_instrumentation
+from app.models.asset import Asset
+from app.models.insurance import InsurancePolicy
+from app.models.transaction import Transaction
+from app.models.user import User
+
+# Move the imported app's objects out of the collector's reach: a full
+# collection over them takes longer than the loop-blocking budget and would
+# fail whichever request it happens to interrupt
+gc.collect()
+gc.freeze()
+
+TEST_TABLES = [User.__table__, Asset.__table__, Transaction.__table__, InsurancePolicy.__table__]
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "allow_loop_blocking: do not fail requests of this test that block the event loop"
+    )
+
+
+class LoopBlockingTransport(httpx.ASGITransport):
+    """ASGI transport that runs each request under detect_loop_blocking()."""
+
+    async def handle_async_request(self, request):
+        async with detect_loop_blocking():
+            return await super().handle_async_request(request)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db_engine():
+    """Fresh in-memory database per test, used by every session of the app."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    install_query_instrumentation(engine)
+    Base.metadata.create_all(engine, tables=TEST_TABLES)
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    yield engine
+    SessionLocal.configure(bind=previous_bind)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine) -> Session:
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db) -> User:
+    user = User(id=uuid.uuid4(), email="test@example.com")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def portfolio(db, user):
+    """A few assets, each with a purchase and some with a later valuation."""
+    today = date.today()
+    assets = []
+    for i in range(5):
+        asset = Asset(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            name=f"Asset {i}",
+            asset_type="stocks",
+            quantity=1,
+            initial_value=50,
+            current_value=100 + i
+        )
+        db.add(asset)
+        db.flush()
+        db.add(Transaction(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            asset_id=asset.id,
+            transaction_type="purchase",
+            amount=10,
+            current_value=200 + i,
+            transaction_date=today - timedelta(days=2)
+        ))
+        if i % 2:
+            db.add(Transaction(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                asset_id=asset.id,
+                transaction_type="update_market_value",
+                amount=300 + i,
+                transaction_date=today - timedelta(days=1)
+            ))
+        assets.append(asset)
+    db.commit()
+    return assets
+
+
+@pytest.fixture
+def app(user):
+    """The application, authenticated as `user`."""
+    # Read now: the fixture's instance expires on commit and would reload inside the request
+    user_id = user.id
+
+    async def current_user(db: Session = Depends(get_db)) -> User:
+        return db.query(User).filter(User.id == user_id).first()
+
+    main.app.dependency_overrides[get_current_user] = current_user
+    yield main.app
+    main.app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+async def client(app, request):
+    if request.node.get_closest_marker("allow_loop_blocking"):
+        transport = httpx.ASGITransport(app=app)
+    else:
+        transport = LoopBlockingTransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
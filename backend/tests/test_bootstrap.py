@@ -0,0 +1,33 @@
+"""Bootstrap sections and their standalone endpoints."""
+
+import pytest
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def one_section_at_a_time(monkeypatch):
+    # The in-memory test database is a single connection shared by all sessions
+    monkeypatch.setattr(settings, "BOOTSTRAP_MAX_CONCURRENCY", 1)
+
+
+async def test_sections_carry_standalone_etags(client, portfolio):
+    sections = (await client.get("/api/v1/bootstrap", params={"sections": "me,assets"})).json()["sections"]
+    me = await client.get("/api/v1/auth/me")
+    assets = await client.get("/api/v1/assets/")
+
+    assert sections["me"]["status"] == 200
+    assert sections["assets"]["status"] == 200
+    assert len(sections["assets"]["data"]) == len(portfolio)
+    assert sections["me"]["etag"] == me.headers["etag"]
+    # Compressed responses weaken their ETag; matching is weak either way
+    assert sections["assets"]["etag"] == assets.headers["etag"].removeprefix("W/")
+
+
+async def test_me_revalidates_with_section_etag(client, user):
+    etag = (await client.get("/api/v1/bootstrap", params={"sections": "me"})).json()["sections"]["me"]["etag"]
+
+    response = await client.get("/api/v1/auth/me", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
@@ -0,0 +1,50 @@
+"""Event stream authentication: single-use tickets instead of tokens in URLs."""
+
+import pytest
+from app.core.config import Settings, settings
+from app.core.security import (
+    StreamTicketsDisabled, create_access_token, create_stream_ticket, redeem_stream_ticket, verify_token
+)
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_ticket_endpoint_issues_ticket_for_current_user(client, user):
+    response = await client.post("/api/v1/events/ticket")
+
+    assert response.status_code == 200
+    assert redeem_stream_ticket(response.json()["ticket"]) == str(user.id)
+
+
+def test_ticket_works_once():
+    ticket = create_stream_ticket("user")
+    assert redeem_stream_ticket(ticket) == "user"
+    assert redeem_stream_ticket(ticket) is None
+
+
+def test_ticket_is_not_an_access_token():
+    assert verify_token(create_stream_ticket("user")) is None
+    assert redeem_stream_ticket(create_access_token({"sub": "user"})) is None
+
+
+async def test_stream_rejects_used_ticket_and_query_tokens(client, user):
+    ticket = (await client.post("/api/v1/events/ticket")).json()["ticket"]
+    redeem_stream_ticket(ticket)
+
+    used = await client.get("/api/v1/events/stream", params={"ticket": ticket})
+    query_token = await client.get("/api/v1/events/stream", params={"access_token": create_access_token({"sub": "x"})})
+
+    assert used.status_code == 401
+    assert query_token.status_code == 401
+
+
+@pytest.mark.parametrize("secret_key", [Settings.model_fields["SECRET_KEY"].default, "too-short"])
+async def test_no_tickets_with_unsafe_secret_key(client, monkeypatch, secret_key):
+    monkeypatch.setattr(settings, "SECRET_KEY", secret_key)
+
+    with pytest.raises(StreamTicketsDisabled):
+        create_stream_ticket("user")
+    # Not even tickets signed with it (the placeholder is public)
+    forged = create_access_token({"sub": "user", "aud": "event-stream", "jti": "forged"})
+    assert redeem_stream_ticket(forged) is None
+    assert (await client.post("/api/v1/events/ticket")).status_code == 503
@@ -0,0 +1,47 @@
+"""
+Insurance mind map grouping by policy type.
+
+Totals use GROUP BY ROLLUP, which SQLite lacks; the per-type policy queries
+and the drill-down routes run here.
+"""
+
+import uuid
+import pytest
+from app.models.insurance import InsurancePolicy
+from app.services.insurance_hierarchy_service import InsuranceHierarchyService, UNTYPED_LABEL, type_label
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def policies(db, user):
+    """A policy whose stored type is literally 'unspecified', next to a life policy."""
+    for policy_type, coverage in (("unspecified", 1000), ("life", 5000)):
+        db.add(InsurancePolicy(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            policy_name=f"{policy_type} policy",
+            policy_type=policy_type,
+            coverage_amount=coverage,
+            status="active"
+        ))
+    db.commit()
+
+
+def test_stored_unspecified_type_is_not_the_untyped_group(db, user, policies):
+    top = InsuranceHierarchyService.get_top_policies(db, user.id, 10)
+
+    assert set(top) == {"unspecified", "life"}
+    assert InsuranceHierarchyService.get_type_policies(db, user.id, None, limit=10) == []
+    assert len(InsuranceHierarchyService.get_type_policies(db, user.id, "unspecified", limit=10)) == 1
+    assert type_label(None) == UNTYPED_LABEL != type_label("unspecified")
+
+
+async def test_untyped_drill_down_route(client, policies):
+    untyped = await client.get("/api/v1/insurance/hierarchy/untyped-policies")
+    unspecified = await client.get("/api/v1/insurance/hierarchy/unspecified/policies")
+
+    assert untyped.status_code == 200
+    assert untyped.json()["type"] is None
+    assert untyped.json()["policies"] == []
+    assert [policy["name"] for policy in unspecified.json()["policies"]] == ["unspecified policy"]
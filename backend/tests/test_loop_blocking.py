@@ -0,0 +1,38 @@
+"""The loop-blocking guard that wraps requests of the `client` fixture."""
+
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.core.loop_monitor import LoopBlocked
+from tests.conftest import LoopBlockingTransport
+
+pytestmark = pytest.mark.anyio
+
+blocking_app = FastAPI()
+
+
+@blocking_app.get("/blocking")
+async def blocking():
+    time.sleep(0.3)
+    return {}
+
+
+@blocking_app.get("/awaiting")
+async def awaiting():
+    await asyncio.sleep(0.3)
+    return {}
+
+
+async def test_blocking_handler_fails():
+    async with httpx.AsyncClient(transport=LoopBlockingTransport(app=blocking_app), base_url="http://testserver") as client:
+        with pytest.raises(LoopBlocked):
+            await client.get("/blocking")
+
+
+async def test_awaiting_handler_passes():
+    async with httpx.AsyncClient(transport=LoopBlockingTransport(app=blocking_app), base_url="http://testserver") as client:
+        response = await client.get("/awaiting")
+
+    assert response.status_code == 200
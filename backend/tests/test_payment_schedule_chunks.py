@@ -0,0 +1,55 @@
+"""
+Keyset chunking of the payment schedule catch-up job.
+
+The catch-up UPDATE itself is PostgreSQL-only; the chunk boundary query that
+drives it runs here as well.
+"""
+
+import uuid
+from datetime import date, timedelta
+import pytest
+from app.models.payment_schedule import PaymentSchedule
+from app.services.payment_schedule_service import PaymentScheduleService
+
+
+@pytest.fixture
+def schedules(db, db_engine):
+    """Two due schedules for each of five users, plus users with nothing due."""
+    PaymentSchedule.__table__.create(db_engine)
+    today = date.today()
+    due_users = sorted(uuid.uuid4() for _ in range(5))
+
+    def schedule(user_id, next_payment_date, is_active=True):
+        return PaymentSchedule(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            related_id=uuid.uuid4(),
+            related_type="asset",
+            schedule_type="payment_out",
+            amount=10,
+            frequency="monthly",
+            start_date=today - timedelta(days=90),
+            next_payment_date=next_payment_date,
+            is_active=is_active
+        )
+
+    for user_id in due_users:
+        db.add(schedule(user_id, today - timedelta(days=3)))
+        db.add(schedule(user_id, today))
+    db.add(schedule(uuid.uuid4(), today + timedelta(days=1)))
+    db.add(schedule(uuid.uuid4(), today - timedelta(days=1), is_active=False))
+    db.commit()
+    return due_users
+
+
+def test_ranges_cover_due_users_in_chunks(db, schedules):
+    ranges = list(PaymentScheduleService.iter_due_user_ranges(db, date.today(), chunk_size=2))
+
+    assert [upper for _, upper in ranges] == [schedules[1], schedules[3], schedules[4]]
+    assert [after for after, _ in ranges[1:]] == [upper for _, upper in ranges[:-1]]
+
+
+def test_no_ranges_when_nothing_is_due(db, schedules):
+    as_of = date.today() - timedelta(days=30)
+
+    assert list(PaymentScheduleService.iter_due_user_ranges(db, as_of, chunk_size=2)) == []
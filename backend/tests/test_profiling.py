@@ -0,0 +1,35 @@
+"""Request profiler sampling of work handed to worker threads."""
+
+import threading
+import time
+import anyio
+import pytest
+from app.core.profiling import StackSampler, _request_sampler, profiled_in_thread
+
+pytestmark = pytest.mark.anyio
+
+
+def busy_compute() -> str:
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+    return "done"
+
+
+async def test_sampler_follows_profiled_worker_thread():
+    sampler = StackSampler(threading.get_ident(), 0.005)
+    token = _request_sampler.set(sampler)
+    sampler.start()
+    try:
+        result = await anyio.to_thread.run_sync(profiled_in_thread(busy_compute))
+    finally:
+        sampler.stop()
+        _request_sampler.reset(token)
+
+    assert result == "done"
+    assert any("busy_compute" in stack for stack in sampler.stacks)
+    assert not sampler.followed_thread_ids
+
+
+def test_unprofiled_computation_is_not_wrapped():
+    assert profiled_in_thread(busy_compute) is busy_compute
@@ -0,0 +1,53 @@
+"""
+Query budgets of the hot read endpoints.
+
+QUERY_BUDGET_ENFORCE is on for the test run (see conftest), so a request
+that runs more statements than its QUERY_BUDGETS entry raises
+QueryBudgetExceeded: a duplicated query or a per-asset loop fails here.
+"""
+
+import uuid
+import pytest
+from app.core.config import settings
+from app.core.query_stats import QueryBudgetExceeded
+from app.models.asset import Asset
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_assets_list_within_budget(client, portfolio):
+    response = await client.get("/api/v1/assets/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == len(portfolio)
+    assert int(response.headers["x-db-query-count"]) <= settings.QUERY_BUDGETS["GET /api/v1/assets/"]
+
+
+async def test_dashboard_summary_within_budget(client, portfolio):
+    response = await client.get("/api/v1/dashboard/summary")
+
+    assert response.status_code == 200
+    assert response.json()["net_worth"] > 0
+    assert int(response.headers["x-db-query-count"]) <= settings.QUERY_BUDGETS["GET /api/v1/dashboard/summary"]
+
+
+async def test_query_count_does_not_grow_with_assets(client, db, user, portfolio):
+    """As many statements for a handful of assets as for many more (no N+1)."""
+    few = await client.get("/api/v1/assets/")
+    for i in range(20):
+        db.add(Asset(
+            id=uuid.uuid4(), user_id=user.id, name=f"More {i}", asset_type="bonds", quantity=1, current_value=10
+        ))
+    db.commit()
+    many = await client.get("/api/v1/assets/")
+
+    assert len(many.json()) == len(few.json()) + 20
+    assert many.headers["x-db-query-count"] == few.headers["x-db-query-count"]
+
+
+async def test_over_budget_request_fails(client, portfolio, monkeypatch):
+    """Enforcement really trips: the assets list under a budget of one query."""
+    monkeypatch.setitem(settings.QUERY_BUDGETS, "GET /api/v1/assets/", 1)
+
+    with pytest.raises(QueryBudgetExceeded):
+        await client.get("/api/v1/assets/")
@@ -0,0 +1,42 @@
+"""
+Responses of the frontend Sentry tunnel.
+
+Envelopes are only queued here: the forwarder's workers are never started,
+so nothing is sent to Sentry.
+"""
+
+import asyncio
+import pytest
+from app.core.sentry_tunnel import sentry_tunnel_forwarder
+
+pytestmark = pytest.mark.anyio
+
+ENVELOPE = b'{"event_id":"9ec79c33ec9942ab8353589fcb2e04dc"}\n{"type":"event"}\n{}\n'
+
+
+@pytest.fixture
+def forwarder(monkeypatch):
+    """The app's forwarder with an upstream URL and room for one envelope, not running."""
+    monkeypatch.setattr(sentry_tunnel_forwarder, "url", "https://sentry.invalid/api/1/envelope/")
+    monkeypatch.setattr(sentry_tunnel_forwarder, "_queue", asyncio.Queue(maxsize=1))
+    # Pretend the workers run so submit() does not start real ones
+    monkeypatch.setattr(sentry_tunnel_forwarder, "_workers", [None])
+    return sentry_tunnel_forwarder
+
+
+async def test_disabled_tunnel_is_not_found(client, monkeypatch):
+    monkeypatch.setattr(sentry_tunnel_forwarder, "url", None)
+
+    response = await client.post("/api/v1/sentry-tunnel", content=ENVELOPE)
+
+    assert response.status_code == 404
+    assert "retry-after" not in response.headers
+
+
+async def test_full_queue_asks_to_back_off(client, forwarder):
+    accepted = await client.post("/api/v1/sentry-tunnel", content=ENVELOPE)
+    rejected = await client.post("/api/v1/sentry-tunnel", content=ENVELOPE)
+
+    assert accepted.status_code == 202
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "60"
@@ -0,0 +1,11 @@
+-- Migration 013: Index supporting the insurance hierarchy aggregation
+-- Date: 2026-10-18
+-- Description: The mind-map endpoint aggregates active policies per type in SQL
+-- (GROUP BY ROLLUP) and fetches the top-N policies per type by coverage.
+-- This composite index lets both queries read only the user's active rows,
+-- already ordered by type and coverage.
+
+CREATE INDEX IF NOT EXISTS idx_insurance_policies_user_status_type_coverage
+    ON insurance_policies (user_id, status, policy_type, coverage_amount DESC);
+
+COMMENT ON INDEX idx_insurance_policies_user_status_type_coverage IS 'Supports per-type aggregation and top-N policy lookup for /insurance/hierarchy';
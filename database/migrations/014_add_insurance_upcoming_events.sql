@@ -0,0 +1,39 @@
+-- Migration 014: Upcoming insurance events and reminders
+-- Date: 2026-10-18
+-- Description: Partial indexes on active policies for renewal/expiry lookups,
+-- and the insurance_reminders table filled by the batch reminder job
+-- (backend/scripts/compute_insurance_reminders.py).
+
+-- Partial indexes: only active policies with the date set are indexed, so the
+-- upcoming-events query and the all-users batch scan stay small.
+CREATE INDEX IF NOT EXISTS idx_insurance_policies_active_renewal
+    ON insurance_policies (renewal_date, user_id)
+    WHERE status = 'active' AND renewal_date IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_insurance_policies_active_end_date
+    ON insurance_policies (end_date, user_id)
+    WHERE status = 'active' AND end_date IS NOT NULL;
+
+-- Reminders computed by the batch job
+CREATE TABLE IF NOT EXISTS insurance_reminders (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    policy_id UUID NOT NULL REFERENCES insurance_policies(id) ON DELETE CASCADE,
+    event_type TEXT NOT NULL, -- 'renewal', 'expiry', 'premium_due'
+    event_date DATE NOT NULL,
+    amount NUMERIC(18, 2),
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    notified_at TIMESTAMPTZ,
+    CONSTRAINT uq_insurance_reminders_event UNIQUE (policy_id, event_type, event_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_insurance_reminders_user_pending
+    ON insurance_reminders (user_id, event_date)
+    WHERE notified_at IS NULL;
+
+-- Enable Row Level Security (RLS) for Supabase
+ALTER TABLE insurance_reminders ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users can view their own insurance reminders" ON insurance_reminders FOR SELECT USING (auth.uid() = user_id);
+
+COMMENT ON TABLE insurance_reminders IS 'Upcoming renewal, expiry and premium due reminders per policy';
+COMMENT ON COLUMN insurance_reminders.notified_at IS 'When the user was notified; NULL while pending';
@@ -0,0 +1,12 @@
+-- Migration 015: Partial index on active payment schedules
+-- Date: 2026-10-19
+-- Description: The upcoming cash-flow query expands every active schedule of a
+-- user with generate_series. Indexing only active schedules by
+-- (user_id, next_payment_date) keeps that lookup, and range scans over
+-- user_id, off inactive and finished schedules.
+
+CREATE INDEX IF NOT EXISTS idx_payment_schedules_active_user_next
+    ON payment_schedules (user_id, next_payment_date)
+    WHERE is_active = TRUE AND next_payment_date IS NOT NULL;
+
+COMMENT ON INDEX idx_payment_schedules_active_user_next IS 'Supports set-based expansion of active schedules per user';
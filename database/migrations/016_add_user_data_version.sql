@@ -0,0 +1,10 @@
+-- Migration 016: Per-user data version for conditional GETs
+-- Date: 2026-10-19
+-- Description: users.data_version is incremented by the API in the same
+-- transaction as any write to the user's assets, transactions, policies,
+-- goals, schedules or settings. Read endpoints build their ETag from it, so
+-- an unchanged client cache is answered with 304 before any data query runs.
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS data_version BIGINT NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN users.data_version IS 'Incremented on every write to the user''s data; ETag source for read endpoints';